@@ -1,5 +1,4 @@
 ﻿import sys
-import sqlite3
 from pathlib import Path
 import datetime
 
@@ -21,12 +20,13 @@ def str_to_float(value, default=0.0):
 
 # Optional project modules
 try:
-    from modules import dbms, person, employee, auth
+    from modules import dbms, person, employee, auth, migrations
 except Exception:
     dbms = None
     person = None
     employee = None
     auth = None
+    migrations = None
 
 st.set_page_config(
     page_title="Personalverwaltung - Team Sigma",
@@ -37,7 +37,12 @@ st.set_page_config(
 
 # --- Datenbank initialisieren ---
 DB_PATH = Path(__file__).parent / "stammdatenverwaltung.db"
-db = dbms.dbms(str(DB_PATH))
+try:
+    db = dbms.dbms(str(DB_PATH))
+except migrations.MigrationError as e:
+    # Kein Start gegen ein halb migriertes Schema
+    st.error(f"🚨 Die Datenbank konnte nicht aktualisiert werden: {e}")
+    st.stop()
 
 # Tabellen erstellen, falls nicht vorhanden
 person.person.initialize_db_table(db)
@@ -80,6 +85,43 @@ with st.sidebar:
             st.success(f"{uploaded.name} geladen – {df.shape[0]} Zeilen × {df.shape[1]} Spalten")
         except Exception as e:
             st.error(f"Fehler beim Laden: {e}")
+
+    # Import der geladenen Tabelle als Personen (Spalten nach DB-Namen oder Bezeichnung, z.B. PERS_SURNAME oder Nachname)
+    if st.session_state.get("df") is not None and person is not None:
+        if st.button("👥 Als Personen importieren"):
+            df = st.session_state.df
+            spalten = {}
+            for db_name, _, label in person.person.table_row_names:
+                for name in (db_name, label):
+                    if name in df.columns:
+                        spalten[db_name] = name
+            if not all(k in spalten for k in ("PERS_SURNAME", "PERS_FIRSTNAME", "PERS_BIRTHDATE")):
+                st.error("Benötigte Spalten: Nachname, Vorname, Geburtsdatum")
+            else:
+                def wert(row, db_name):
+                    value = row[spalten[db_name]] if db_name in spalten else None
+                    if pd.isna(value):
+                        return None
+                    return value.item() if hasattr(value, "item") else value
+
+                # Neue IDs im Anschluss an die höchste vorhandene PERS_ID vergeben
+                max_id, _ = db.execute_command("SELECT MAX(PERS_ID) FROM PERSON", fetch=True)
+                person.person.id = max_id[0][0] or 0
+                neue_personen = [
+                    person.person(
+                        nachname=wert(row, "PERS_SURNAME"), vorname=wert(row, "PERS_FIRSTNAME"),
+                        geburtsdatum=wert(row, "PERS_BIRTHDATE"), straße=wert(row, "PERS_STREET"),
+                        hausnr=wert(row, "PERS_HOUSENR"), stiege_top_etc=wert(row, "PERS_FLOOR"),
+                        plz=wert(row, "PERS_ZIP"), ort=wert(row, "PERS_PLACE"),
+                        sex=wert(row, "PERS_SEX"), children=wert(row, "PERS_CHILDREN")
+                    )
+                    for _, row in df.iterrows()
+                ]
+                ergebnis = person.person.insert_many(db, neue_personen)
+                if ergebnis['rows']:
+                    st.success(f"{ergebnis['rows']} Personen importiert ({ergebnis['seconds']:.2f} s)")
+                else:
+                    st.error("Import fehlgeschlagen, es wurden keine Personen gespeichert.")
     
     st.divider()
     st.caption("Version 2.0.0 • Personalverwaltung")
@@ -99,8 +141,7 @@ with col2:
 
 with col3:
     # Anzahl Lohnabrechnungen diesen Monat
-    import sqlite3
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = dbms.connect(str(DB_PATH))
     cursor = conn.cursor()
     current_month = pd.Timestamp.now().strftime("%Y-%m")
     cursor.execute("SELECT COUNT(*) FROM lohnverrechnung_dn WHERE lv_dn_monat LIKE ?", (f"{current_month}%",))
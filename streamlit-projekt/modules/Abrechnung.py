@@ -1,11 +1,17 @@
 ############################################################################
 # 1.0.0
-# Lohnverrechnungstool für das Jahr 2025
+# Lohnverrechnungstool
 # Dient als Brutto-Netto-Rechner im Terminal
-# Hauptkennwerte für das Jahr 2025 via globaler Variablen implementiert
+# Hauptkennwerte je Gültigkeitszeitraum in modules/parameter.py
 ############################################################################
 
-import datetime
+import inspect
+import math
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Optional
+
+from modules import kalender, parameter
 
 # ANSI Escape-Sequenzen für Farben & Formatierung
 RED = "\033[91m"       # Rote Farbe
@@ -13,86 +19,139 @@ GREEN = "\033[92m"     # Grüne Farbe
 BOLD = "\033[1m"       # Fett
 RESET = "\033[0m"      # Zurücksetzen auf Standardfarbe
 
-SV_DG_PROZENT = 0.2038
-SV_DG_IE_PROZENT = 0.001
-SV_DG_WB_PROZENT = 0.005
-SV_DN_GRENZE_0 = 2074.0
-SV_DN_GRENZE_1 = 2262.0
-SV_DN_GRENZE_2 = 2451.0
-#SV_DN_GRENZE_3 = 
-SV_DN_PROZENT_0 = 0.1412
-SV_DN_PROZENT_1 = 0.1512
-SV_DN_PROZENT_2 = 0.1612
-SV_DN_PROZENT_3 = 0.1707
-SV_DN_AK_PROZENT = 0.005
-SV_DN_WB_PROZENT = 0.005
-SV_DN_MBV_PROZENT = 0.0153
-SV_HBGL = 6450.0
-
-LST_68_1 = 400.
-LST_68_2_STUNDEN = 18.
-LST_68_2_WERT = 200.
-
-DGA_WIEN = 2.
-
-KOMM_ST_PROZENT = 0.03
-DB_PROZENT = 0.037
-DBZ_PROZENT = 0.0036
-
-LST_SZ_FREI = 620.
-LST_SZ_1 = 24380.
-LST_SZ_2 = 49380.
-LST_SZ_3 = 83333.
-LST_SZ_1_PROZENT = 0.06
-LST_SZ_2_PROZENT = 0.27
-LST_SZ_3_PROZENT = 0.3575
-
-LST_AVAB_1K = 50.08
-LST_AVAB_2K = 67.75
-LST_AVAB_3KUND = 22.33
-
-FABO_U18G = 166.68
-FABO_U18H = 83.34
-FABO_UE18G = 58.34
-FABO_UE18H = 29.17
-LST_VAB = 40.58
-
-LST_ST1 = 1120.
-LST_ST2 = 1812.45
-LST_ST3 = 2997.33
-LST_ST4 = 5774.83
-LST_ST5 = 8600.33
-LST_ST6 = 83344.33
-
-LST_ST1_PROZENT = 0.
-LST_ST2_PROZENT = 0.20
-LST_ST3_PROZENT = 0.3
-LST_ST4_PROZENT = 0.4
-LST_ST5_PROZENT = 0.48
-LST_ST6_PROZENT = 0.5
-LST_ST7_PROZENT = 0.55
-
-LST_ST2_ABZUG = 224.
-LST_ST3_ABZUG = 405.24
-LST_ST4_ABZUG = 704.94
-LST_ST5_ABZUG = 1166.96
-LST_ST6_ABZUG = 1338.97
-LST_ST7_ABZUG = 5506.19
-
-OEGB_PROZENT = 0.01
-OEGB_GRENZWERT = 40.8
+class Bruttosuche(NamedTuple):
+    """Ergebnis von calc_netto2brutto: gefundenes Brutto, die Abrechnung dazu und die Anzahl der Rechenläufe"""
+    brutto: float
+    ergebnis: 'Abrechnungsergebnis'
+    iterationen: int
+
+
+class Abrechnungsergebnis(NamedTuple):
+    """
+    Ergebnis einer Lohnabrechnung mit allen Zwischenwerten (Beträge in €)
+    Der Text für Terminal bzw. Oberfläche wird erst bei Bedarf über text() erzeugt.
+    """
+    netto: float
+    sv_bmg: float
+    sv: float
+    lst_bmg: float
+    lst: float
+    sobz: float
+    svsonder: float
+    lst_sb: float
+    kommst: float
+    dga: float
+    db: float
+    dz: float
+    dienstg_sv: float
+    dienstg_svsonder: float
+    BV: float
+    oegb: float
+    brlohn: float
+
+    def text(self, farbig: bool = False) -> str:
+        """
+        Gibt die Abrechnung als formatierten Text aus
+        Args:
+            farbig (bool, optional): Mit ANSI-Farben für das Terminal. Defaults to False.
+
+        Returns:
+            str: Abrechnung als Text
+        """
+        rot, gruen, fett, reset = (RED, GREEN, BOLD, RESET) if farbig else ("", "", "", "")
+        return (
+            f"\n{rot}{fett}================================================================================{reset}\n"
+            f"{fett}  Der Nettolohn lt Berechnung (2021) ist:{reset} {gruen}{fett}{self.netto}€{reset}\n"
+            f"{rot}{fett}================================================================================{reset}\n\n"
+            f"SV_Bmg: {self.sv_bmg}€    SV lfd: {self.sv}€\n"
+            f"Lst_Bmg: {self.lst_bmg}€   Lohnsteuer: {self.lst}€\n\n"
+            f"Der sonstige Bezug (netto) ist: {self.sobz}€\n"
+            f"SV-Sonstiger Bezug: {self.svsonder}€   Lohnsteuer-Sonstiger Bezug: {self.lst_sb}€\n\n"
+            f"Lohnnebenkosten\n"
+            f"Kommunalsteuer: {self.kommst}€   U-Bahnsteuer: {self.dga}€   Dienstbeitrag: {self.db}€   "
+            f"Zuschlag (DB): {self.dz}€   SV-Dienstgeberbeitrag: {(self.dienstg_sv + self.dienstg_svsonder)}€   BV: {self.BV}€"
+        )
+
+    def in_cent(self) -> 'Centergebnis':
+        """
+        Das Ergebnis in ganzen Cent mit festen Rundungspunkten
+        Jeder Betrag (Bemessungsgrundlagen, SV, Lohnsteuer, Lohnnebenkosten) wird für sich kaufmännisch auf Cent
+        gerundet, Netto und sonstiger Bezug (netto) ergeben sich danach exakt als Differenz der gerundeten Beträge,
+        so wie sie am Lohnzettel stehen. abrechnung_batch rundet mit cent=True nach denselben Regeln.
+        """
+        werte = {feld: in_cent(wert) for feld, wert in zip(self._fields, self)}
+        werte['netto'] = werte['brlohn'] - werte['sv'] - werte['lst']
+        werte['sobz'] = in_cent(self.sobz + self.svsonder + self.lst_sb) - werte['svsonder'] - werte['lst_sb']
+        return Centergebnis(**werte)
+
+
+class Centergebnis(NamedTuple('Centergebnis', [(feld, int) for feld in Abrechnungsergebnis._fields])):
+    """Abrechnungsergebnis in ganzen Cent (siehe Abrechnungsergebnis.in_cent)"""
+    __slots__ = ()
+
+    def in_euro(self) -> Abrechnungsergebnis:
+        """Zurück in € (auf Cent gerundete Beträge)"""
+        return Abrechnungsergebnis(*(cent / 100. for cent in self))
+
+
+def in_cent(betrag: float) -> int:
+    """
+    Betrag in € kaufmännisch auf ganze Cent gerundet (halbe Cent vom Nullpunkt weg)
+    Vor dem Runden wird auf 1e-6 Cent geglättet, damit Rundungsreste der Gleitkommarechnung (Einzel- und
+    Batch-Rechner weichen in der letzten Stelle ab) nicht über eine halbe Cent kippen.
+    """
+    cent = math.floor(round(abs(betrag) * 100. * 1e6) / 1e6 + 0.5)
+    return -cent if betrag < 0 else cent
 
 def count_mondays_in_month(year, month):
-    count = 0
-    for day in range(1, 32):  # Loop through days 1 to 31
-        try:
-            if datetime.date(year, month, day).weekday() == 0:  # 0 is Monday
-                count += 1
-        except ValueError:
-            break  # Break if the day is invalid for the month
-    return count
-
-def calc_brutto2netto(monat : int, jahr : int, stundensatz : float, brutto : float, mehrstunden0 : float = 0., mehrstunden25 : float = 0., mehrstunden50 : float = 0., überstunden50 : float = 0., überstunden100 : float = 0., sonderzahlungen : float = 0., sachbezug : float = 0., diäten : float = 0., reisekosten : float = 0., freibetragsbescheid : float = 0., pendlerpauschale : float = 0., pendlereuro = 0., anzahl_Kinder_AVAB : int = 0, anspruch_fabo : bool = False, gewerkschaftmitglied : bool = False, jahressechstel : float = 0.):
+    """Anzahl der Montage im Monat, aus dem vorberechneten Kalender (kalender.montage)"""
+    return kalender.montage(year, month)
+
+def _sz_resttarif(p: parameter.Parametersatz, rest_altsonder: float) -> tuple:
+    """
+    Tarifstufe der sonstigen Bezüge, in der die bereits versteuerten Sonderzahlungen enden
+    Returns:
+        tuple: (Stufe 1..3 bzw. 0 wenn ausgeschöpft, offener Betrag bis zur Stufengrenze, Zuschlag zur laufenden Lst_Bmg)
+    """
+    stufe = bisect_right(p.lst_sz_rest_grenzen, rest_altsonder) + 1
+    if stufe > len(p.lst_sz_saetze):
+        return 0, 0.0, rest_altsonder - p.LST_SZ_3
+    return stufe, p.lst_sz_rest_grenzen[stufe-1] - rest_altsonder, 0.0
+
+
+def _sz_lst_rest(p: parameter.Parametersatz, basis: float, stufe: int, offen: float) -> tuple:
+    """
+    Besteuert einen sonstigen Bezug ab der offenen Tarifstufe (siehe _sz_resttarif)
+    Returns:
+        tuple: (Lohnsteuer sonstiger Bezug, Zuschlag zur laufenden Lst_Bmg)
+    """
+    if stufe == 0:
+        return 0., basis
+    satz = p.lst_sz_saetze[stufe-1]
+    if offen >= basis:
+        return basis*satz, 0.0
+    if stufe < len(p.lst_sz_saetze):
+        return offen*satz + (basis-offen)*p.lst_sz_saetze[stufe], 0.0
+    return offen*satz, basis-offen
+
+
+def _sz_tarif(p: parameter.Parametersatz, basis: float) -> tuple:
+    """
+    Besteuert einen sonstigen Bezug ohne Vorbezüge nach den Stufen LST_SZ_1..3
+    Returns:
+        tuple: (Lohnsteuer sonstiger Bezug, Zuschlag zur laufenden Lst_Bmg)
+    """
+    stufe = bisect_right(p.lst_sz_grenzen, basis)
+    if stufe == 0:
+        return basis*p.LST_SZ_1_PROZENT, 0.0
+    if stufe == 1:
+        return p.LST_SZ_1*p.LST_SZ_1_PROZENT + (basis-p.LST_SZ_1)*p.LST_SZ_2_PROZENT, 0.0
+    if stufe == 2:
+        return p.LST_SZ_1*p.LST_SZ_1_PROZENT + (p.LST_SZ_2-p.LST_SZ_1)*p.LST_SZ_2_PROZENT + (basis-p.LST_SZ_2)*p.LST_SZ_3_PROZENT, 0.0
+    return (p.LST_SZ_1*p.LST_SZ_1_PROZENT + (p.LST_SZ_2-p.LST_SZ_1)*p.LST_SZ_2_PROZENT + (p.LST_SZ_3-p.LST_SZ_2-p.LST_SZ_1-p.LST_SZ_FREI)*p.LST_SZ_3_PROZENT,
+            basis - p.LST_SZ_3)
+
+def calc_brutto2netto(monat : int, jahr : int, stundensatz : float, brutto : float, mehrstunden0 : float = 0., mehrstunden25 : float = 0., mehrstunden50 : float = 0., überstunden50 : float = 0., überstunden100 : float = 0., sonderzahlungen : float = 0., sachbezug : float = 0., diäten : float = 0., reisekosten : float = 0., freibetragsbescheid : float = 0., pendlerpauschale : float = 0., pendlereuro = 0., anzahl_Kinder_AVAB : int = 0, anspruch_fabo : bool = False, gewerkschaftmitglied : bool = False, jahressechstel : float = 0., altesonder : float = 0., fabo_u18g : int = 0, fabo_u18h : int = 0, fabo_ue18g : int = 0, fabo_ue18h : int = 0, parametersatz : Optional[parameter.Parametersatz] = None) -> Abrechnungsergebnis:
     """
     Berechnet das Netto-Gehalt anhand der gegebenen Parameter
     Einige dieser Parameter sind optional, da selten gebraucht, wichtig ist vor allem aber Monat/Jahr, Stundensatz und Brutto-Gehalt
@@ -114,8 +173,17 @@ def calc_brutto2netto(monat : int, jahr : int, stundensatz : float, brutto : flo
         anspruch_fabo (bool, optional): Soll der Familienbonus Plus berechnet werden?. Defaults to False.
         gewerkschaftmitglied (bool, optional): Ist der Mitarbeiter in der Gewerkschaft?. Defaults to False.
         jahressechstel (float, optional): Jahressechstel (Summe der Bruttobezüge des Jahres durch die bisher ausbezahlten Monate). Defaults to 0..
+        altesonder (float, optional): Brutto der Sonderzahlungen des bisherigen Jahres (nur relevant bei Sonderzahlungen). Defaults to 0..
+        fabo_u18g (int, optional): Kinder unter 18 mit ganzem Familienbonus-Anspruch. Defaults to 0.
+        fabo_u18h (int, optional): Kinder unter 18 mit halbem Familienbonus-Anspruch. Defaults to 0.
+        fabo_ue18g (int, optional): Kinder über 18 mit ganzem Familienbonus-Anspruch. Defaults to 0.
+        fabo_ue18h (int, optional): Kinder über 18 mit halbem Familienbonus-Anspruch. Defaults to 0.
+        parametersatz (parameter.Parametersatz, optional): Rechengrößen, sonst die für Monat/Jahr gültigen. Defaults to None.
+
+    Returns:
+        Abrechnungsergebnis: Netto, SV, Lohnsteuer, sonstige Bezüge und Lohnnebenkosten der Abrechnung
     """
-    
+    p = parametersatz or parameter.fuer_monat(jahr, monat)
 
     teiler1 = 1/(4.33*stundensatz)
     teiler2 = 1./143. / (stundensatz/38.5)
@@ -140,128 +208,87 @@ def calc_brutto2netto(monat : int, jahr : int, stundensatz : float, brutto : flo
 
     brlohn = brlohn + reisekosten
 
-    dienstg_sv = sv_bmg*(SV_DG_PROZENT+SV_DG_IE_PROZENT+SV_DG_WB_PROZENT)
-
-    if sv_bmg < SV_DN_GRENZE_0:
-        sv = sv_bmg * (SV_DN_PROZENT_0 + SV_DN_AK_PROZENT + SV_DN_WB_PROZENT)
-    elif sv_bmg < SV_DN_GRENZE_1:
-        sv = sv_bmg * (SV_DN_PROZENT_1 + SV_DN_AK_PROZENT + SV_DN_WB_PROZENT)
-    elif sv_bmg < SV_DN_GRENZE_2:
-        sv = sv_bmg * (SV_DN_PROZENT_2 + SV_DN_AK_PROZENT + SV_DN_WB_PROZENT)
-    elif sv_bmg > SV_HBGL:
-        sv = SV_HBGL*(SV_DN_PROZENT_3 + SV_DN_AK_PROZENT + SV_DN_WB_PROZENT)
-        dienstg_sv = SV_HBGL*0.2123
+    dienstg_sv = sv_bmg*(p.SV_DG_PROZENT+p.SV_DG_IE_PROZENT+p.SV_DG_WB_PROZENT)
+
+    sv_satz = p.sv_dn_satz(sv_bmg)
+    if sv_bmg > p.SV_HBGL and sv_bmg >= p.SV_DN_GRENZE_2:
+        sv = p.SV_HBGL*(sv_satz + p.SV_DN_AK_PROZENT + p.SV_DN_WB_PROZENT)
+        dienstg_sv = p.SV_HBGL*p.SV_DG_HBGL_PROZENT
     else:
-        sv = sv_bmg*(SV_DN_PROZENT_3 + SV_DN_AK_PROZENT + SV_DN_WB_PROZENT)
+        sv = sv_bmg*(sv_satz + p.SV_DN_AK_PROZENT + p.SV_DN_WB_PROZENT)
 
     lnk_bmg = brlohn - diäten - reisekosten + sachbezug + sonderzahlungen
 
-    kommst = lnk_bmg*KOMM_ST_PROZENT
-    db = lnk_bmg*DB_PROZENT
-    dz = lnk_bmg*DBZ_PROZENT
+    kommst = lnk_bmg*p.KOMM_ST_PROZENT
+    db = lnk_bmg*p.DB_PROZENT
+    dz = lnk_bmg*p.DBZ_PROZENT
 
-    BV = (sv_bmg + sonderzahlungen)*SV_DN_MBV_PROZENT
+    BV = (sv_bmg + sonderzahlungen)*p.SV_DN_MBV_PROZENT
 
-    dga = count_mondays_in_month(year=jahr, month=monat) * DGA_WIEN
+    dga = kalender.montage(jahr, monat) * p.DGA_WIEN
 
     if sachbezug != 0.0:
         pr20 = brlohn*0.2
 
-        if sv_bmg < SV_DN_GRENZE_0:
-            svtemp = sv_bmg * SV_DN_PROZENT_0
-        elif sv_bmg < SV_DN_GRENZE_1:
-            svtemp = sv_bmg * SV_DN_PROZENT_1
-        elif sv_bmg < SV_DN_GRENZE_2:
-            svtemp = sv_bmg * SV_DN_PROZENT_2
-        elif sv_bmg > SV_HBGL:
-            svtemp = SV_HBGL*SV_DN_PROZENT_3
+        if sv_bmg > p.SV_HBGL and sv_bmg >= p.SV_DN_GRENZE_2:
+            svtemp = p.SV_HBGL*sv_satz
         else:
-            svtemp = sv_bmg*SV_DN_PROZENT_3
+            svtemp = sv_bmg*sv_satz
         
         if svtemp > pr20:
             
             dienstg_sv = dienstg_sv + svtemp - pr20
-            if sv_bmg <= SV_HBGL:
-                sv = pr20 + sv_bmg*(SV_DN_AK_PROZENT+SV_DN_WB_PROZENT)
+            if sv_bmg <= p.SV_HBGL:
+                sv = pr20 + sv_bmg*(p.SV_DN_AK_PROZENT+p.SV_DN_WB_PROZENT)
             else:
-                sv = pr20 + SV_HBGL*(SV_DN_AK_PROZENT+SV_DN_WB_PROZENT)
+                sv = pr20 + p.SV_HBGL*(p.SV_DN_AK_PROZENT+p.SV_DN_WB_PROZENT)
 
 
     if sonderzahlungen != 0.:
 
-        altesonder = float(input("Gib das Brutto der Sonderzahlungen des bisherigen Jahres ein:\n"))
-
-        if (altesonder + sonderzahlungen) > (2.*SV_HBGL):
-            restsonder = (2.*SV_HBGL) - altesonder
-            if restsonder > 0.0:
-                if sonderzahlungen < SV_DN_GRENZE_0:
-                    prsvsonder = SV_DN_PROZENT_0
-                    svsonder = restsonder * SV_DN_PROZENT_0
-                elif sonderzahlungen < SV_DN_GRENZE_1:
-                    prsvsonder = SV_DN_PROZENT_1
-                    svsonder = restsonder * SV_DN_PROZENT_1
-                elif sonderzahlungen < SV_DN_GRENZE_2:
-                    prsvsonder = SV_DN_PROZENT_2
-                    svsonder = restsonder * SV_DN_PROZENT_2
-                else:
-                    prsvsonder = SV_DN_PROZENT_3
-                    svsonder = restsonder*SV_DN_PROZENT_3
+        prsvsonder = p.sv_dn_satz(sonderzahlungen)
+        if (altesonder + sonderzahlungen) > (2.*p.SV_HBGL):
+            # Höchstbeitragsgrundlage für Sonderzahlungen bereits ausgeschöpft: keine SV mehr
+            restsonder = max((2.*p.SV_HBGL) - altesonder, 0.0)
+            svsonder = restsonder * prsvsonder
+        elif sonderzahlungen > (2.*p.SV_HBGL) and sonderzahlungen >= p.SV_DN_GRENZE_2:
+            svsonder = (2.*p.SV_HBGL)*prsvsonder
         else:
-
-            if sonderzahlungen < SV_DN_GRENZE_0:
-                prsvsonder = SV_DN_PROZENT_0
-                svsonder = sonderzahlungen * SV_DN_PROZENT_0
-            elif sonderzahlungen < SV_DN_GRENZE_1:
-                prsvsonder = SV_DN_PROZENT_1
-                svsonder = sonderzahlungen * SV_DN_PROZENT_1
-            elif sonderzahlungen < SV_DN_GRENZE_2:
-                prsvsonder = SV_DN_PROZENT_2
-                svsonder = sonderzahlungen * SV_DN_PROZENT_2
-            elif sonderzahlungen > (2.*SV_HBGL):
-                prsvsonder = SV_DN_PROZENT_3
-                svsonder = (2.*SV_HBGL)*SV_DN_PROZENT_3
-            else:
-                prsvsonder = SV_DN_PROZENT_3
-                svsonder = sonderzahlungen*SV_DN_PROZENT_3
+            svsonder = sonderzahlungen * prsvsonder
     else:
         svsonder = 0.
 
-    dienstg_svsonder = sonderzahlungen*(SV_DG_PROZENT+SV_DG_IE_PROZENT)
+    dienstg_svsonder = sonderzahlungen*(p.SV_DG_PROZENT+p.SV_DG_IE_PROZENT)
 
     if anzahl_Kinder_AVAB == 1:
-        av = LST_AVAB_1K
+        av = p.LST_AVAB_1K
     elif anzahl_Kinder_AVAB == 2:
-        av = LST_AVAB_2K
+        av = p.LST_AVAB_2K
     elif anzahl_Kinder_AVAB > 2:
-        av = LST_AVAB_2K + LST_AVAB_3KUND*(anzahl_Kinder_AVAB-2)
+        av = p.LST_AVAB_2K + p.LST_AVAB_3KUND*(anzahl_Kinder_AVAB-2)
     else:
         av = 0.
 
     FaBoP = 0.0
     if anspruch_fabo == True:
-        u18g = int(input("Wie viele Kinder unter 18 mit ganzem Anspruch? (Anzahl)\n"))
-        u18h= int(input("Wie viele Kinder unter 18 mit halbem Anspruch? (Anzahl)\n"))
-        ü18g = int(input("Wie viele Kinder über 18 mit ganzem Anspruch? (Anzahl)\n"))
-        ü18h = int(input("Wie viele Kinder über 18 mit halbem Anspruch? (Anzahl)\n"))
-
-        FaBoP = u18g * FABO_U18G + u18h * FABO_U18H + ü18g * FABO_UE18G + ü18h * FABO_UE18H
+        FaBoP = fabo_u18g * p.FABO_U18G + fabo_u18h * p.FABO_U18H + fabo_ue18g * p.FABO_UE18G + fabo_ue18h * p.FABO_UE18H
 
     if gewerkschaftmitglied:
-        ÖGB_wert = brlohn*OEGB_PROZENT
-        if ÖGB_wert > OEGB_GRENZWERT:
-            ÖGB_wert = OEGB_GRENZWERT
+        ÖGB_wert = brlohn*p.OEGB_PROZENT
+        if ÖGB_wert > p.OEGB_GRENZWERT:
+            ÖGB_wert = p.OEGB_GRENZWERT
     else:
         ÖGB_wert = 0.
 
     ü50zuschl_st = ü50zuschl
     ü100zuschl_st = ü100zuschl
-    if überstunden50 > LST_68_2_STUNDEN:
-        ü50zuschl_st = ü50zuschl/überstunden50*LST_68_2_STUNDEN
-    if ü50zuschl > LST_68_2_WERT:
-        ü50zuschl_st = LST_68_2_WERT
+    if überstunden50 > p.LST_68_2_STUNDEN:
+        ü50zuschl_st = ü50zuschl/überstunden50*p.LST_68_2_STUNDEN
+    if ü50zuschl > p.LST_68_2_WERT:
+        ü50zuschl_st = p.LST_68_2_WERT
 
-    if ü100zuschl > LST_68_1:
-        ü100zuschl_st = LST_68_1
+    if ü100zuschl > p.LST_68_1:
+        ü100zuschl_st = p.LST_68_1
 
     lst_bmg = brlohn + sachbezug - sv - freibetragsbescheid - pendlerpauschale - ü50zuschl_st - ü100zuschl_st - diäten - reisekosten - ÖGB_wert
 
@@ -273,52 +300,13 @@ def calc_brutto2netto(monat : int, jahr : int, stundensatz : float, brutto : flo
                 sv_sb_teil1 = altesonder * prsvsonder
                 rest_altsonder_sv = altesonder - sv_sb_teil1
 
-                rest_altsonder_sv = max(rest_altsonder_sv - LST_SZ_FREI, 0.0)
-
-                if rest_altsonder_sv < LST_SZ_1:
-                    
-                    altsonder_sv = rest_altsonder_sv*LST_SZ_1_PROZENT
-                    restSB_pr = LST_SZ_1_PROZENT
-                    restSB_lstbmg = LST_SZ_1 - rest_altsonder_sv
-
-                elif rest_altsonder_sv < LST_SZ_2:
-
-                    altsonder_sv = LST_SZ_1*LST_SZ_1_PROZENT + (rest_altsonder_sv-LST_SZ_1)*LST_SZ_2_PROZENT
-                    restSB_pr = LST_SZ_2_PROZENT
-                    restSB_lstbmg = LST_SZ_2 - rest_altsonder_sv
-
-                elif rest_altsonder_sv < (LST_SZ_3-LST_SZ_FREI):
-
-                    altsonder_sv = LST_SZ_1*LST_SZ_1_PROZENT + (LST_SZ_2-LST_SZ_1)*LST_SZ_2_PROZENT + (rest_altsonder_sv-LST_SZ_2)*LST_SZ_3_PROZENT
-                    restSB_pr = LST_SZ_3_PROZENT
-                    restSB_lstbmg = (LST_SZ_3-LST_SZ_FREI) - rest_altsonder_sv
-
-                else:
-
-                    altsonder_sv = LST_SZ_1*LST_SZ_1_PROZENT + (LST_SZ_2-LST_SZ_1)*LST_SZ_2_PROZENT + (LST_SZ_3-LST_SZ_2-LST_SZ_1-LST_SZ_FREI)*LST_SZ_3_PROZENT
-                    restSB_lstbmg = 0.0
-                    restSB_pr = 0.0
-                    lst_bmg = lst_bmg + (rest_altsonder_sv - LST_SZ_3)
+                rest_altsonder_sv = max(rest_altsonder_sv - p.LST_SZ_FREI, 0.0)
+                restSB_stufe, restSB_lstbmg, zuschlag = _sz_resttarif(p, rest_altsonder_sv)
+                lst_bmg = lst_bmg + zuschlag
                 
                 if (altesonder+sonderzahlungen)<jahressechstel:
-                    if restSB_pr == 0.0:
-                        lst_bmg = lst_bmg + sonderzahlungen
-                    elif restSB_pr == LST_SZ_1_PROZENT:
-                        if restSB_lstbmg >= sonderzahlungen:
-                            lst_sb = sonderzahlungen*LST_SZ_1_PROZENT
-                        else:
-                            lst_sb = restSB_lstbmg*LST_SZ_1_PROZENT + (sonderzahlungen-restSB_lstbmg)*LST_SZ_2_PROZENT
-                    elif restSB_pr == LST_SZ_2_PROZENT:
-                        if restSB_lstbmg >= sonderzahlungen:
-                            lst_sb = sonderzahlungen*LST_SZ_2_PROZENT
-                        else:
-                            lst_sb = restSB_lstbmg*LST_SZ_2_PROZENT + (sonderzahlungen-restSB_lstbmg)*LST_SZ_3_PROZENT
-                    elif restSB_pr == LST_SZ_3_PROZENT:
-                        if restSB_lstbmg >= sonderzahlungen:
-                            lst_sb = sonderzahlungen*LST_SZ_3_PROZENT
-                        else:
-                            lst_sb = restSB_lstbmg*LST_SZ_3_PROZENT
-                            lst_bmg = lst_bmg + (sonderzahlungen-restSB_lstbmg)
+                    lst_sb, zuschlag = _sz_lst_rest(p, sonderzahlungen, restSB_stufe, restSB_lstbmg)
+                    lst_bmg = lst_bmg + zuschlag
                 else:
 
                     offjahressechstel = jahressechstel - altesonder
@@ -326,169 +314,210 @@ def calc_brutto2netto(monat : int, jahr : int, stundensatz : float, brutto : flo
                     sv_sb_teil2 = svsonder - sv_sb_teil1   
                     lst_bmg_sz = offjahressechstel - sv_sb_teil1
                     lst_bmg = lst_bmg + (sonderzahlungen - offjahressechstel) - sv_sb_teil2
-                    #lst_bmg = lst_bmg + (altesonder-jahressechstel)                                             
-                    if restSB_pr == 0.0:
-                        lst_bmg = lst_bmg + lst_bmg_sz
-                    elif restSB_pr == LST_SZ_1_PROZENT:
-                        if restSB_lstbmg >= lst_bmg_sz:
-                            lst_sb = lst_bmg_sz*LST_SZ_1_PROZENT
-                        else:
-                            lst_sb = restSB_lstbmg*LST_SZ_1_PROZENT + (lst_bmg_sz-restSB_lstbmg)*LST_SZ_2_PROZENT
-                    elif restSB_pr == LST_SZ_2_PROZENT:
-                        if restSB_lstbmg >= lst_bmg_sz:
-                            lst_sb = lst_bmg_sz*LST_SZ_2_PROZENT
-                        else:
-                            lst_sb = restSB_lstbmg*LST_SZ_2_PROZENT + (lst_bmg_sz-restSB_lstbmg)*LST_SZ_3_PROZENT
-                    elif restSB_pr == LST_SZ_3_PROZENT:
-                        if restSB_lstbmg >= lst_bmg_sz:
-                            lst_sb = lst_bmg_sz*LST_SZ_3_PROZENT
-                        else:
-                            lst_sb = restSB_lstbmg*LST_SZ_3_PROZENT
-                            lst_bmg = lst_bmg + (lst_bmg_sz-restSB_lstbmg)
+                    lst_sb, zuschlag = _sz_lst_rest(p, lst_bmg_sz, restSB_stufe, restSB_lstbmg)
+                    lst_bmg = lst_bmg + zuschlag
 
             else:
 
                 sv_sb_teil1 = jahressechstel * prsvsonder
                 sv_sb_teil2 = altesonder*prsvsonder - sv_sb_teil1
-                lst_bmg_sz = jahressechstel - sv_sb_teil1
                 lst_bmg = lst_bmg + (altesonder - jahressechstel) - sv_sb_teil2
                 rest_altsonder_sv = jahressechstel - sv_sb_teil1
 
-                rest_altsonder_sv = max(rest_altsonder_sv - LST_SZ_FREI, 0.0)
-
-                if rest_altsonder_sv < LST_SZ_1:
-                    
-                    altsonder_sv = rest_altsonder_sv*LST_SZ_1_PROZENT
-                    restSB_pr = LST_SZ_1_PROZENT
-                    restSB_lstbmg = LST_SZ_1 - rest_altsonder_sv
+                rest_altsonder_sv = max(rest_altsonder_sv - p.LST_SZ_FREI, 0.0)
+                restSB_stufe, restSB_lstbmg, zuschlag = _sz_resttarif(p, rest_altsonder_sv)
+                lst_bmg = lst_bmg + zuschlag
 
-                elif rest_altsonder_sv < LST_SZ_2:
-
-                    altsonder_sv = LST_SZ_1*LST_SZ_1_PROZENT + (rest_altsonder_sv-LST_SZ_1)*LST_SZ_2_PROZENT
-                    restSB_pr = LST_SZ_2_PROZENT
-                    restSB_lstbmg = LST_SZ_2 - rest_altsonder_sv
-
-                elif rest_altsonder_sv < (LST_SZ_3-LST_SZ_FREI):
-
-                    altsonder_sv = LST_SZ_1*LST_SZ_1_PROZENT + (LST_SZ_2-LST_SZ_1)*LST_SZ_2_PROZENT + (rest_altsonder_sv-LST_SZ_2)*LST_SZ_3_PROZENT
-                    restSB_pr = LST_SZ_3_PROZENT
-                    restSB_lstbmg = (LST_SZ_3-LST_SZ_FREI) - rest_altsonder_sv
-
-                else:
-
-                    altsonder_sv = LST_SZ_1*LST_SZ_1_PROZENT + (LST_SZ_2-LST_SZ_1)*LST_SZ_2_PROZENT + (LST_SZ_3-LST_SZ_2-LST_SZ_1-LST_SZ_FREI)*LST_SZ_3_PROZENT
-                    restSB_lstbmg = 0.0
-                    restSB_pr = 0.0
-                    lst_bmg = lst_bmg + (rest_altsonder_sv - LST_SZ_3)
-                
-                if restSB_pr == 0.0:
-                    lst_bmg = lst_bmg + sonderzahlungen
-                elif restSB_pr == LST_SZ_1_PROZENT:
-                    if restSB_lstbmg >= sonderzahlungen:
-                        lst_sb = sonderzahlungen*LST_SZ_1_PROZENT
-                    else:
-                        lst_sb = restSB_lstbmg*LST_SZ_1_PROZENT + (sonderzahlungen-restSB_lstbmg)*LST_SZ_2_PROZENT
-                elif restSB_pr == LST_SZ_2_PROZENT:
-                    if restSB_lstbmg >= sonderzahlungen:
-                        lst_sb = sonderzahlungen*LST_SZ_2_PROZENT
-                    else:
-                        lst_sb = restSB_lstbmg*LST_SZ_2_PROZENT + (sonderzahlungen-restSB_lstbmg)*LST_SZ_3_PROZENT
-                elif restSB_pr == LST_SZ_3_PROZENT:
-                    if restSB_lstbmg >= sonderzahlungen:
-                        lst_sb = sonderzahlungen*LST_SZ_3_PROZENT
-                    else:
-                        lst_sb = restSB_lstbmg*LST_SZ_3_PROZENT
-                        lst_bmg = lst_bmg + (sonderzahlungen-restSB_lstbmg) 
+                lst_sb, zuschlag = _sz_lst_rest(p, sonderzahlungen, restSB_stufe, restSB_lstbmg)
+                lst_bmg = lst_bmg + zuschlag
 
         else:
                     
             if jahressechstel > sonderzahlungen:
                 lst_bmg_sz = sonderzahlungen - svsonder
-                
-                lst_bmg_sz = lst_bmg_sz - 620.
-
-                if lst_bmg_sz < LST_SZ_1:
-                    lst_sb = lst_bmg_sz*LST_SZ_1_PROZENT
-                else:
-                    if lst_bmg_sz < LST_SZ_2:
-                        lst_sb = LST_SZ_1*LST_SZ_1_PROZENT + (lst_bmg_sz-LST_SZ_1)*LST_SZ_2_PROZENT
-                    else:
-                        if lst_bmg_sz < LST_SZ_3:
-                            lst_sb = LST_SZ_1*LST_SZ_1_PROZENT + (LST_SZ_2-LST_SZ_1)*LST_SZ_2_PROZENT + (lst_bmg_sz-LST_SZ_2)*LST_SZ_3_PROZENT
-                        else:
-                            lst_sb = LST_SZ_1*LST_SZ_1_PROZENT + (LST_SZ_2-LST_SZ_1)*LST_SZ_2_PROZENT + (LST_SZ_3-LST_SZ_2-LST_SZ_1-LST_SZ_FREI)*LST_SZ_3_PROZENT
-                            lst_bmg = lst_bmg + (lst_bmg_sz - LST_SZ_3)
+                lst_bmg_sz = lst_bmg_sz - p.LST_SZ_FREI
             else:
 
                 sv_sb_teil1 = jahressechstel * prsvsonder
                 sv_sb_teil2 = svsonder - sv_sb_teil1
                 lst_bmg_sz = jahressechstel - sv_sb_teil1
                 lst_bmg = lst_bmg + (sonderzahlungen - jahressechstel) - sv_sb_teil2
-                
-                lst_bmg_sz = lst_bmg_sz - LST_SZ_FREI
+                lst_bmg_sz = lst_bmg_sz - p.LST_SZ_FREI
 
-                if lst_bmg_sz < LST_SZ_1:
-                    lst_sb = lst_bmg_sz*LST_SZ_1_PROZENT
-                else:
-                    if lst_bmg_sz < LST_SZ_2:
-                        lst_sb = LST_SZ_1*LST_SZ_1_PROZENT + (lst_bmg_sz-LST_SZ_1)*LST_SZ_2_PROZENT
-                    else:
-                        if lst_bmg_sz < LST_SZ_3:
-                            lst_sb = LST_SZ_1*LST_SZ_1_PROZENT + (LST_SZ_2-LST_SZ_1)*LST_SZ_2_PROZENT + (lst_bmg_sz-LST_SZ_2)*LST_SZ_3_PROZENT
-                        else:
-                            lst_sb = LST_SZ_1*LST_SZ_1_PROZENT + (LST_SZ_2-LST_SZ_1)*LST_SZ_2_PROZENT + (LST_SZ_3-LST_SZ_2-LST_SZ_1-LST_SZ_FREI)*LST_SZ_3_PROZENT
-                            lst_bmg = lst_bmg + (lst_bmg_sz - LST_SZ_3)
+            lst_sb, zuschlag = _sz_tarif(p, lst_bmg_sz)
+            lst_bmg = lst_bmg + zuschlag
 
     else:
         lst_sb = 0.
 
-    if lst_bmg < LST_ST1:
-        lst = lst_bmg*LST_ST1_PROZENT
-    elif lst_bmg < LST_ST2:
-        lst = lst_bmg*LST_ST2_PROZENT - LST_ST2_ABZUG - LST_VAB
-    elif lst_bmg < LST_ST3:
-        lst = lst_bmg*LST_ST3_PROZENT - LST_ST3_ABZUG - LST_VAB
-    elif lst_bmg < LST_ST4:
-        lst = lst_bmg*LST_ST4_PROZENT - LST_ST4_ABZUG - LST_VAB
-    elif lst_bmg < LST_ST5:
-        lst = lst_bmg*LST_ST5_PROZENT - LST_ST5_ABZUG - LST_VAB
-    elif lst_bmg < LST_ST6:
-        lst = lst_bmg*LST_ST6_PROZENT - LST_ST6_ABZUG - LST_VAB
-    else:
-        lst = lst_bmg*LST_ST7_PROZENT - LST_ST7_ABZUG - LST_VAB
+    stufe = p.lst_stufe(lst_bmg)
+    lst = lst_bmg*p.lst_saetze[stufe] - p.lst_abzuege[stufe] - p.lst_vab[stufe]
 
     lst = max(lst - FaBoP, 0.0) - pendlereuro - av
     netto = brlohn - sv - lst
     sobz = sonderzahlungen - svsonder - lst_sb
 
-    string2print = (
-        f"\n{RED}{BOLD}================================================================================{RESET}\n"
-        f"{BOLD}  Der Nettolohn lt Berechnung (2021) ist:{RESET} {GREEN}{BOLD}{netto}€{RESET}\n"
-        f"{RED}{BOLD}================================================================================{RESET}\n\n"
-        f"SV_Bmg: {sv_bmg}€    SV lfd: {sv}€\n"
-        f"Lst_Bmg: {lst_bmg}€   Lohnsteuer: {lst}€\n\n"
-        f"Der sonstige Bezug (netto) ist: {sobz}\n"
-        f"SV-Sonstiger Bezug: {svsonder}€   Lohnsteuer-Sonstiger Bezug: {lst_sb}€\n\n"
-        f"Lohnnebenkosten\n"
-        f"Kommunlasteuer: {kommst}€   U-bahnsteuer: {dga}€   Dienstbeitrag: {db}€   "
-        f"Zuschlag (DB): {dz}€   SV-Dienstgeberbeitrag: {(dienstg_sv + dienstg_svsonder)}€   BV: {BV}€"
+    return Abrechnungsergebnis(
+        netto=netto,
+        sv_bmg=sv_bmg,
+        sv=sv,
+        lst_bmg=lst_bmg,
+        lst=lst,
+        sobz=sobz,
+        svsonder=svsonder,
+        lst_sb=lst_sb,
+        kommst=kommst,
+        dga=dga,
+        db=db,
+        dz=dz,
+        dienstg_sv=dienstg_sv,
+        dienstg_svsonder=dienstg_svsonder,
+        BV=BV,
+        oegb=ÖGB_wert,
+        brlohn=brlohn,
     )
 
-    string2print_farblos = (
-    f"\n================================================================================\n"
-    f"  Der Nettolohn lt Berechnung (2021) ist: {netto}€\n"
-    f"================================================================================\n\n"
-    f"SV_Bmg: {sv_bmg}€    SV lfd: {sv}€\n"
-    f"Lst_Bmg: {lst_bmg}€   Lohnsteuer: {lst}€\n\n"
-    f"Der sonstige Bezug (netto) ist: {sobz}€\n"
-    f"SV-Sonstiger Bezug: {svsonder}€   Lohnsteuer-Sonstiger Bezug: {lst_sb}€\n\n"
-    f"Lohnnebenkosten\n"
-    f"Kommunalsteuer: {kommst}€   U-Bahnsteuer: {dga}€   Dienstbeitrag: {db}€   "
-    f"Zuschlag (DB): {dz}€   SV-Dienstgeberbeitrag: {(dienstg_sv + dienstg_svsonder)}€   BV: {BV}€"
+
+# Obergrenze für calc_brutto2netto_cached (Einträge, älteste werden verdrängt)
+CACHE_GROESSE = 4096
+
+_GANZZAHLIG = {'monat', 'jahr', 'anzahl_Kinder_AVAB', 'fabo_u18g', 'fabo_u18h', 'fabo_ue18g', 'fabo_ue18h'}
+_WAHRHEITSWERTE = {'anspruch_fabo', 'gewerkschaftmitglied'}
+
+# (Name, Normalisierung, Standardwert) aller Eingaben von calc_brutto2netto außer dem Parametersatz
+_EINGABEN = tuple(
+    (name, int if name in _GANZZAHLIG else bool if name in _WAHRHEITSWERTE else float, param.default)
+    for name, param in inspect.signature(calc_brutto2netto).parameters.items() if name != 'parametersatz'
 )
 
 
-    return string2print_farblos
+@lru_cache(maxsize=CACHE_GROESSE)
+def _calc_cached(eingaben: tuple, parametersatz: parameter.Parametersatz) -> Abrechnungsergebnis:
+    return calc_brutto2netto(**{name: wert for (name, _, _), wert in zip(_EINGABEN, eingaben)}, parametersatz=parametersatz)
+
+
+def calc_brutto2netto_cached(parametersatz: Optional[parameter.Parametersatz] = None, **eingaben) -> Abrechnungsergebnis:
+    """
+    calc_brutto2netto mit einem begrenzten LRU-Cache davor
+    Schlüssel sind alle Eingaben in normalisierter Form (fehlende mit Standardwert, Beträge als float, Anzahlen als int)
+    und der gültige Parametersatz, gleiche Gehaltsstrukturen werden so nur einmal gerechnet. Das Ergebnis ist
+    unveränderlich und kann gefahrlos geteilt werden.
+    Args:
+        parametersatz (parameter.Parametersatz, optional): wie bei calc_brutto2netto. Defaults to None.
+        **eingaben: Argumente von calc_brutto2netto (nur als Schlüsselwörter)
+
+    Returns:
+        Abrechnungsergebnis: wie calc_brutto2netto
+    """
+    schluessel = tuple(
+        typ(eingaben[name] if standard is inspect.Parameter.empty else eingaben.get(name, standard))
+        for name, typ, standard in _EINGABEN
+    )
+    p = parametersatz or parameter.fuer_monat(schluessel[1], schluessel[0])
+    return _calc_cached(schluessel, p)
+
+
+def calc_cache_info() -> Dict[str, float]:
+    """Treffer, Fehlzugriffe, Füllstand und Trefferquote von calc_brutto2netto_cached"""
+    info = _calc_cached.cache_info()
+    zugriffe = info.hits + info.misses
+    return {
+        'treffer': info.hits,
+        'fehlzugriffe': info.misses,
+        'eintraege': info.currsize,
+        'maximal': info.maxsize,
+        'trefferquote': info.hits / zugriffe if zugriffe else 0.,
+    }
+
+
+def calc_brutto2netto_cent(**eingaben) -> Centergebnis:
+    """calc_brutto2netto (über den Cache) mit dem Ergebnis in ganzen Cent, siehe Abrechnungsergebnis.in_cent"""
+    return calc_brutto2netto_cached(**eingaben).in_cent()
+
+
+def calc_cache_clear():
+    """Leert den Cache von calc_brutto2netto_cached samt Statistik"""
+    _calc_cached.cache_clear()
+
+
+
+def _illinois(f: Callable[[float], float], lo: float, f_lo: float, hi: float, f_hi: float,
+              toleranz: float, max_iterationen: int) -> tuple:
+    """
+    Modifizierte Regula falsi (Illinois) auf einem Intervall mit f(lo) < 0 <= f(hi)
+    Returns:
+        tuple: (Nullstelle bzw. kleinstes hi mit f(hi) >= 0, Anzahl der Auswertungen)
+    """
+    seite = 0
+    for iteration in range(1, max_iterationen + 1):
+        x = hi - f_hi*(hi-lo)/(f_hi-f_lo) if f_hi != f_lo else (lo+hi)/2.
+        if not lo < x < hi:
+            x = (lo+hi)/2.
+        fx = f(x)
+        if abs(fx) <= toleranz:
+            return x, iteration
+        if fx > 0:
+            hi, f_hi = x, fx
+            if seite == 1:
+                f_lo /= 2.
+            seite = 1
+        else:
+            lo, f_lo = x, fx
+            if seite == -1:
+                f_hi /= 2.
+            seite = -1
+        if hi - lo <= toleranz:
+            break
+    return hi, iteration
+
+
+def calc_netto2brutto(netto: float, monat: int, jahr: int, stundensatz: float = 38.5, toleranz: float = 0.005,
+                      max_iterationen: int = 100, parametersatz: Optional[parameter.Parametersatz] = None,
+                      **eingaben) -> Bruttosuche:
+    """
+    Sucht das Brutto-Gehalt zu einem vereinbarten laufenden Netto (Nettolohnvereinbarung, Angebote)
+    Das Netto steigt mit dem Brutto, springt aber an den SV-Grenzen leicht nach unten. Die Suche klammert
+    deshalb zuerst ein Intervall ein (Brutto 0 bis zur ersten Obergrenze mit ausreichendem Netto) und
+    verkleinert es mit der Illinois-Variante der Regula falsi; liegt das Ziel in einem Sprung, wird das kleinste
+    Brutto geliefert, dessen Netto das Ziel erreicht. Wird das Ziel schon mit Brutto 0 erreicht (Absetzbeträge),
+    ist das Ergebnis 0.
+    Args:
+        netto (float): gewünschtes laufendes Netto (Abrechnungsergebnis.netto)
+        monat (int): Monat der abgerechnet werden soll
+        jahr (int): Jahr das abgerechnet werden soll
+        stundensatz (float, optional): Stundensatz (Stunden/Woche). Defaults to 38.5.
+        toleranz (float, optional): erlaubte Abweichung vom Ziel-Netto in €. Defaults to 0.005.
+        max_iterationen (int, optional): Obergrenze für die Rechenläufe der Suche. Defaults to 100.
+        parametersatz (parameter.Parametersatz, optional): wie bei calc_brutto2netto. Defaults to None.
+        **eingaben: weitere Argumente von calc_brutto2netto (Überstunden, Sachbezug, Absetzbeträge, ...)
+
+    Returns:
+        Bruttosuche: Brutto, Abrechnung zu diesem Brutto und Anzahl der Rechenläufe
+    """
+    p = parametersatz or parameter.fuer_monat(jahr, monat)
+
+    def abweichung(brutto: float) -> float:
+        return calc_brutto2netto(monat=monat, jahr=jahr, stundensatz=stundensatz, brutto=brutto,
+                                 parametersatz=p, **eingaben).netto - netto
+
+    lo, f_lo = 0., abweichung(0.)
+    iterationen = 1
+    if f_lo >= -toleranz:
+        brutto = lo
+    else:
+        hi = max(2.*netto, 100.)
+        f_hi = abweichung(hi)
+        iterationen += 1
+        while f_hi < 0:
+            lo, f_lo = hi, f_hi
+            hi = 2.*hi
+            f_hi = abweichung(hi)
+            iterationen += 1
+        brutto, schritte = _illinois(abweichung, lo, f_lo, hi, f_hi, toleranz, max_iterationen)
+        iterationen += schritte
+    ergebnis = calc_brutto2netto(monat=monat, jahr=jahr, stundensatz=stundensatz, brutto=brutto,
+                                 parametersatz=p, **eingaben)
+    return Bruttosuche(brutto=brutto, ergebnis=ergebnis, iterationen=iterationen)
 
 
 if __name__ == "__main__":
@@ -509,17 +538,22 @@ if __name__ == "__main__":
     # sachbez = float(input("Gib Sachbezug ein:\n"))
     # diäten = float(input("Gib Diäten (km-, Verpflegungsgeld) ein:\n"))
     # reisek = float(input("Gib die Reisekosten (Tag- und Nachtgeld) ein:\n"))
+    # altesonder = float(input("Gib das Brutto der Sonderzahlungen des bisherigen Jahres ein:\n"))
 
     # fbb = float(input("Gib den Freibetragsbescheid an:\n"))
     # PP = float(input("Gib die Pendlerpauschale an:\n"))
     # PEur = float(input("Gib den Pendlereuro ein:\n"))
     # AV_str = int(input("Besteht AlleinVerdiener-/AlleinErzieheranspruch? (Anzahl der Kinder)\n"))
     # FaBoP = True if input("Besteht Anspruch auf den Familienbonus? (y/n)\n").upper() == "Y" else False
+    # u18g = int(input("Wie viele Kinder unter 18 mit ganzem Anspruch? (Anzahl)\n"))
+    # u18h = int(input("Wie viele Kinder unter 18 mit halbem Anspruch? (Anzahl)\n"))
+    # ü18g = int(input("Wie viele Kinder über 18 mit ganzem Anspruch? (Anzahl)\n"))
+    # ü18h = int(input("Wie viele Kinder über 18 mit halbem Anspruch? (Anzahl)\n"))
     # ÖGB = True if input("Ist der Arbeiter/Angestellte Gewerkschaftsmitglied? (y/n):\n").upper() == "Y" else False
 
     # jahressechstel = float(input("Gib das aktuelle Jahressechstel (J/6) an:\n"))
 
-    calc_brutto2netto(
+    ergebnis = calc_brutto2netto(
         monat=monat,
         jahr=jahr,
         stundensatz=stundensatz,
@@ -529,13 +563,15 @@ if __name__ == "__main__":
         # mehrstunden50=mehr50,
         # überstunden50=überst50,
         # überstunden100=überst100,
-        # sonderzahlungen=sonderz,
+        # sonderzahlungen=sonderz, altesonder=altesonder,
         # sachbezug=sachbez,
         # diäten=diäten, reisekosten=reisek, 
         # freibetragsbescheid=fbb, 
         # pendlerpauschale=PP, pendlereuro=PEur, 
         # anzahl_Kinder_AVAB=AV_str, 
         # anspruch_fabo=FaBoP, 
+        # fabo_u18g=u18g, fabo_u18h=u18h, fabo_ue18g=ü18g, fabo_ue18h=ü18h,
         # gewerkschaftmitglied=ÖGB
                       )
+    print(ergebnis.text(farbig=True))
     input("Zum Beenden beliebige Taste drücken!")
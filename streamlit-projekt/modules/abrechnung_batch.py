@@ -0,0 +1,454 @@
+"""
+Vektorisierte Batch-Lohnverrechnung
+Berechnet SV, Lohnsteuer, Lohnnebenkosten und Netto für beliebig viele Abrechnungszeilen
+in einem einzigen NumPy-Durchlauf. Die Formeln entsprechen exakt Abrechnung.calc_brutto2netto,
+nur dass jede if/elif-Kette als Maske über alle Zeilen ausgewertet wird.
+"""
+from typing import Dict, Mapping
+
+import numpy as np
+
+from modules import kalender, parameter
+
+# Eingabespalten (Namen wie lohnverrechnung_dn JOIN steuerliche_vorteile) und Standardwerte
+SPALTEN = {
+    'stundensatz': ('lv_dn_stundensatz', 38.5),
+    'brutto': ('lv_dn_brutto', 0.0),
+    'mehrstunden0': ('lv_dn_mehrstunden0', 0.0),
+    'mehrstunden25': ('lv_dn_mehrstunden25', 0.0),
+    'mehrstunden50': ('lv_dn_mehrstunden50', 0.0),
+    'überstunden50': ('lv_dn_ueberstunden50', 0.0),
+    'überstunden100': ('lv_dn_ueberstunden100', 0.0),
+    'sonderzahlungen': ('lv_dn_sonderzahlungen', 0.0),
+    'sachbezug': ('lv_dn_sachbezug', 0.0),
+    'diäten': ('lv_dn_diäten', 0.0),
+    'reisekosten': ('lv_dn_reisekosten', 0.0),
+    'jahressechstel': ('lv_dn_jahressechstel', 0.0),
+    'freibetragsbescheid': ('stv_freibetrag', 0.0),
+    'pendlerpauschale': ('stv_pendlerpauschale', 0.0),
+    'pendlereuro': ('stv_pendlereuro', 0.0),
+    'anzahl_Kinder_AVAB': ('stv_anzahl_kinder_avab', 0.0),
+    'anspruch_fabo': ('stv_anspruch_fabo', 0.0),
+    'gewerkschaftmitglied': ('stv_gewerkschaft', 0.0),
+    # Nicht Teil von lohnverrechnung_dn, liefert payroll.PayrollManager (Sonderzahlungen bisher, Kinder)
+    'altesonder': ('altesonder', 0.0),
+    'fabo_u18g': ('fabo_u18g', 0.0),
+    'fabo_u18h': ('fabo_u18h', 0.0),
+    'fabo_ue18g': ('fabo_ue18g', 0.0),
+    'fabo_ue18h': ('fabo_ue18h', 0.0),
+}
+
+# Kennzahlen für den noch offenen Tarifbereich der sonstigen Bezüge (restSB_pr im Einzelrechner)
+_SZ_VOLL, _SZ_1, _SZ_2, _SZ_3 = 0, 1, 2, 3
+
+
+def _zeilenanzahl(tabelle: Mapping) -> int:
+    for name in ('lv_dn_monat', 'monat', 'lv_dn_brutto'):
+        if name in tabelle:
+            return len(tabelle[name])
+    raise KeyError("Tabelle braucht mindestens die Spalten 'lv_dn_monat' (oder 'monat'/'jahr') und 'lv_dn_brutto'")
+
+
+def _spalte(tabelle: Mapping, name: str, default: float, n: int) -> np.ndarray:
+    """Liest eine Spalte als float64-Array, fehlende Werte (None/NaN) werden durch den Standardwert ersetzt"""
+    if name not in tabelle:
+        return np.full(n, default, dtype=np.float64)
+    werte = np.asarray(tabelle[name], dtype=np.float64)
+    return np.where(np.isnan(werte), default, werte)
+
+
+def _eingaben(tabelle: Mapping, n: int) -> Dict[str, np.ndarray]:
+    """
+    Alle Eingabespalten (siehe SPALTEN) als float64-Arrays.
+    Ein Stundensatz von 0 oder darunter wird wie im Einzelrechner nicht ersetzt, sondern abgelehnt.
+    """
+    w = {param: _spalte(tabelle, spalte, default, n) for param, (spalte, default) in SPALTEN.items()}
+    ungueltig = np.flatnonzero(w['stundensatz'] <= 0.0)
+    if len(ungueltig):
+        raise ValueError(f"Stundensatz muss größer als 0 sein (Zeilen {ungueltig[:10].tolist()}"
+                         f"{' ...' if len(ungueltig) > 10 else ''})")
+    return w
+
+
+def _monat_jahr(tabelle: Mapping, n: int):
+    """Liefert Monat und Jahr je Zeile, entweder aus 'lv_dn_monat' (YYYY-MM) oder aus 'monat'/'jahr'"""
+    if 'lv_dn_monat' in tabelle:
+        eindeutig, index = np.unique(np.asarray(tabelle['lv_dn_monat'], dtype=str), return_inverse=True)
+        jahr = np.array([int(t[:4]) for t in eindeutig], dtype=np.int64)
+        monat = np.array([int(t[5:7]) for t in eindeutig], dtype=np.int64)
+        return monat[index], jahr[index]
+    return np.asarray(tabelle['monat'], dtype=np.int64), np.asarray(tabelle['jahr'], dtype=np.int64)
+
+
+def _dga(monat: np.ndarray, jahr: np.ndarray, p: parameter.Parametersatz) -> np.ndarray:
+    """U-Bahn-Steuer je Zeile, Montage aus dem vorberechneten Kalender"""
+    return kalender.montage_array(jahr, monat) * p.DGA_WIEN
+
+
+def _sv_dn_satz(bmg: np.ndarray, p: parameter.Parametersatz) -> np.ndarray:
+    """SV-Dienstnehmersatz (ohne AK/WB) nach den Grenzen SV_DN_GRENZE_0..2"""
+    return np.asarray(p.sv_dn_saetze)[np.searchsorted(p.sv_grenzen, bmg, side='right')]
+
+
+def _sz_resttarif(rest_alt: np.ndarray, p: parameter.Parametersatz):
+    """
+    Ermittelt, in welchem Tarifbereich der sonstigen Bezüge die bereits versteuerten Sonderzahlungen enden.
+    Returns:
+        tuple: (Tarifbereich, offener Betrag bis zur nächsten Stufe, Zuschlag zur laufenden Lst_Bmg)
+    """
+    stufe = np.select(
+        [rest_alt < p.LST_SZ_1, rest_alt < p.LST_SZ_2, rest_alt < (p.LST_SZ_3 - p.LST_SZ_FREI)],
+        [_SZ_1, _SZ_2, _SZ_3],
+        _SZ_VOLL,
+    )
+    offen = np.select(
+        [stufe == _SZ_1, stufe == _SZ_2, stufe == _SZ_3],
+        [p.LST_SZ_1 - rest_alt, p.LST_SZ_2 - rest_alt, (p.LST_SZ_3 - p.LST_SZ_FREI) - rest_alt],
+        0.0,
+    )
+    zuschlag = np.where(stufe == _SZ_VOLL, rest_alt - p.LST_SZ_3, 0.0)
+    return stufe, offen, zuschlag
+
+
+def _sz_lst_rest(basis: np.ndarray, stufe: np.ndarray, offen: np.ndarray, p: parameter.Parametersatz):
+    """
+    Besteuert den neuen sonstigen Bezug ab dem offenen Tarifbereich.
+    Returns:
+        tuple: (Lohnsteuer sonstiger Bezug, Zuschlag zur laufenden Lst_Bmg)
+    """
+    passt = offen >= basis
+    lst_sb = np.select(
+        [stufe == _SZ_1, stufe == _SZ_2, stufe == _SZ_3],
+        [
+            np.where(passt, basis * p.LST_SZ_1_PROZENT, offen * p.LST_SZ_1_PROZENT + (basis - offen) * p.LST_SZ_2_PROZENT),
+            np.where(passt, basis * p.LST_SZ_2_PROZENT, offen * p.LST_SZ_2_PROZENT + (basis - offen) * p.LST_SZ_3_PROZENT),
+            np.where(passt, basis * p.LST_SZ_3_PROZENT, offen * p.LST_SZ_3_PROZENT),
+        ],
+        0.0,
+    )
+    zuschlag = np.select(
+        [stufe == _SZ_VOLL, (stufe == _SZ_3) & ~passt],
+        [basis, basis - offen],
+        0.0,
+    )
+    return lst_sb, zuschlag
+
+
+def _sz_lst_tarif(basis: np.ndarray, p: parameter.Parametersatz):
+    """
+    Besteuert einen sonstigen Bezug ohne Vorbezüge nach den Stufen LST_SZ_1..3.
+    Returns:
+        tuple: (Lohnsteuer sonstiger Bezug, Zuschlag zur laufenden Lst_Bmg)
+    """
+    stufe1 = p.LST_SZ_1 * p.LST_SZ_1_PROZENT
+    stufe2 = stufe1 + (p.LST_SZ_2 - p.LST_SZ_1) * p.LST_SZ_2_PROZENT
+    voll = stufe2 + (p.LST_SZ_3 - p.LST_SZ_2 - p.LST_SZ_1 - p.LST_SZ_FREI) * p.LST_SZ_3_PROZENT
+    lst_sb = np.select(
+        [basis < p.LST_SZ_1, basis < p.LST_SZ_2, basis < p.LST_SZ_3],
+        [basis * p.LST_SZ_1_PROZENT, stufe1 + (basis - p.LST_SZ_1) * p.LST_SZ_2_PROZENT, stufe2 + (basis - p.LST_SZ_2) * p.LST_SZ_3_PROZENT],
+        voll,
+    )
+    zuschlag = np.where(basis >= p.LST_SZ_3, basis - p.LST_SZ_3, 0.0)
+    return lst_sb, zuschlag
+
+
+def in_cent(betrag: np.ndarray) -> np.ndarray:
+    """Beträge in € als int64 in ganzen Cent, gleiche Rundung wie Abrechnung.in_cent"""
+    cent = np.floor(np.rint(np.abs(betrag) * 100. * 1e6) / 1e6 + 0.5)
+    return np.where(betrag < 0, -cent, cent).astype(np.int64)
+
+
+def ergebnis_in_cent(ergebnis: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Ergebnisspalten in ganzen Cent mit den Rundungspunkten von Abrechnung.Abrechnungsergebnis.in_cent"""
+    cent = {name: in_cent(werte) for name, werte in ergebnis.items()}
+    cent['netto'] = cent['brlohn'] - cent['sv'] - cent['lst']
+    cent['sobz'] = in_cent(ergebnis['sobz'] + ergebnis['svsonder'] + ergebnis['lst_sb']) - cent['svsonder'] - cent['lst_sb']
+    return cent
+
+
+def calc_brutto2netto_batch(tabelle: Mapping, cent: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Berechnet die Lohnabrechnung für alle Zeilen einer spaltenorientierten Tabelle auf einmal.
+    Die Tabelle kann ein pandas DataFrame oder ein dict aus Listen/NumPy-Arrays sein; Spaltennamen wie in
+    lohnverrechnung_dn JOIN steuerliche_vorteile (siehe SPALTEN). Zusätzlich können 'altesonder' (bisherige
+    Sonderzahlungen des Jahres) und 'fabo_u18g', 'fabo_u18h', 'fabo_ue18g', 'fabo_ue18h' (Kinder für den
+    Familienbonus Plus) übergeben werden. Fehlende Spalten und Werte werden mit den Standardwerten belegt,
+    ein Stundensatz von 0 oder darunter löst einen ValueError aus.
+    Jede Zeile liefert dieselben Zahlen wie Abrechnung.calc_brutto2netto mit dem für ihren Monat gültigen
+    Parametersatz (modules.parameter); Zeilen aus verschiedenen Gültigkeitszeiträumen werden getrennt gerechnet.
+    Args:
+        tabelle (Mapping): Eingabedaten, eine Zeile pro Dienstnehmer und Monat
+        cent (bool, optional): Ergebnis als int64 in ganzen Cent (siehe ergebnis_in_cent). Defaults to False.
+
+    Returns:
+        Dict[str, np.ndarray]: Ergebnisspalten, benannt wie die Felder von Abrechnung.Abrechnungsergebnis
+    """
+    n = _zeilenanzahl(tabelle)
+    w = _eingaben(tabelle, n)
+    monat, jahr = _monat_jahr(tabelle, n)
+    ergebnis = _berechne_alle(w, monat, jahr, n)
+    return ergebnis_in_cent(ergebnis) if cent else ergebnis
+
+
+def calc_netto2brutto_batch(tabelle: Mapping, netto, toleranz: float = 0.005, max_iterationen: int = 100) -> Dict[str, np.ndarray]:
+    """
+    Sucht für alle Zeilen gleichzeitig das Brutto zu einem Ziel-Netto (vektorisierte Variante von
+    Abrechnung.calc_netto2brutto). Die Tabelle ist wie bei calc_brutto2netto_batch aufgebaut, die Spalte
+    lv_dn_brutto wird ignoriert. Jede Runde rechnet nur die noch nicht konvergierten Zeilen.
+    Args:
+        tabelle (Mapping): Eingabedaten, eine Zeile pro Dienstnehmer und Monat
+        netto: Ziel-Netto je Zeile (Array) oder für alle Zeilen (Zahl)
+        toleranz (float, optional): erlaubte Abweichung vom Ziel-Netto in €. Defaults to 0.005.
+        max_iterationen (int, optional): Obergrenze für die Runden der Suche. Defaults to 100.
+
+    Returns:
+        Dict[str, np.ndarray]: 'brutto', 'iterationen' (Rechenläufe je Zeile) und die Ergebnisspalten zum gefundenen Brutto
+    """
+    n = _zeilenanzahl(tabelle)
+    w = _eingaben(tabelle, n)
+    monat, jahr = _monat_jahr(tabelle, n)
+    ziel = np.broadcast_to(np.asarray(netto, dtype=np.float64), (n,)).copy()
+
+    def abweichung(brutto: np.ndarray, zeilen: np.ndarray) -> np.ndarray:
+        teil = {k: v[zeilen] for k, v in w.items()}
+        teil['brutto'] = brutto
+        iterationen[zeilen] += 1
+        return _berechne_alle(teil, monat[zeilen], jahr[zeilen], len(zeilen))['netto'] - ziel[zeilen]
+
+    iterationen = np.zeros(n, dtype=np.int64)
+    alle = np.arange(n)
+    lo = np.zeros(n)
+    f_lo = abweichung(lo, alle)
+    # Ziel schon mit Brutto 0 erreicht (Absetzbeträge) bzw. kein gültiges Ziel
+    brutto = np.where(f_lo >= -toleranz, 0., np.nan)
+    fertig = (f_lo >= -toleranz) | ~np.isfinite(ziel)
+
+    # Obergrenze einklammern: so lange verdoppeln, bis das Netto das Ziel erreicht
+    hi = np.maximum(2. * ziel, 100.)
+    f_hi = np.zeros(n)
+    offen = np.flatnonzero(~fertig)
+    for _ in range(64):
+        if len(offen) == 0:
+            break
+        f_hi[offen] = abweichung(hi[offen], offen)
+        zu_klein = offen[f_hi[offen] < 0]
+        lo[zu_klein], f_lo[zu_klein] = hi[zu_klein], f_hi[zu_klein]
+        hi[zu_klein] *= 2.
+        offen = zu_klein
+
+    # Illinois-Verfahren wie im Einzelrechner, je Zeile mit eigener Seite für die Halbierung
+    seite = np.zeros(n, dtype=np.int8)
+    for _ in range(max_iterationen):
+        zeilen = np.flatnonzero(~fertig)
+        if len(zeilen) == 0:
+            break
+        l, h, fl, fh = lo[zeilen], hi[zeilen], f_lo[zeilen], f_hi[zeilen]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.where(fh != fl, h - fh * (h - l) / (fh - fl), (l + h) / 2.)
+        x = np.where((x > l) & (x < h), x, (l + h) / 2.)
+        fx = abweichung(x, zeilen)
+
+        treffer = np.abs(fx) <= toleranz
+        brutto[zeilen[treffer]] = x[treffer]
+        fertig[zeilen[treffer]] = True
+
+        oben = zeilen[~treffer & (fx > 0)]
+        unten = zeilen[~treffer & ~(fx > 0)]
+        hi[oben], f_hi[oben] = x[~treffer & (fx > 0)], fx[~treffer & (fx > 0)]
+        f_lo[oben[seite[oben] == 1]] /= 2.
+        seite[oben] = 1
+        lo[unten], f_lo[unten] = x[~treffer & ~(fx > 0)], fx[~treffer & ~(fx > 0)]
+        f_hi[unten[seite[unten] == -1]] /= 2.
+        seite[unten] = -1
+
+        eng = zeilen[~treffer]
+        eng = eng[hi[eng] - lo[eng] <= toleranz]
+        brutto[eng] = hi[eng]
+        fertig[eng] = True
+
+    rest = ~fertig
+    brutto[rest] = hi[rest]
+
+    ergebnis = _berechne_alle({**w, 'brutto': brutto}, monat, jahr, n)
+    ergebnis['brutto'] = brutto
+    ergebnis['iterationen'] = iterationen
+    return ergebnis
+
+
+def _berechne_alle(w: Dict[str, np.ndarray], monat: np.ndarray, jahr: np.ndarray, n: int) -> Dict[str, np.ndarray]:
+    """Rechnet jede Zeile mit dem für ihren Monat gültigen Parametersatz"""
+    satz = np.searchsorted(parameter.schluessel(), jahr * 12 + (monat - 1), side='right') - 1
+    satz = np.maximum(satz, 0)
+    saetze = parameter.alle()
+    vorhanden = np.unique(satz)
+    if len(vorhanden) <= 1:
+        return _berechne(w, monat, jahr, n, saetze[int(vorhanden[0]) if len(vorhanden) else 0])
+
+    ergebnis = {}
+    for index in vorhanden:
+        auswahl = satz == index
+        teil = _berechne({k: v[auswahl] for k, v in w.items()}, monat[auswahl], jahr[auswahl],
+                         int(auswahl.sum()), saetze[int(index)])
+        for name, werte in teil.items():
+            ergebnis.setdefault(name, np.empty(n, dtype=np.float64))[auswahl] = werte
+    return ergebnis
+
+
+def _berechne(w: Dict[str, np.ndarray], monat: np.ndarray, jahr: np.ndarray, n: int,
+              p: parameter.Parametersatz) -> Dict[str, np.ndarray]:
+    """Rechenkern von calc_brutto2netto_batch für Zeilen mit demselben Parametersatz"""
+    stundensatz = w['stundensatz']
+    brutto = w['brutto']
+    sachbezug = w['sachbezug']
+    diäten = w['diäten']
+    reisekosten = w['reisekosten']
+    sonderzahlungen = w['sonderzahlungen']
+    altesonder = w['altesonder']
+    jahressechstel = w['jahressechstel']
+    überstunden50 = w['überstunden50']
+
+    # --- Bruttolohn ---
+    teiler1 = 1 / (4.33 * stundensatz)
+    teiler2 = 1. / 143. / (stundensatz / 38.5)
+
+    brlohn = brutto + w['mehrstunden0'] * (brutto * teiler1) * (1. + 0.0)
+    brlohn = brlohn + w['mehrstunden25'] * (brutto * teiler1) * (1. + 0.25)
+    brlohn = brlohn + w['mehrstunden50'] * (brutto * teiler1) * (1. + 0.5)
+
+    ü50grund = überstunden50 * (brutto * teiler2)
+    ü50zuschl = überstunden50 * (brutto * teiler2) * 0.5
+    brlohn = brlohn + ü50grund + ü50zuschl
+
+    ü100grund = w['überstunden100'] * (brutto * teiler2)
+    ü100zuschl = w['überstunden100'] * (brutto * teiler2)
+    brlohn = brlohn + ü100grund + ü100zuschl
+
+    sv_bmg = brlohn + sachbezug
+    brlohn = brlohn + diäten + reisekosten
+
+    # --- SV laufend ---
+    satz = _sv_dn_satz(sv_bmg, p)
+    hbgl = (sv_bmg > p.SV_HBGL) & (sv_bmg >= p.SV_DN_GRENZE_2)
+    sv = np.where(hbgl, p.SV_HBGL * (satz + p.SV_DN_AK_PROZENT + p.SV_DN_WB_PROZENT),
+                  sv_bmg * (satz + p.SV_DN_AK_PROZENT + p.SV_DN_WB_PROZENT))
+    dienstg_sv = np.where(hbgl, p.SV_HBGL * p.SV_DG_HBGL_PROZENT, sv_bmg * (p.SV_DG_PROZENT + p.SV_DG_IE_PROZENT + p.SV_DG_WB_PROZENT))
+
+    # --- Lohnnebenkosten ---
+    lnk_bmg = brlohn - diäten - reisekosten + sachbezug + sonderzahlungen
+    kommst = lnk_bmg * p.KOMM_ST_PROZENT
+    db = lnk_bmg * p.DB_PROZENT
+    dz = lnk_bmg * p.DBZ_PROZENT
+    BV = (sv_bmg + sonderzahlungen) * p.SV_DN_MBV_PROZENT
+    dga = _dga(monat, jahr, p)
+
+    # --- Sachbezug: SV-DN-Anteil höchstens 20% des Bruttolohns ---
+    pr20 = brlohn * 0.2
+    svtemp = np.where(hbgl, p.SV_HBGL * satz, sv_bmg * satz)
+    deckel = (sachbezug != 0.0) & (svtemp > pr20)
+    dienstg_sv = np.where(deckel, dienstg_sv + svtemp - pr20, dienstg_sv)
+    sv = np.where(deckel, pr20 + np.minimum(sv_bmg, p.SV_HBGL) * (p.SV_DN_AK_PROZENT + p.SV_DN_WB_PROZENT), sv)
+
+    # --- SV sonstige Bezüge ---
+    hat_sz = sonderzahlungen != 0.0
+    prsvsonder = _sv_dn_satz(sonderzahlungen, p)
+    restsonder = (2. * p.SV_HBGL) - altesonder
+    svsonder = np.where(
+        (altesonder + sonderzahlungen) > (2. * p.SV_HBGL),
+        np.where(restsonder > 0.0, restsonder * prsvsonder, 0.0),
+        np.minimum(sonderzahlungen, 2. * p.SV_HBGL) * prsvsonder,
+    )
+    svsonder = np.where(hat_sz, svsonder, 0.)
+    dienstg_svsonder = sonderzahlungen * (p.SV_DG_PROZENT + p.SV_DG_IE_PROZENT)
+
+    # --- Absetzbeträge ---
+    kinder = w['anzahl_Kinder_AVAB']
+    av = np.select(
+        [kinder == 1, kinder == 2, kinder > 2],
+        [p.LST_AVAB_1K, p.LST_AVAB_2K, p.LST_AVAB_2K + p.LST_AVAB_3KUND * (kinder - 2)],
+        0.,
+    )
+    FaBoP = np.where(
+        w['anspruch_fabo'] != 0.0,
+        w['fabo_u18g'] * p.FABO_U18G + w['fabo_u18h'] * p.FABO_U18H + w['fabo_ue18g'] * p.FABO_UE18G + w['fabo_ue18h'] * p.FABO_UE18H,
+        0.0,
+    )
+    ÖGB_wert = np.where(w['gewerkschaftmitglied'] != 0.0, np.minimum(brlohn * p.OEGB_PROZENT, p.OEGB_GRENZWERT), 0.)
+
+    # --- Steuerfreie Überstundenzuschläge (§68) ---
+    ü50zuschl_st = np.where(
+        überstunden50 > p.LST_68_2_STUNDEN,
+        np.divide(ü50zuschl, überstunden50, out=np.zeros(n), where=überstunden50 > p.LST_68_2_STUNDEN) * p.LST_68_2_STUNDEN,
+        ü50zuschl,
+    )
+    ü50zuschl_st = np.where(ü50zuschl > p.LST_68_2_WERT, p.LST_68_2_WERT, ü50zuschl_st)
+    ü100zuschl_st = np.where(ü100zuschl > p.LST_68_1, p.LST_68_1, ü100zuschl)
+
+    lst_bmg = (brlohn + sachbezug - sv - w['freibetragsbescheid'] - w['pendlerpauschale'] - ü50zuschl_st - ü100zuschl_st
+               - diäten - reisekosten - ÖGB_wert)
+
+    # --- Lohnsteuer sonstige Bezüge: vier Fälle wie im Einzelrechner ---
+    alt = altesonder != 0.0
+    fall_a = hat_sz & alt & (altesonder < jahressechstel)        # Vorbezüge unter dem Jahressechstel
+    fall_b = hat_sz & alt & ~(altesonder < jahressechstel)       # Vorbezüge haben das Jahressechstel erreicht
+    fall_c = hat_sz & ~alt & (jahressechstel > sonderzahlungen)  # erster sonstiger Bezug innerhalb des Sechstels
+    fall_d = hat_sz & ~alt & ~(jahressechstel > sonderzahlungen) # erster sonstiger Bezug über dem Sechstel
+
+    # Fall A
+    rest_a = np.maximum(altesonder - altesonder * prsvsonder - p.LST_SZ_FREI, 0.0)
+    stufe_a, offen_a, zuschlag_a = _sz_resttarif(rest_a, p)
+    innerhalb = (altesonder + sonderzahlungen) < jahressechstel
+    offjahressechstel = jahressechstel - altesonder
+    teil1_a = offjahressechstel * prsvsonder
+    basis_a = np.where(innerhalb, sonderzahlungen, offjahressechstel - teil1_a)
+    zuschlag_a = zuschlag_a + np.where(innerhalb, 0.0, (sonderzahlungen - offjahressechstel) - (svsonder - teil1_a))
+    lst_sb_a, zuschlag_a2 = _sz_lst_rest(basis_a, stufe_a, offen_a, p)
+
+    # Fall B
+    teil1_b = jahressechstel * prsvsonder
+    rest_b = np.maximum(jahressechstel - teil1_b - p.LST_SZ_FREI, 0.0)
+    stufe_b, offen_b, zuschlag_b = _sz_resttarif(rest_b, p)
+    zuschlag_b = zuschlag_b + (altesonder - jahressechstel) - (altesonder * prsvsonder - teil1_b)
+    lst_sb_b, zuschlag_b2 = _sz_lst_rest(sonderzahlungen, stufe_b, offen_b, p)
+
+    # Fall C
+    lst_sb_c, zuschlag_c = _sz_lst_tarif(sonderzahlungen - svsonder - p.LST_SZ_FREI, p)
+
+    # Fall D
+    teil1_d = jahressechstel * prsvsonder
+    lst_sb_d, zuschlag_d = _sz_lst_tarif(jahressechstel - teil1_d - p.LST_SZ_FREI, p)
+    zuschlag_d = zuschlag_d + (sonderzahlungen - jahressechstel) - (svsonder - teil1_d)
+
+    lst_sb = np.select([fall_a, fall_b, fall_c, fall_d], [lst_sb_a, lst_sb_b, lst_sb_c, lst_sb_d], 0.)
+    lst_bmg = lst_bmg + np.select(
+        [fall_a, fall_b, fall_c, fall_d],
+        [zuschlag_a + zuschlag_a2, zuschlag_b + zuschlag_b2, zuschlag_c, zuschlag_d],
+        0.,
+    )
+
+    # --- Lohnsteuer laufend ---
+    stufe = np.searchsorted(p.lst_grenzen, lst_bmg, side='right')
+    lst = lst_bmg * np.asarray(p.lst_saetze)[stufe] - np.asarray(p.lst_abzuege)[stufe] - np.asarray(p.lst_vab)[stufe]
+
+    lst = np.maximum(lst - FaBoP, 0.0) - w['pendlereuro'] - av
+    netto = brlohn - sv - lst
+    sobz = sonderzahlungen - svsonder - lst_sb
+
+    return {
+        'netto': netto,
+        'sv_bmg': sv_bmg,
+        'sv': sv,
+        'lst_bmg': lst_bmg,
+        'lst': lst,
+        'sobz': sobz,
+        'svsonder': svsonder,
+        'lst_sb': lst_sb,
+        'kommst': kommst,
+        'dga': dga,
+        'db': db,
+        'dz': dz,
+        'dienstg_sv': dienstg_sv,
+        'dienstg_svsonder': dienstg_svsonder,
+        'BV': BV,
+        'oegb': ÖGB_wert,
+        'brlohn': brlohn,
+    }
@@ -0,0 +1,211 @@
+"""
+Aufrollung (rückwirkende Neuberechnung) der Lohnverrechnung
+Wird eine vergangene Abrechnung, die steuerlichen Vorteile oder ein Parametersatz korrigiert, ändern sich
+über Jahressechstel und die bisherigen Sonderzahlungen alle späteren Monate desselben Jahres. Die Aufrollung
+geht je Mitarbeiter die Monate ab dem korrigierten Monat der Reihe nach durch, führt die Jahressummen
+inkrementell mit und rechnet nur Monate neu, deren Eingaben (Input-Hash in lohnverrechnung_ergebnis) sich
+geändert haben. Die Differenz zum bisher gespeicherten Ergebnis landet als Korrekturbuchung in
+lohnverrechnung_aufrollung, alles in einer Transaktion.
+
+Aufruf aus dem Verzeichnis streamlit-projekt:
+    python -m modules.aufrollung 2025-03 --empl-id 26 --anlass "Pendlerpauschale rückwirkend"
+"""
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from modules import Abrechnung, dbms, monatslauf, payroll
+
+DB_PATH = Path(__file__).parent.parent / "stammdatenverwaltung.db"
+
+# lohnverrechnung_dn-Spalten, die eine Aufrollung braucht
+LV_DN_SPALTEN = ['lv_dn_empl_id', 'lv_dn_monat'] + monatslauf.LV_DN_SPALTEN
+
+
+def _lade_abrechnungen(cursor, ab_monat: str, empl_ids: Optional[Sequence[int]]) -> Dict[int, List[Dict]]:
+    """Alle Abrechnungen des Jahres von ab_monat (ab Jänner, für die Jahressummen) je Mitarbeiter in Monatsreihenfolge"""
+    filter_sql, werte = '', [f"{ab_monat[:4]}-01", f"{ab_monat[:4]}-12"]
+    if empl_ids is not None:
+        filter_sql = f"AND lv_dn_empl_id IN ({', '.join('?' * len(empl_ids))})"
+        werte += list(empl_ids)
+    cursor.execute(f'''
+        SELECT {", ".join(LV_DN_SPALTEN)}
+        FROM lohnverrechnung_dn
+        WHERE lv_dn_monat >= ? AND lv_dn_monat <= ? {filter_sql}
+        ORDER BY lv_dn_empl_id, lv_dn_monat
+    ''', werte)
+    abrechnungen = {}
+    for row in cursor.fetchall():
+        record = dict(zip(LV_DN_SPALTEN, row))
+        abrechnungen.setdefault(record['lv_dn_empl_id'], []).append(record)
+    return abrechnungen
+
+
+def _lade_steuerliche_vorteile(cursor) -> Dict[int, Dict]:
+    cursor.execute(f"SELECT stv_empl_id, {', '.join(monatslauf.STV_SPALTEN)} FROM steuerliche_vorteile")
+    return {row[0]: {name: wert or 0 for name, wert in zip(monatslauf.STV_SPALTEN.values(), row[1:])}
+            for row in cursor.fetchall()}
+
+
+def _lade_ergebnisse(cursor, ab_monat: str) -> Dict[int, tuple]:
+    """Gespeicherte Ergebnisse (Input-Hash, Abrechnungsergebnis) je lv_dn_id ab dem Monat bis Jahresende"""
+    cursor.execute(f'''
+        SELECT le_lv_dn_id, le_input_hash, {", ".join(payroll.ERGEBNIS_SPALTEN)}
+        FROM lohnverrechnung_ergebnis WHERE le_monat >= ? AND le_monat <= ?
+    ''', (ab_monat, f"{ab_monat[:4]}-12"))
+    return {row[0]: (row[1], Abrechnung.Abrechnungsergebnis(*row[2:])) for row in cursor.fetchall()}
+
+
+def _differenz(neu: Abrechnung.Abrechnungsergebnis, alt: Abrechnung.Abrechnungsergebnis) -> Optional[Abrechnung.Abrechnungsergebnis]:
+    """Differenz neu - alt auf Cent genau, None wenn sich kein Betrag um mindestens einen Cent ändert"""
+    cent = [n - a for n, a in zip(neu.in_cent(), alt.in_cent())]
+    if not any(cent):
+        return None
+    return Abrechnung.Centergebnis(*cent).in_euro()
+
+
+def aufrollen(db_path: str, ab_monat: str, empl_ids: Optional[Sequence[int]] = None, anlass: str = '') -> Dict:
+    """
+    Rollt die Abrechnungen ab ab_monat (YYYY-MM) bis Jahresende neu auf.
+    Jahressummen und (automatisch ermittelte) Jahressechstel werden ab dem Monat neu aufgebaut, neu berechnet
+    werden nur Monate mit geändertem Input-Hash. Ein Jahressechstel, das bei der Erfassung händisch
+    eingegeben wurde (passt nicht zu den laufenden Bezügen der gespeicherten Ergebnisse), bleibt unverändert.
+    Args:
+        db_path (str): Pfad zur SQLite-Datenbank
+        ab_monat (str): erster korrigierter Monat
+        empl_ids (Sequence[int], optional): nur diese Mitarbeiter, None für alle. Defaults to None.
+        anlass (str, optional): Grund der Aufrollung für die Korrekturbuchungen. Defaults to ''.
+
+    Returns:
+        Dict: 'monate' (geprüft), 'neu_berechnet', 'korrekturen' (je Monat mit Differenz: EMPL_ID, monat,
+        lv_dn_id, differenz als Abrechnungsergebnis) und 'dauer' in Sekunden
+    """
+    start = time.perf_counter()
+    manager = payroll.PayrollManager(db_path)
+    kinder = monatslauf.lade_kinder(db_path)
+    aufgerollt_am = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    geprueft, neu_berechnet, korrekturen, neu = 0, 0, [], []
+    conn = dbms.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        abrechnungen = _lade_abrechnungen(cursor, ab_monat, empl_ids)
+        vorteile = _lade_steuerliche_vorteile(cursor)
+        gespeichert = _lade_ergebnisse(cursor, ab_monat)
+
+        for empl_id, records in abrechnungen.items():
+            tax_benefits = vorteile.get(empl_id, {name: 0 for name in monatslauf.STV_SPALTEN.values()})
+            summen = {'laufend': 0., 'sonderzahlungen': 0., 'monate': 0}
+            # Laufende Bezüge laut bisher gespeicherten Ergebnissen, daran wird ein automatisches Jahressechstel erkannt
+            alt_laufend = 0.
+            for record in records:
+                laufend, sonder = manager._jahressummen_anteil(record)
+                monat = record['lv_dn_monat']
+                alt_hash, alt = gespeichert.get(record['lv_dn_id'], (None, None))
+                alt_eigen = alt.sv_bmg if alt is not None else laufend
+                if monat >= ab_monat:
+                    geprueft += 1
+                    jahressechstel = record['lv_dn_jahressechstel'] or 0.
+                    vorher_alt = {'laufend': alt_laufend, 'monate': summen['monate']}
+                    automatisch = (
+                        not jahressechstel
+                        or abs(jahressechstel - manager._jahressechstel(vorher_alt, alt_eigen)) < 0.005
+                        or abs(jahressechstel - manager._jahressechstel(vorher_alt, laufend)) < 0.005
+                    )
+                    if automatisch:
+                        record['lv_dn_jahressechstel'] = manager._jahressechstel(summen, laufend)
+                        if record['lv_dn_jahressechstel'] != jahressechstel:
+                            cursor.execute('UPDATE lohnverrechnung_dn SET lv_dn_jahressechstel = ? WHERE lv_dn_id = ?',
+                                           (record['lv_dn_jahressechstel'], record['lv_dn_id']))
+
+                    altesonder = summen['sonderzahlungen'] if record.get('lv_dn_sonderzahlungen') else 0.
+                    fabo_kinder = None
+                    if tax_benefits['anspruch_fabo']:
+                        fabo_kinder = manager.zaehle_fabo_kinder(kinder.get(empl_id, []), monat)
+                    params = manager.build_calc_params(record, tax_benefits, altesonder, fabo_kinder)
+                    input_hash = manager.result_hash(params)
+                    if input_hash != alt_hash:
+                        neu_berechnet += 1
+                        ergebnis = Abrechnung.calc_brutto2netto_cached(**params)
+                        neu.append((record, input_hash, ergebnis))
+                        differenz = _differenz(ergebnis, alt) if alt is not None else None
+                        if differenz is not None:
+                            cursor.execute(f'''
+                                INSERT INTO lohnverrechnung_aufrollung (
+                                    la_lv_dn_id, la_empl_id, la_monat, la_aufgerollt_am, la_anlass,
+                                    {", ".join(payroll.KORREKTUR_SPALTEN)}
+                                ) VALUES (?, ?, ?, ?, ?, {", ".join("?" * len(payroll.KORREKTUR_SPALTEN))})
+                            ''', (record['lv_dn_id'], empl_id, monat, aufgerollt_am, anlass, *differenz))
+                            korrekturen.append({'EMPL_ID': empl_id, 'monat': monat, 'lv_dn_id': record['lv_dn_id'],
+                                                'differenz': differenz})
+
+                alt_laufend += alt_eigen
+                summen = {
+                    'laufend': summen['laufend'] + laufend,
+                    'sonderzahlungen': summen['sonderzahlungen'] + sonder,
+                    'monate': summen['monate'] + 1,
+                }
+                if monat >= ab_monat:
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO lohnverrechnung_jahressummen (
+                            ljs_empl_id, ljs_monat, ljs_laufend_kumuliert, ljs_sonder_kumuliert, ljs_monate
+                        ) VALUES (?, ?, ?, ?, ?)
+                    ''', (empl_id, monat, summen['laufend'], summen['sonderzahlungen'], summen['monate']))
+        manager._store_payroll_results(cursor, neu)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {
+        'ab_monat': ab_monat,
+        'mitarbeiter': len(abrechnungen),
+        'monate': geprueft,
+        'neu_berechnet': neu_berechnet,
+        'korrekturen': korrekturen,
+        'dauer': time.perf_counter() - start,
+    }
+
+
+def get_korrekturen(db_path: str, empl_id: Optional[int] = None) -> List[Dict]:
+    """Gespeicherte Korrekturbuchungen (neueste zuerst), optional nur für einen Mitarbeiter"""
+    conn = dbms.connect(db_path)
+    cursor = conn.cursor()
+    filter_sql, werte = ('WHERE la_empl_id = ?', (empl_id,)) if empl_id is not None else ('', ())
+    cursor.execute(f'''
+        SELECT la_empl_id, la_monat, la_aufgerollt_am, la_anlass, {", ".join(payroll.KORREKTUR_SPALTEN)}
+        FROM lohnverrechnung_aufrollung {filter_sql}
+        ORDER BY la_aufgerollt_am DESC, la_empl_id, la_monat
+    ''', werte)
+    rows = cursor.fetchall()
+    conn.close()
+    return [
+        {'EMPL_ID': row[0], 'monat': row[1], 'aufgerollt_am': row[2], 'anlass': row[3],
+         'differenz': Abrechnung.Abrechnungsergebnis(*row[4:])}
+        for row in rows
+    ]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Aufrollung der Lohnverrechnung ab einem Monat bis Jahresende")
+    parser.add_argument("monat", help="Erster korrigierter Monat im Format YYYY-MM")
+    parser.add_argument("--db", default=str(DB_PATH), help="Pfad zur SQLite-Datenbank")
+    parser.add_argument("--empl-id", type=int, nargs="+", default=None, help="Nur diese Mitarbeiter (Standard: alle)")
+    parser.add_argument("--anlass", default="", help="Grund der Aufrollung")
+    args = parser.parse_args(argv)
+
+    lauf = aufrollen(args.db, args.monat, args.empl_id, args.anlass)
+    for korrektur in lauf['korrekturen']:
+        differenz = korrektur['differenz']
+        print(f"{korrektur['EMPL_ID']:>6}  {korrektur['monat']}  Netto {differenz.netto + differenz.sobz:>+10.2f}  "
+              f"LSt {differenz.lst + differenz.lst_sb:>+10.2f}  SV {differenz.sv + differenz.svsonder:>+10.2f}")
+    print(f"{lauf['mitarbeiter']} Mitarbeiter, {lauf['monate']} Monate geprüft, {lauf['neu_berechnet']} neu berechnet, "
+          f"{len(lauf['korrekturen'])} Korrekturen, {lauf['dauer']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,9 @@ Authentication module for the Streamlit application
 Implements login functionality with user management and session handling
 """
 import streamlit as st
-import sqlite3
 from pathlib import Path
 from datetime import datetime
-from modules import hashing
+from modules import dbms, hashing
 
 class AuthManager:
     def __init__(self, db_path: str):
@@ -16,7 +15,7 @@ class AuthManager:
     
     def ensure_user_table(self):
         """Ensure the Benutzer table exists and has correct structure"""
-        conn = sqlite3.connect(self.db_path)
+        conn = dbms.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -38,7 +37,7 @@ class AuthManager:
     
     def user_exists(self, username: str) -> bool:
         """Check if user exists"""
-        conn = sqlite3.connect(self.db_path)
+        conn = dbms.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('SELECT COUNT(*) FROM Benutzer WHERE username = ?', (username,))
         count = cursor.fetchone()[0]
@@ -54,7 +53,7 @@ class AuthManager:
             created_on = datetime.now().isoformat()
             password_hash, _ = hashing.PasswordHasher.hash_password(password, created_on)
             
-            conn = sqlite3.connect(self.db_path)
+            conn = dbms.connect(self.db_path)
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO Benutzer (username, password_hash, is_admin, created_on)
@@ -69,7 +68,7 @@ class AuthManager:
     
     def verify_login(self, username: str, password: str) -> tuple[bool, dict]:
         """Verify user login credentials"""
-        conn = sqlite3.connect(self.db_path)
+        conn = dbms.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('''
             SELECT ID, username, password_hash, is_admin, created_on 
@@ -94,7 +93,7 @@ class AuthManager:
     
     def get_all_users(self) -> list:
         """Get all users (admin only)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = dbms.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('SELECT ID, username, is_admin, created_on FROM Benutzer')
         users = cursor.fetchall()
@@ -0,0 +1,341 @@
+"""
+Benchmark- und Regressionslauf für die Lohnverrechnung
+Misst die Latenz von Abrechnung.calc_brutto2netto je Aufruf und den Durchsatz von
+abrechnung_batch.calc_brutto2netto_batch über synthetische Belegschaften (Standard 1k/10k/100k Zeilen)
+und prüft die Ergebnisse gegen Referenzwerte in ganzen Cent:
+    - Grenzfälle (GRENZFAELLE: HBGL, Sachbezug 20%-Regel, Sonderzahlungen über dem Jahressechstel, §68 EStG)
+    - Prüfsummen der Cent-Ergebnisse jeder synthetischen Belegschaft
+    - Einzel- und Batch-Rechner müssen auf den Cent übereinstimmen
+Zusätzlich wird die Renderzeit je Dokument für Lohnzettel und Stammdatenblatt gemessen (ohne PDF-Cache,
+mit den vorgezeichneten statischen Ebenen aus pdf_vorlage).
+Die Referenzwerte und Messungen liegen in benchmark_baseline.json. Weicht ein Ergebnis ab, endet der Lauf
+mit Exit-Code 1. Zeitmessungen hängen vom Rechner ab: Rückgänge von Durchsatz, Latenz und Renderzeit über
+die Toleranz werden nur als Hinweis ausgegeben, außer mit --leistung gegen eine Baseline, die auf demselben
+Rechner aufgezeichnet wurde.
+
+Aufruf aus dem Verzeichnis streamlit-projekt:
+    python -m modules.benchmark                      # Ergebnisse gegen die Baseline prüfen
+    python -m modules.benchmark --leistung           # zusätzlich Zeitmessungen prüfen (Baseline vom selben Rechner)
+    python -m modules.benchmark --baseline-schreiben # Baseline neu aufzeichnen
+"""
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from modules import Abrechnung, abrechnung_batch, lohnzettel, stammdatenblatt
+
+BASELINE_PATH = Path(__file__).parent.parent / "benchmark_baseline.json"
+
+GROESSEN = (1_000, 10_000, 100_000)
+
+# Zulässiger Rückgang von Durchsatz/Latenz gegenüber der Baseline (Anteil)
+TOLERANZ = 0.25
+
+# Einzelaufrufe für die Latenzmessung und Zeilen je Belegschaft für den Vergleich Einzel- gegen Batch-Rechner
+LATENZ_AUFRUFE = 2_000
+STICHPROBE = 250
+
+# Dokumente je PDF-Messung
+PDF_DOKUMENTE = 200
+
+# Grenzfälle der Abrechnung (Argumente von calc_brutto2netto), Referenz in Cent in der Baseline
+GRENZFAELLE = {
+    'standard': dict(brutto=3000.),
+    'geringfuegig': dict(brutto=500.),
+    'hbgl_genau': dict(brutto=6450.),
+    'hbgl_ueberschritten': dict(brutto=9000.),
+    'sachbezug_unter_20_prozent': dict(brutto=3000., sachbezug=150.),
+    'sachbezug_ueber_20_prozent': dict(brutto=1200., sachbezug=1500.),
+    'sachbezug_ueber_hbgl': dict(brutto=6000., sachbezug=800.),
+    'sonderzahlung_im_jahressechstel': dict(brutto=3000., sonderzahlungen=3000., jahressechstel=6000.),
+    'sonderzahlung_ueber_jahressechstel': dict(brutto=3000., sonderzahlungen=8000., jahressechstel=5000.),
+    'sonderzahlung_vorbezuege_ueber_jahressechstel': dict(brutto=3000., sonderzahlungen=2000., jahressechstel=5000., altesonder=6000.),
+    'sonderzahlung_teilweise_im_jahressechstel': dict(brutto=3000., sonderzahlungen=4000., jahressechstel=6000., altesonder=3000.),
+    'sonderzahlung_ueber_hbgl': dict(brutto=8000., sonderzahlungen=16000., jahressechstel=16000.),
+    'sonderzahlung_hohe_vorbezuege': dict(brutto=9000., sonderzahlungen=9000., jahressechstel=30000., altesonder=30000.),
+    'ueberstunden_68_2_innerhalb': dict(brutto=3000., überstunden50=10.),
+    'ueberstunden_68_2_ueber_18_stunden': dict(brutto=3000., überstunden50=30.),
+    'ueberstunden_68_2_wertgrenze': dict(brutto=6000., überstunden50=18.),
+    'ueberstunden_68_1_deckel': dict(brutto=5000., überstunden100=40.),
+    'ueberstunden_gemischt': dict(brutto=3500., mehrstunden25=4., überstunden50=25., überstunden100=12.),
+    'teilzeit_mehrstunden': dict(brutto=1800., stundensatz=20., mehrstunden0=5., mehrstunden25=6., mehrstunden50=3.),
+    'absetzbetraege_familienbonus': dict(brutto=3200., anzahl_Kinder_AVAB=2, anspruch_fabo=True, fabo_u18g=1, fabo_ue18h=1),
+    'pendler_freibetrag_gewerkschaft': dict(brutto=2800., pendlerpauschale=58., pendlereuro=8., freibetragsbescheid=100., gewerkschaftmitglied=True),
+    'diaeten_reisekosten': dict(brutto=2500., diäten=50., reisekosten=30.),
+}
+
+
+def _grenzfall(name: str) -> Dict:
+    """Vollständige Eingaben eines Grenzfalls (Abrechnungsmonat März 2025, 38,5 Stunden)"""
+    return {'monat': 3, 'jahr': 2025, 'stundensatz': 38.5, **GRENZFAELLE[name]}
+
+
+def belegschaft(n: int, seed: int = 2025) -> Dict[str, np.ndarray]:
+    """
+    Synthetische Abrechnungszeilen (Spalten wie abrechnung_batch.SPALTEN plus 'monat'/'jahr'),
+    reproduzierbar über den Seed; die Anteile der Sonderfälle sind bewusst höher als in echten Daten.
+    """
+    rng = np.random.default_rng(seed)
+
+    def anteil(p: float, werte: np.ndarray) -> np.ndarray:
+        return np.where(rng.random(n) < p, werte, 0.)
+
+    brutto = np.round(rng.lognormal(np.log(3200.), 0.45, n), 2)
+    monat = rng.integers(1, 13, n)
+    return {
+        'monat': monat,
+        'jahr': np.full(n, 2025),
+        'lv_dn_stundensatz': rng.choice([20., 30., 38.5, 40.], n, p=[.1, .1, .7, .1]),
+        'lv_dn_brutto': brutto,
+        'lv_dn_mehrstunden0': anteil(.05, rng.integers(1, 10, n).astype(float)),
+        'lv_dn_mehrstunden25': anteil(.05, rng.integers(1, 10, n).astype(float)),
+        'lv_dn_mehrstunden50': anteil(.03, rng.integers(1, 6, n).astype(float)),
+        'lv_dn_ueberstunden50': anteil(.2, rng.integers(1, 40, n).astype(float)),
+        'lv_dn_ueberstunden100': anteil(.1, rng.integers(1, 30, n).astype(float)),
+        'lv_dn_sonderzahlungen': np.where(np.isin(monat, (6, 11)), brutto, anteil(.05, np.round(rng.uniform(100., 5000., n), 2))),
+        'lv_dn_sachbezug': anteil(.1, np.round(rng.uniform(10., 2000., n), 2)),
+        'lv_dn_diäten': anteil(.1, rng.choice([26.4, 50., 120.], n)),
+        'lv_dn_reisekosten': anteil(.05, rng.choice([15., 30., 60.], n)),
+        'lv_dn_jahressechstel': np.round(brutto * rng.uniform(1.6, 2.4, n), 2),
+        'altesonder': np.where(monat > 6, brutto, 0.) + anteil(.1, np.round(rng.uniform(100., 8000., n), 2)),
+        'stv_freibetrag': anteil(.05, rng.choice([50., 100., 250.], n)),
+        'stv_pendlerpauschale': anteil(.15, rng.choice([31., 58., 123., 168.], n)),
+        'stv_pendlereuro': anteil(.15, rng.choice([2., 8., 20.], n)),
+        'stv_anzahl_kinder_avab': anteil(.1, rng.integers(1, 4, n).astype(float)),
+        'stv_anspruch_fabo': anteil(.25, np.ones(n)),
+        'stv_gewerkschaft': anteil(.3, np.ones(n)),
+        'fabo_u18g': rng.integers(0, 3, n).astype(float),
+        'fabo_u18h': rng.integers(0, 2, n).astype(float),
+        'fabo_ue18g': rng.integers(0, 2, n).astype(float),
+        'fabo_ue18h': rng.integers(0, 2, n).astype(float),
+    }
+
+
+def _eingaben(tabelle: Dict[str, np.ndarray], i: int) -> Dict:
+    """Zeile i einer Belegschaft als Argumente für calc_brutto2netto"""
+    eingaben = {'monat': int(tabelle['monat'][i]), 'jahr': int(tabelle['jahr'][i])}
+    for param, (spalte, _) in abrechnung_batch.SPALTEN.items():
+        wert = tabelle[spalte][i]
+        eingaben[param] = int(wert) if param in Abrechnung._GANZZAHLIG else bool(wert) if param in Abrechnung._WAHRHEITSWERTE else float(wert)
+    return eingaben
+
+
+def _pruefsumme(cent: Dict[str, np.ndarray]) -> str:
+    """sha256 über alle Ergebnisspalten in Cent (feste Reihenfolge, int64 little-endian)"""
+    h = hashlib.sha256()
+    for feld in Abrechnung.Abrechnungsergebnis._fields:
+        h.update(np.ascontiguousarray(cent[feld], dtype='<i8').tobytes())
+    return h.hexdigest()
+
+
+def _bestzeit(funktion, wiederholungen: int) -> float:
+    zeiten = []
+    for _ in range(wiederholungen):
+        start = time.perf_counter()
+        funktion()
+        zeiten.append(time.perf_counter() - start)
+    return min(zeiten)
+
+
+def pruefe_grenzfaelle() -> Dict[str, Dict[str, int]]:
+    """
+    Rechnet alle Grenzfälle mit Einzel- und Batch-Rechner
+    Returns:
+        Dict[str, Dict[str, int]]: je Grenzfall die Ergebnisfelder in Cent
+    Raises:
+        AssertionError: wenn Einzel- und Batch-Rechner nicht auf den Cent übereinstimmen
+    """
+    namen = list(GRENZFAELLE)
+    einzeln = [Abrechnung.calc_brutto2netto(**_grenzfall(name)).in_cent() for name in namen]
+    tabelle = {'monat': [3] * len(namen), 'jahr': [2025] * len(namen)}
+    for param, (spalte, standard) in abrechnung_batch.SPALTEN.items():
+        tabelle[spalte] = [float(_grenzfall(name).get(param, standard)) for name in namen]
+    batch = abrechnung_batch.calc_brutto2netto_batch(tabelle, cent=True)
+
+    ergebnis = {}
+    for i, (name, cent) in enumerate(zip(namen, einzeln)):
+        abweichend = [feld for feld in cent._fields if int(batch[feld][i]) != getattr(cent, feld)]
+        assert not abweichend, f"Grenzfall {name}: Einzel- und Batch-Rechner weichen ab in {abweichend}"
+        ergebnis[name] = cent._asdict()
+    return ergebnis
+
+
+def messe_pdf(dokumente: int = PDF_DOKUMENTE, wiederholungen: int = 3) -> Dict[str, float]:
+    """
+    Renderzeit je Dokument in Millisekunden für Lohnzettel und Stammdatenblatt (beste von wiederholungen Runden).
+    Die Lohnzettel verteilen sich über verschiedene Layouts (Zusatzbezüge, Gewerkschaftsbeitrag).
+    """
+    tabelle = belegschaft(dokumente, seed=3)
+    mitarbeiter = [SimpleNamespace(surname=f"Muster{i}", name="Erika", birthdate="01.01.1990", entrydate="01.03.2020",
+                                   street="Wexstraße", housenr=i % 40 + 1, zip=1200, place="Wien", obj_id=i)
+                   for i in range(dokumente)]
+    auftraege = []
+    for i in range(dokumente):
+        ergebnis = Abrechnung.calc_brutto2netto(**_eingaben(tabelle, i))
+        auftraege.append((mitarbeiter[i], float(tabelle['lv_dn_brutto'][i]), ergebnis.netto, {
+            "SV": ergebnis.sv, "Lohnsteuer": ergebnis.lst, "Gewerkschaft": ergebnis.oegb,
+            "sonderzahlungen": float(tabelle['lv_dn_sonderzahlungen'][i]),
+            "mehrstunden25": float(tabelle['lv_dn_mehrstunden25'][i]),
+            "überstunden50": float(tabelle['lv_dn_ueberstunden50'][i]), "zulagen": 0.,
+            "freibetrag": float(tabelle['stv_freibetrag'][i]), "pendlerpauschale": float(tabelle['stv_pendlerpauschale'][i]),
+            "pendlereuro": float(tabelle['stv_pendlereuro'][i]), "anzahl_kinder_avab": int(tabelle['stv_anzahl_kinder_avab'][i]),
+            "anspruch_fabo": int(tabelle['stv_anspruch_fabo'][i]),
+        }))
+
+    def lohnzettel_lauf():
+        for auftrag in auftraege:
+            lohnzettel.generate_real_payroll_pdf(*auftrag, "2025-03")
+
+    def stammdatenblatt_lauf():
+        for person in mitarbeiter:
+            stammdatenblatt.generate_stammdatenblatt_pdf(person)
+
+    return {
+        'lohnzettel': _bestzeit(lohnzettel_lauf, wiederholungen) / dokumente * 1e3,
+        'stammdatenblatt': _bestzeit(stammdatenblatt_lauf, wiederholungen) / dokumente * 1e3,
+    }
+
+
+def messe(groessen: Sequence[int] = GROESSEN, wiederholungen: int = 3) -> Dict:
+    """
+    Führt den ganzen Lauf aus: Grenzfälle, Latenz je Einzelaufruf, Batch-Durchsatz und Prüfsummen je Größe
+    Returns:
+        Dict: im Format von benchmark_baseline.json
+    """
+    grenzfaelle = pruefe_grenzfaelle()
+
+    stichprobe = belegschaft(LATENZ_AUFRUFE, seed=1)
+    eingaben = [_eingaben(stichprobe, i) for i in range(LATENZ_AUFRUFE)]
+    zeiten = np.empty(LATENZ_AUFRUFE)
+    for i, zeile in enumerate(eingaben):
+        start = time.perf_counter()
+        Abrechnung.calc_brutto2netto(**zeile)
+        zeiten[i] = time.perf_counter() - start
+
+    durchsatz, pruefsummen = {}, {}
+    for n in groessen:
+        tabelle = belegschaft(n)
+        cent = abrechnung_batch.calc_brutto2netto_batch(tabelle, cent=True)
+        for i in np.linspace(0, n - 1, min(STICHPROBE, n)).astype(int):
+            einzeln = Abrechnung.calc_brutto2netto(**_eingaben(tabelle, i)).in_cent()
+            abweichend = [feld for feld in einzeln._fields if int(cent[feld][i]) != getattr(einzeln, feld)]
+            assert not abweichend, f"Belegschaft {n}, Zeile {i}: Einzel- und Batch-Rechner weichen ab in {abweichend}"
+        dauer = _bestzeit(lambda: abrechnung_batch.calc_brutto2netto_batch(tabelle), wiederholungen)
+        durchsatz[str(n)] = n / dauer
+        pruefsummen[str(n)] = _pruefsumme(cent)
+
+    return {
+        'erstellt': datetime.now().isoformat(timespec='seconds'),
+        'umgebung': {'python': platform.python_version(), 'numpy': np.__version__, 'rechner': platform.machine()},
+        'latenz_us': {
+            'median': float(np.median(zeiten) * 1e6),
+            'p95': float(np.percentile(zeiten, 95) * 1e6),
+        },
+        'durchsatz_zeilen_pro_s': durchsatz,
+        'pruefsummen': pruefsummen,
+        'grenzfaelle': grenzfaelle,
+        'pdf_ms_je_dokument': messe_pdf(wiederholungen=wiederholungen),
+    }
+
+
+def vergleiche(aktuell: Dict, baseline: Dict) -> List[str]:
+    """
+    Vergleicht die Ergebnisse eines Laufs (Grenzfälle und Prüfsummen in Cent) mit der Baseline
+    Returns:
+        List[str]: gefundene Abweichungen, leer wenn alles passt
+    """
+    fehler = []
+    for name, cent in aktuell['grenzfaelle'].items():
+        referenz = baseline['grenzfaelle'].get(name)
+        if referenz is None:
+            continue
+        abweichend = {feld: (referenz[feld], wert) for feld, wert in cent.items() if referenz.get(feld) != wert}
+        if abweichend:
+            fehler.append(f"Grenzfall {name} weicht ab (Cent, Baseline → aktuell): {abweichend}")
+    for n, summe in aktuell['pruefsummen'].items():
+        if n in baseline['pruefsummen'] and baseline['pruefsummen'][n] != summe:
+            fehler.append(f"Ergebnisse der Belegschaft mit {n} Zeilen weichen von der Baseline ab")
+    return fehler
+
+
+def vergleiche_leistung(aktuell: Dict, baseline: Dict, toleranz: float = TOLERANZ) -> List[str]:
+    """
+    Vergleicht die Zeitmessungen eines Laufs (Durchsatz, Latenz, PDF-Renderzeit) mit der Baseline
+    Returns:
+        List[str]: Rückgänge über der Toleranz, leer wenn alles passt
+    """
+    fehler = []
+    for n, wert in aktuell['durchsatz_zeilen_pro_s'].items():
+        referenz = baseline['durchsatz_zeilen_pro_s'].get(n)
+        if referenz and wert < referenz * (1 - toleranz):
+            fehler.append(f"Durchsatz {n} Zeilen: {wert:,.0f}/s statt {referenz:,.0f}/s ({wert / referenz - 1:+.0%})")
+    for dokument, wert in aktuell.get('pdf_ms_je_dokument', {}).items():
+        referenz = baseline.get('pdf_ms_je_dokument', {}).get(dokument)
+        if referenz and wert > referenz * (1 + toleranz):
+            fehler.append(f"PDF {dokument}: {wert:.2f} ms je Dokument statt {referenz:.2f} ms ({wert / referenz - 1:+.0%})")
+    for kennzahl in ('median', 'p95'):
+        wert, referenz = aktuell['latenz_us'][kennzahl], baseline['latenz_us'][kennzahl]
+        if wert > referenz * (1 + toleranz):
+            fehler.append(f"Latenz ({kennzahl}): {wert:.1f} µs statt {referenz:.1f} µs ({wert / referenz - 1:+.0%})")
+    return fehler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark und Regressionsprüfung der Lohnverrechnung")
+    parser.add_argument("--groessen", type=int, nargs="+", default=list(GROESSEN), help="Zeilen je synthetischer Belegschaft")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Pfad zur Baseline (JSON)")
+    parser.add_argument("--baseline-schreiben", action="store_true", help="Ergebnis als neue Baseline speichern")
+    parser.add_argument("--leistung", action="store_true",
+                        help="Leistungsrückgang als Fehler werten (nur mit einer Baseline vom selben Rechner sinnvoll)")
+    parser.add_argument("--toleranz", type=float, default=TOLERANZ, help="Zulässiger Leistungsrückgang als Anteil")
+    parser.add_argument("--wiederholungen", type=int, default=3, help="Messungen je Größe (die beste zählt)")
+    args = parser.parse_args(argv)
+
+    try:
+        lauf = messe(args.groessen, args.wiederholungen)
+    except AssertionError as e:
+        print(f"FEHLER: {e}")
+        return 1
+
+    print(f"Latenz Einzelaufruf: Median {lauf['latenz_us']['median']:.1f} µs, p95 {lauf['latenz_us']['p95']:.1f} µs")
+    for n, wert in lauf['durchsatz_zeilen_pro_s'].items():
+        print(f"Batch {int(n):>9,} Zeilen: {wert:>12,.0f} Zeilen/s")
+    for dokument, wert in lauf['pdf_ms_je_dokument'].items():
+        print(f"PDF {dokument}: {wert:.2f} ms je Dokument")
+    print(f"{len(lauf['grenzfaelle'])} Grenzfälle, Einzel- und Batch-Rechner stimmen auf den Cent überein")
+
+    baseline_pfad = Path(args.baseline)
+    if args.baseline_schreiben:
+        baseline_pfad.write_text(json.dumps(lauf, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Baseline gespeichert: {baseline_pfad}")
+        return 0
+    if not baseline_pfad.exists():
+        print(f"Keine Baseline unter {baseline_pfad}, mit --baseline-schreiben anlegen")
+        return 0
+
+    baseline = json.loads(baseline_pfad.read_text(encoding="utf-8"))
+    fehler = vergleiche(lauf, baseline)
+    leistung = vergleiche_leistung(lauf, baseline, args.toleranz)
+    if args.leistung:
+        fehler += leistung
+    else:
+        for meldung in leistung:
+            print(f"Hinweis (nur mit --leistung geprüft): {meldung}")
+    for meldung in fehler:
+        print(f"REGRESSION: {meldung}")
+    if not fehler:
+        print("Keine Regression gegenüber der Baseline")
+    return 1 if fehler else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
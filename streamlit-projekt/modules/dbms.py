@@ -1,8 +1,216 @@
 import sqlite3
-from typing import List, Tuple
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple, Union
 from sqlite3 import Error
 import traceback
 
+from modules import migrations
+
+# Applied once when a pooled connection is opened
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+)
+POOL_SIZE = 8
+# Per-connection cache of compiled statements, reused as long as the SQL text is identical
+STATEMENT_CACHE_SIZE = 256
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_äöüÄÖÜß]*(\.[A-Za-z_][A-Za-z0-9_äöüÄÖÜß]*)?$")
+
+
+def identifier(name: str) -> str:
+    """Check a table or column name before it goes into SQL text (values always go through ? placeholders)"""
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"Ungültiger Tabellen- oder Spaltenname: {name!r}")
+    return name
+
+
+def where_clause(conditions: Mapping[str, Any]) -> Tuple[str, Tuple]:
+    """
+    Build "col1 = ? AND col2 = ?" and the matching parameters from a column -> value mapping.
+    The SQL text only depends on the column names, so sqlite can reuse the prepared statement.
+    """
+    clause = " AND ".join(f"{identifier(column)} = ?" for column in conditions)
+    return clause, tuple(conditions.values())
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to its ConnectionManager instead of closing it.
+    Inside a unit of work (ConnectionManager.transaction) commit() and close() are deferred to its end.
+    """
+    manager = None
+    in_unit_of_work = False
+
+    def commit(self):
+        if not self.in_unit_of_work:
+            super().commit()
+
+    def close(self):
+        if self.in_unit_of_work:
+            return
+        if self.manager is None:
+            super().close()
+        else:
+            self.manager.release(self)
+
+
+class ConnectionManager:
+    """Pool of SQLite connections for one database file, shared by all modules and Streamlit sessions
+    """
+    def __init__(self, db_path: str, pool_size: int = POOL_SIZE, schema_version: int = 0):
+        self.db_path = db_path
+        self.schema_version = schema_version
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, factory=PooledConnection,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn.manager = self
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Take a connection from the pool, opening a new one if all are in use.
+        While this thread is inside a unit of work, its connection is handed out instead."""
+        unit_of_work = getattr(self._local, "unit_of_work", None)
+        if unit_of_work is not None:
+            return unit_of_work
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn: PooledConnection):
+        """Return a connection to the pool; uncommitted changes are rolled back first"""
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            sqlite3.Connection.close(conn)
+
+    def close_all(self):
+        """Close every idle connection (before the database file is copied or replaced)"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            sqlite3.Connection.close(conn)
+
+    def require_schema(self, version: int):
+        """
+        Raise migrations.MigrationError unless the schema has reached version.
+        Migrations left pending at startup (their tables did not exist yet) are retried first.
+        """
+        if self.schema_version >= version:
+            return
+        with self._schema_lock:
+            if self.schema_version < version:
+                self.schema_version = migrations.migrate(self.db_path)
+        if self.schema_version < version:
+            fehlend = sorted({table for ziel, _, tables in migrations.offene_migrationen(self.db_path)
+                              if ziel <= version for table in tables})
+            raise migrations.MigrationError(
+                f"{self.db_path} hat Schema-Version {self.schema_version}, benötigt wird {version}; "
+                f"es fehlen die Tabellen {', '.join(fehlend)}")
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @property
+    def in_unit_of_work(self) -> bool:
+        return getattr(self._local, "unit_of_work", None) is not None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: every connect() of this thread shares one connection and all statements
+        are committed together at the end, or rolled back if the block raises.
+        Nested transaction() blocks join the outer one.
+        """
+        if self.in_unit_of_work:
+            yield self._local.unit_of_work
+            return
+        conn = self.acquire()
+        conn.in_unit_of_work = True
+        self._local.unit_of_work = conn
+        try:
+            yield conn
+            sqlite3.Connection.commit(conn)
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.in_unit_of_work = False
+            self._local.unit_of_work = None
+            conn.close()
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(db_path: str) -> ConnectionManager:
+    """
+    The one ConnectionManager per database file.
+    Raises migrations.MigrationError if a pending migration fails; no manager is registered then,
+    so nothing works against a half-migrated schema and the next call tries again.
+    """
+    key = os.path.abspath(str(db_path))
+    with _managers_lock:
+        if key not in _managers:
+            # Pending schema migrations run once per process before the first connection
+            version = migrations.migrate(key)
+            _managers[key] = ConnectionManager(key, schema_version=version)
+        return _managers[key]
+
+
+def discard_manager(db_path: str):
+    """Close the idle connections of db_path and forget its manager, so get_manager migrates a recreated file again"""
+    key = os.path.abspath(str(db_path))
+    with _managers_lock:
+        manager = _managers.pop(key, None)
+    if manager is not None:
+        manager.close_all()
+
+
+def backup(db_path: str, target: str):
+    """Consistent copy of db_path to target via the SQLite backup API, including pages that are still in the WAL"""
+    source = sqlite3.connect(str(db_path))
+    dest = sqlite3.connect(str(target))
+    try:
+        source.backup(dest)
+    finally:
+        dest.close()
+        source.close()
+
+
+def connect(db_path: str) -> PooledConnection:
+    """Pooled replacement for sqlite3.connect; conn.close() returns the connection to the pool"""
+    return get_manager(db_path).acquire()
+
+
+def transaction(db_path: str):
+    """Unit of work over all connections to db_path in this thread, see ConnectionManager.transaction"""
+    return get_manager(db_path).transaction()
+
 
 class dbms:
     """A dbms class, that provides connection and executes commands
@@ -13,44 +221,53 @@ class dbms:
         :param db_file: database file
         :return: Connection object or None
         """
-        self.conn = None
-        try:
-            self.conn = sqlite3.connect(db_name)
-        except Error as e:
-            print(e)
+        self.manager = get_manager(db_name)
         # self.create_table()
 
+    def transaction(self):
+        """Mehrere Befehle als eine Einheit ausführen: with db.transaction(): ... committet einmal am Ende"""
+        return self.manager.transaction()
+
     def execute_command(self, execute_sql: str, params=None, fetch=False):
         """ execute a command from the execute_sql statement
         :param conn: Connection object
         :param execute_sql: a executable SQL statement
         :return:
         """
+        conn = self.manager.acquire()
         try:
-            c = self.conn.cursor()
+            c = conn.cursor()
             if params:
                 c.execute(execute_sql, params)
             else:
                 c.execute(execute_sql)
-            self.conn.commit()
+            # Reads never open a transaction, so only writes are committed
+            if conn.in_transaction:
+                conn.commit()
 
             if fetch and c.description:
                 return c.fetchall(), c.description[0]
             else:
                 return c.fetchall(), None
         except sqlite3.Error as e:
-            self.conn.rollback()
+            conn.rollback()
             print("🚨 SQL Error während 'execute command':")
             print(f"🔹 Fehlernachricht: {e}")
             print(f"🔹 SQL-Statement: {execute_sql}")
             print(f"🔹 Parameter: {params}")
             print(f"🔹 Traceback:\n{traceback.format_exc()}")
+            if conn.in_unit_of_work:
+                raise
         except Exception as e:
-            self.conn.rollback()
+            conn.rollback()
             print("🚨 Allgemeiner Fehler während 'execute command':")
             print(f"🔹 Fehlernachricht: {e}")
             print(f"🔹 SQL-Statement: {execute_sql}")
             print(f"🔹 Traceback:\n{traceback.format_exc()}")
+            if conn.in_unit_of_work:
+                raise
+        finally:
+            conn.close()
 
     def create_table(self, table_name: str, table_row_name: List):
         """
@@ -103,16 +320,13 @@ class dbms:
         Returns:
             List: Eine Liste der Einträge in der DB
         """
+        params = None
+        sql_select_table = self._from_clause(table_name, join_table_name, table_row_FK, join_table_PK)
         if join_table_name and table_row_FK_value:
-            print("joint clause with condition")
-            sql_select_table = f"SELECT * FROM {table_name} JOIN {join_table_name} ON {table_name}.{table_row_FK} = {join_table_name}.{join_table_PK} WHERE {table_name}.{table_row_FK} = {table_row_FK_value} AND {join_table_name}.{join_table_PK} = {join_table_PK_value};"
-        elif join_table_name and not table_row_FK_value:
-            print("joint clause withOUT condition")
-            sql_select_table = f"SELECT * FROM {table_name} JOIN {join_table_name} ON {table_name}.{table_row_FK} = {join_table_name}.{join_table_PK};"
-        else:
-            sql_select_table = f"SELECT * FROM {table_name};"
+            sql_select_table += f" WHERE {table_name}.{table_row_FK} = ? AND {join_table_name}.{join_table_PK} = ?"
+            params = (table_row_FK_value, join_table_PK_value)
         try:
-            return_list, description = self.execute_command(sql_select_table, None, True)
+            return_list, description = self.execute_command(sql_select_table, params, True)
             self.empty_return_check(return_list=return_list)
             return return_list, description
         except sqlite3.Error as e:
@@ -127,9 +341,9 @@ class dbms:
             print(f"🔹 Traceback:\n{traceback.format_exc()}")
 
     def insert(self, table_name: str, table_row_name: str, values: List):
-        column_names = ", ".join([row[0] for row in table_row_name])
+        column_names = ", ".join([identifier(row[0]) for row in table_row_name])
         placeholders = ", ".join(["?" for _ in values])
-        sql_insert = f"INSERT INTO {table_name} ({column_names}) VALUES ({placeholders})"
+        sql_insert = f"INSERT INTO {identifier(table_name)} ({column_names}) VALUES ({placeholders})"
         try:
             self.execute_command(sql_insert, values, False)
             print(f"{table_name} row inserted!")
@@ -144,31 +358,86 @@ class dbms:
             print(f"🔹 SQL-Statement: {sql_insert}")
             print(f"🔹 Traceback:\n{traceback.format_exc()}")
 
-    def select_specific(self, table_name: str, limitations: str, join_table_name: str = None, table_row_FK: str = None,
-                        table_row_FK_value: int = None, join_table_PK: str = None, join_table_PK_value: int = None) -> List:
+    def insert_many(self, table_name: str, table_row_name: str, rows: Iterable[Sequence], batch_size: int = 500) -> Dict[str, float]:
+        """
+        Fügt viele Zeilen mit executemany in einer einzigen Transaktion ein
+        Args:
+            table_name (str): Name der Tabelle in der DB
+            table_row_name (List): Spalten wie bei insert
+            rows (Iterable[Sequence]): Werte je Zeile in Spaltenreihenfolge
+            batch_size (int): Zeilen je executemany-Aufruf
+
+        Returns:
+            Dict: Anzahl eingefügter Zeilen ('rows'), Batches ('batches') und Dauer in Sekunden ('seconds')
+        """
+        column_names = ", ".join([identifier(row[0]) for row in table_row_name])
+        placeholders = ", ".join(["?" for _ in table_row_name])
+        sql_insert = f"INSERT INTO {identifier(table_name)} ({column_names}) VALUES ({placeholders})"
+        start = time.perf_counter()
+        inserted, batches = 0, 0
+        conn = self.manager.acquire()
+        try:
+            c = conn.cursor()
+            batch = []
+            for row in rows:
+                batch.append(tuple(row))
+                if len(batch) >= batch_size:
+                    c.executemany(sql_insert, batch)
+                    inserted, batches, batch = inserted + len(batch), batches + 1, []
+            if batch:
+                c.executemany(sql_insert, batch)
+                inserted, batches = inserted + len(batch), batches + 1
+            conn.commit()
+            print(f"{table_name}: {inserted} rows inserted!")
+        except Exception as e:
+            conn.rollback()
+            inserted = 0
+            print("🚨 Fehler während 'insert_many', alle Zeilen zurückgerollt:")
+            print(f"🔹 Fehlernachricht: {e}")
+            print(f"🔹 SQL-Statement: {sql_insert}")
+            print(f"🔹 Traceback:\n{traceback.format_exc()}")
+            if conn.in_unit_of_work:
+                raise
+        finally:
+            conn.close()
+        return {'rows': inserted, 'batches': batches, 'seconds': time.perf_counter() - start}
+
+    def _from_clause(self, table_name: str, join_table_name: str = None, table_row_FK: str = None,
+                     join_table_PK: str = None) -> str:
+        """SELECT * FROM table [JOIN join_table ON table.FK = join_table.PK] with checked identifiers"""
+        sql = f"SELECT * FROM {identifier(table_name)}"
+        if join_table_name:
+            sql += (f" JOIN {identifier(join_table_name)} ON {table_name}.{identifier(table_row_FK)}"
+                    f" = {join_table_name}.{identifier(join_table_PK)}")
+        return sql
+
+    def select_specific(self, table_name: str, limitations: Union[str, Mapping[str, Any]], join_table_name: str = None,
+                        table_row_FK: str = None, table_row_FK_value: int = None, join_table_PK: str = None,
+                        join_table_PK_value: int = None, params: Sequence = ()) -> List:
         """
         Lädt alle Einträge aus der jeweilgen DB-Tabelle
         Args:
             table_name (str): Name der jeweiligen DB-Tabelle
-            limitations (str): Einschränkungen für die Datenbankabfrage
+            limitations (str | Mapping): Einschränkungen für die Datenbankabfrage, entweder ein Mapping
+                Spalte -> Wert oder eine Bedingung mit ?-Platzhaltern, deren Werte in params stehen
+            params (Sequence): Werte für die ?-Platzhalter in limitations
 
         Returns:
             List: Eine Liste der Einträge in der DB unter Voraussetzung der Limitations
         """
+        if isinstance(limitations, Mapping):
+            limitations, params = where_clause(limitations)
+        params = tuple(params)
 
-        sql_select_table = f"SELECT * FROM {table_name}"
-
+        sql_select_table = self._from_clause(table_name, join_table_name, table_row_FK, join_table_PK)
         if join_table_name and table_row_FK_value:
-            print("joint clause with condition")
-            sql_select_table = f"SELECT * FROM {table_name} JOIN {join_table_name} ON {table_name}.{table_row_FK} = {join_table_name}.{join_table_PK} WHERE {table_name}.{table_row_FK} = {table_row_FK_value} AND {join_table_name}.{join_table_PK} = {join_table_PK_value} WHERE {limitations};"
-        elif join_table_name and not table_row_FK_value:
-            print("joint clause withOUT condition")
-            sql_select_table = f"SELECT * FROM {table_name} JOIN {join_table_name} ON {table_name}.{table_row_FK} = {join_table_name}.{join_table_PK} WHERE {limitations};"
+            sql_select_table += f" WHERE {table_name}.{table_row_FK} = ? AND {join_table_name}.{join_table_PK} = ? AND {limitations}"
+            params = (table_row_FK_value, join_table_PK_value) + params
         else:
-            sql_select_table = f"SELECT * FROM {table_name} WHERE {limitations};"
+            sql_select_table += f" WHERE {limitations}"
 
         try:
-            return_list, description = self.execute_command(sql_select_table, None, True)
+            return_list, description = self.execute_command(sql_select_table, params, True)
             self.empty_return_check(return_list=return_list)
             return return_list, description
 
@@ -184,16 +453,10 @@ class dbms:
             print(f"🔹 Traceback:\n{traceback.format_exc()}")
 
     def update(self, table_name: str, table_row_name: str, primary_key: str, primary_key_value: int, values: List):
-        set_clause = ", ".join(f"{col[0]} = ?" for col in table_row_name)
-        update_sql = f"UPDATE {table_name} SET {set_clause} WHERE {primary_key} = {primary_key_value}"
+        set_clause = ", ".join(f"{identifier(col[0])} = ?" for col in table_row_name)
+        update_sql = f"UPDATE {identifier(table_name)} SET {set_clause} WHERE {identifier(primary_key)} = ?"
         try:
-            rows, description = self.execute_command(execute_sql=update_sql, params=values, fetch=True)
-
-            if rows.__len__ == 0:
-                column_str = ", ".join([primary_key] + values)
-                placeholders = ", ".join(["?"] * (len(values) + 1))
-                insert_sql = f"INSERT INTO {table_name} ({column_str}) VALUES ({placeholders})"
-                self.conn.cursor.execute(insert_sql, (values))
+            self.execute_command(execute_sql=update_sql, params=tuple(values) + (primary_key_value,))
 
         except sqlite3.Error as e:
             print("🚨 SQL Error während 'execute command':")
@@ -207,9 +470,9 @@ class dbms:
             print(f"🔹 Traceback:\n{traceback.format_exc()}")
 
     def delete(self, table_name: str, table_idrow_name: str, id: int):
-        delete_sql = f"DELETE FROM {table_name} WHERE {table_idrow_name} = {id}"
+        delete_sql = f"DELETE FROM {identifier(table_name)} WHERE {identifier(table_idrow_name)} = ?"
         try:
-            self.execute_command(delete_sql)
+            self.execute_command(delete_sql, (id,))
             print(f"{table_name} Entry with {table_idrow_name} = {id} deleted!")
         except sqlite3.Error as e:
             print("🚨 SQL Error während 'execute command':")
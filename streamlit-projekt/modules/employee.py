@@ -99,7 +99,7 @@ class mitarbeiter(person.person):
             _type_: _description_
         """
         obj_list = []
-        list_from_db, description = dbms_obj.select_specific(table_name=cls.table_name, join_table_name=person.person.table_name, table_row_FK=cls.table_row_names[1][0], join_table_PK=person.person.table_row_names[0][0], limitations=f"{cls.table_row_names[0][0]} = {id}")
+        list_from_db, description = dbms_obj.select_specific(table_name=cls.table_name, join_table_name=person.person.table_name, table_row_FK=cls.table_row_names[1][0], join_table_PK=person.person.table_row_names[0][0], limitations={f"{cls.table_name}.{cls.table_row_names[0][0]}": id})
         if list_from_db is None:
             return obj_list
         for row in list_from_db:
@@ -212,6 +212,20 @@ class mitarbeiter(person.person):
         """
         db_ms.insert(table_name=self.table_name, table_row_name=self.table_row_names[:-1], values=self.value())
 
+    @classmethod
+    def insert_many(cls, db_ms: dbms.dbms, mitarbeiter_liste: List["mitarbeiter"], batch_size: int = 500) -> dict:
+        """
+        Fügt viele Mitarbeiter in einer Transaktion ein
+        Args:
+            db_ms (dbms): Die verbundene Datenbanken
+            mitarbeiter_liste (List[mitarbeiter]): Die einzufügenden Mitarbeiter
+            batch_size (int, optional): Zeilen je executemany-Aufruf. Defaults to 500.
+
+        Returns:
+            dict: Anzahl eingefügter Zeilen und Dauer, siehe dbms.insert_many
+        """
+        return db_ms.insert_many(table_name=cls.table_name, table_row_name=cls.table_row_names[:-1], rows=(ma.value() for ma in mitarbeiter_liste), batch_size=batch_size)
+
     def update(self, dbms_obj: dbms.dbms, values: tuple):
         """
         Updated die Daten des Mitarbeiters in der Datenbank
@@ -0,0 +1,156 @@
+"""
+Kalender für die Lohnverrechnung
+Montage (U-Bahn-Steuer), Arbeitstage und österreichische gesetzliche Feiertage je Monat, einmal für einen
+ganzen Jahresbereich als Arrays vorberechnet; Abfragen sind danach Indexzugriffe. Feiertage sind mit
+Gültigkeitszeitraum hinterlegt (FEIERTAGE), Jahre außerhalb des vorberechneten Bereichs werden bei Bedarf
+einzeln nachgerechnet.
+"""
+import datetime
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Vorberechneter Bereich (inklusive)
+JAHR_VON = 1970
+JAHR_BIS = 2100
+
+
+class Feiertag(NamedTuple):
+    """
+    Gesetzlicher Feiertag (Arbeitsruhegesetz), entweder fix (monat/tag) oder als Abstand zum Ostersonntag
+    gueltig_ab/gueltig_bis: erstes/letztes Jahr, in dem der Feiertag gilt (None = unbegrenzt)
+    """
+    name: str
+    monat: int = 0
+    tag: int = 0
+    ostern: Optional[int] = None
+    gueltig_ab: Optional[int] = None
+    gueltig_bis: Optional[int] = None
+
+
+FEIERTAGE = (
+    Feiertag("Neujahr", 1, 1),
+    Feiertag("Heilige Drei Könige", 1, 6),
+    Feiertag("Ostermontag", ostern=1),
+    Feiertag("Staatsfeiertag", 5, 1),
+    Feiertag("Christi Himmelfahrt", ostern=39),
+    Feiertag("Pfingstmontag", ostern=50),
+    Feiertag("Fronleichnam", ostern=60),
+    Feiertag("Mariä Himmelfahrt", 8, 15),
+    Feiertag("Nationalfeiertag", 10, 26, gueltig_ab=1967),
+    Feiertag("Allerheiligen", 11, 1),
+    Feiertag("Mariä Empfängnis", 12, 8),
+    Feiertag("Christtag", 12, 25),
+    Feiertag("Stefanitag", 12, 26),
+)
+
+
+def ostersonntag(jahr: int) -> datetime.date:
+    """Ostersonntag nach dem gregorianischen Kalender (Gauß/Meeus)"""
+    a, b, c = jahr % 19, jahr // 100, jahr % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    monat = (h + l - 7 * m + 114) // 31
+    tag = (h + l - 7 * m + 114) % 31 + 1
+    return datetime.date(jahr, monat, tag)
+
+
+def feiertage(jahr: int) -> List[Tuple[datetime.date, str]]:
+    """Alle gesetzlichen Feiertage des Jahres als (Datum, Name), nach Datum sortiert"""
+    ostern = ostersonntag(jahr)
+    tage = []
+    for feiertag in FEIERTAGE:
+        if feiertag.gueltig_ab is not None and jahr < feiertag.gueltig_ab:
+            continue
+        if feiertag.gueltig_bis is not None and jahr > feiertag.gueltig_bis:
+            continue
+        if feiertag.ostern is not None:
+            tage.append((ostern + datetime.timedelta(days=feiertag.ostern), feiertag.name))
+        else:
+            tage.append((datetime.date(jahr, feiertag.monat, feiertag.tag), feiertag.name))
+    return sorted(tage)
+
+
+def _berechne(von: int, bis: int) -> Dict[str, np.ndarray]:
+    """Kennzahlen je Monat für die Jahre von..bis, Index (jahr - von) * 12 + monat - 1"""
+    tage = np.arange(np.datetime64(f"{von}-01-01"), np.datetime64(f"{bis + 1}-01-01"), dtype='datetime64[D]')
+    wochentag = (tage.astype(np.int64) + 3) % 7  # 1970-01-01 war ein Donnerstag, Montag = 0
+    monat_index = tage.astype('datetime64[M]').astype(np.int64) - (von - 1970) * 12
+    feiertag = np.isin(tage, np.array([datum for jahr in range(von, bis + 1) for datum, _ in feiertage(jahr)], dtype='datetime64[D]'))
+    werktag = wochentag < 5
+    anzahl = (bis - von + 1) * 12
+
+    def zaehle(maske: np.ndarray) -> np.ndarray:
+        return np.bincount(monat_index, weights=maske, minlength=anzahl).astype(np.int64)
+
+    return {
+        'tage': zaehle(np.ones(len(tage))),
+        'montage': zaehle(wochentag == 0),
+        'feiertage': zaehle(feiertag),
+        'arbeitstage': zaehle(werktag & ~feiertag),
+    }
+
+
+@lru_cache(maxsize=1)
+def _tabelle() -> Dict[str, np.ndarray]:
+    return _berechne(JAHR_VON, JAHR_BIS)
+
+
+@lru_cache(maxsize=64)
+def _jahr_ausserhalb(jahr: int) -> Dict[str, np.ndarray]:
+    return _berechne(jahr, jahr)
+
+
+def _wert(name: str, jahr: int, monat: int) -> int:
+    if JAHR_VON <= jahr <= JAHR_BIS:
+        return int(_tabelle()[name][(jahr - JAHR_VON) * 12 + monat - 1])
+    return int(_jahr_ausserhalb(jahr)[name][monat - 1])
+
+
+def _werte(name: str, jahr: np.ndarray, monat: np.ndarray) -> np.ndarray:
+    jahr = np.asarray(jahr, dtype=np.int64)
+    monat = np.asarray(monat, dtype=np.int64)
+    im_bereich = (jahr >= JAHR_VON) & (jahr <= JAHR_BIS)
+    werte = _tabelle()[name][np.where(im_bereich, (jahr - JAHR_VON) * 12 + monat - 1, 0)]
+    if not im_bereich.all():
+        werte = werte.copy()
+        for j in np.unique(jahr[~im_bereich]):
+            maske = jahr == j
+            werte[maske] = _jahr_ausserhalb(int(j))[name][monat[maske] - 1]
+    return werte
+
+
+def montage(jahr: int, monat: int) -> int:
+    """Anzahl der Montage im Monat (Bemessung der Wiener U-Bahn-Steuer)"""
+    return _wert('montage', jahr, monat)
+
+
+def arbeitstage(jahr: int, monat: int) -> int:
+    """Arbeitstage im Monat: Montag bis Freitag ohne gesetzliche Feiertage"""
+    return _wert('arbeitstage', jahr, monat)
+
+
+def feiertage_im_monat(jahr: int, monat: int) -> int:
+    """Anzahl der gesetzlichen Feiertage im Monat (auch wenn sie auf ein Wochenende fallen)"""
+    return _wert('feiertage', jahr, monat)
+
+
+def sollstunden(jahr: int, monat: int, wochenstunden: float) -> float:
+    """Sollarbeitszeit des Monats bei einer Fünftagewoche (Arbeitstage × Wochenstunden / 5), Basis für Stundenteiler"""
+    return arbeitstage(jahr, monat) * wochenstunden / 5.
+
+
+def montage_array(jahr: np.ndarray, monat: np.ndarray) -> np.ndarray:
+    """montage für ganze Spalten (int64), gleiche Länge wie jahr/monat"""
+    return _werte('montage', jahr, monat)
+
+
+def arbeitstage_array(jahr: np.ndarray, monat: np.ndarray) -> np.ndarray:
+    """arbeitstage für ganze Spalten (int64), gleiche Länge wie jahr/monat"""
+    return _werte('arbeitstage', jahr, monat)
@@ -0,0 +1,764 @@
+"""
+Lohnzettel (PDF) für einzelne Mitarbeiter und für alle Abrechnungen eines Monats
+Der Monatsstapel lädt alle Abrechnungen des Monats samt gespeicherten Ergebnissen in einer Abfrage,
+rendert die PDFs blockweise auf einem Prozess-Pool (fpdf ist rein CPU-gebunden und single-threaded) und
+schreibt jeden fertigen Block sofort in ein ZIP-Archiv.
+
+Aufruf aus dem Verzeichnis streamlit-projekt:
+    python -m modules.lohnzettel 2025-10 --ziel Lohnzettel_2025-10.zip --workers 4
+    python -m modules.lohnzettel 2025-10 --lohnbuch   # ein PDF mit Deckblatt, Lesezeichen je Mitarbeiter
+"""
+import argparse
+import datetime
+import itertools
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from fpdf import FPDF
+
+from modules import Abrechnung, dbms, monatslauf, payroll, pdf_cache, pdf_vorlage
+
+DB_PATH = Path(__file__).parent.parent / "stammdatenverwaltung.db"
+
+_SEITE = re.compile(rb"/Type\s*/Page\b")
+
+# Version des Lohnzettel-Layouts, bei jeder Änderung an generate_real_payroll_pdf erhöhen (Teil des Cache-Schlüssels)
+LOHNZETTEL_VERSION = 2
+# Höchstens so viele Lohnzettel je Worker-Auftrag (begrenzt den Speicher für fertige, noch nicht geschriebene PDFs)
+BLOCKGROESSE_MAX = 20
+# Zeilen der Lohnzettel-Übersicht im Lohnbuch auf der ersten und auf jeder weiteren Deckblattseite
+UEBERSICHT_ZEILEN_ERSTE = 34
+UEBERSICHT_ZEILEN_WEITERE = 52
+# Temporäre ZIP-Archive und Lohnbücher für Downloads und deren maximales Alter in Sekunden
+EXPORT_DIR = Path(tempfile.gettempdir()) / "lohnzettel_export"
+EXPORT_MAX_ALTER = 3600
+
+# Spalten aus lohnverrechnung_dn, die für Berechnung und Lohnzettel gebraucht werden
+ABRECHNUNG_SPALTEN = (
+    'lv_dn_id', 'lv_dn_empl_id', 'lv_dn_monat', 'lv_dn_stundensatz', 'lv_dn_wochenstunden', 'lv_dn_brutto',
+    'lv_dn_mehrstunden0', 'lv_dn_mehrstunden25', 'lv_dn_mehrstunden50', 'lv_dn_ueberstunden50', 'lv_dn_ueberstunden100',
+    'lv_dn_sonderzahlungen', 'lv_dn_sachbezug', 'lv_dn_diäten', 'lv_dn_reisekosten', 'lv_dn_jahressechstel',
+)
+
+
+# Hilfsfunktion: Konvertiere String mit Komma zu Float
+def str_to_float(value, default=0.0):
+    """Konvertiert String (auch mit Komma) zu Float"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        # Ersetze Komma durch Punkt und konvertiere
+        return float(str(value).replace(',', '.'))
+    except (ValueError, AttributeError):
+        return default
+
+
+# === FARBEN (BMD-STIL) ===
+COLOR_HEADER_BG = (41, 128, 185)      # Blau für Kopfzeile
+COLOR_TABLE_HEADER = (52, 152, 219)   # Hellblau für Tabellenheader
+COLOR_GRAY_LIGHT = (236, 240, 241)    # Hellgrau für alternierende Zeilen
+COLOR_TEXT_DARK = (44, 62, 80)        # Dunkelgrau für Text
+COLOR_ACCENT = (46, 204, 113)         # Grün für Netto
+COLOR_BORDER = (189, 195, 199)        # Hellgrau für Rahmen
+
+# Zusätzliche Bezüge (Schlüssel in abrechnung_data, Bezeichnung), je vorhandenem Betrag eine Zeile
+EXTRA_BEZUEGE = (
+    ("sonderzahlungen", "  Sonderzahlungen"),
+    ("mehrstunden25", "  Mehrstunden 25%"),
+    ("überstunden50", "  Überstunden 50%"),
+    ("zulagen", "  Zulagen"),
+)
+
+
+def _betrag(wert: float) -> str:
+    """Betrag im österreichischen Format (1.234,56)"""
+    return f"{wert:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _lohnzettel_zeichnen(pdf: FPDF, extras: Tuple[str, ...], gewerkschaft: bool, texte: Optional[Dict] = None):
+    """
+    Zeichnet den Lohnzettel für ein Layout (vorhandene Zusatzbezüge, Gewerkschaftsbeitrag ja/nein).
+    Ohne texte nur die statische Ebene (Kopf, Beschriftungen, Rahmen, Füllungen), mit texte nur die variablen
+    Werte darüber. Beide Durchläufe rechnen dieselben Positionen.
+    """
+    statisch = texte is None
+
+    def zelle(x, y, breite, hoehe, text="", wert=None, border=1, fill=False, align=''):
+        # Rahmen, Füllung und feste Beschriftung gehören zur statischen Ebene, der Wert (texte[wert]) nicht
+        pdf.set_xy(x, y)
+        if statisch:
+            pdf.cell(breite, hoehe, "" if wert else text, border=border, fill=fill, align=align)
+        elif wert:
+            pdf.cell(breite, hoehe, texte[wert], align=align)
+
+    # === KOPFZEILE MIT FIRMENINFO ===
+    if statisch:
+        pdf.set_fill_color(*COLOR_HEADER_BG)
+        pdf.rect(0, 0, 210, 45, 'F')
+
+    # Firmentitel
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Arial", 'B', 18)
+    zelle(15, 8, 0, 8, "Lohn- und Gehaltsabrechnung", border=0)
+
+    pdf.set_font("Arial", '', 9)
+    zelle(15, 18, 0, 4, "Team Sigma GmbH", border=0)
+    zelle(15, 23, 0, 4, "Wexstraße 19-23 | 1200 Wien", border=0)
+    zelle(15, 28, 0, 4, "UID: ATU12345678", border=0)
+
+    # Abrechnungsmonat
+    pdf.set_font("Arial", 'B', 10)
+    zelle(15, 35, 0, 5, wert="monat", border=0)
+
+    # === MITARBEITER-INFORMATIONSBOX (KOMPAKT) ===
+    y_start = 52
+    pdf.set_draw_color(*COLOR_BORDER)
+    pdf.set_line_width(0.3)
+
+    # Box-Header
+    pdf.set_fill_color(*COLOR_TABLE_HEADER)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Arial", 'B', 10)
+    zelle(10, y_start, 190, 7, "MITARBEITER-DATEN", fill=True, align='L')
+    y_start += 7
+
+    # Mitarbeiterdaten in 2 Spalten (Bezeichnung fett, Wert normal)
+    pdf.set_text_color(*COLOR_TEXT_DARK)
+    for links, links_wert, rechts, rechts_wert in (
+        ("Name:", "name", "Pers.-Nr.:", "pers_nr"),
+        ("Geburtsdatum:", "geburtsdatum", "Eintritt:", "eintritt"),
+        ("Adresse:", "adresse", "SV-Nr.:", None),
+    ):
+        pdf.set_font("Arial", 'B', 8)
+        zelle(10, y_start, 30, 5, links)
+        zelle(105, y_start, 30, 5, rechts)
+        pdf.set_font("Arial", '', 8)
+        zelle(40, y_start, 65, 5, wert=links_wert)
+        if rechts_wert:
+            zelle(135, y_start, 65, 5, wert=rechts_wert)
+        else:
+            zelle(135, y_start, 65, 5, "-")
+        y_start += 5
+    y_start += 3
+
+    # === GEHALTSTABELLE (ERWEITERT) ===
+    y_table = y_start
+    col_widths = [80, 30, 30, 50]  # Bezeichnung | Menge | Satz | Betrag
+    col_x = [10, 90, 120, 150]
+
+    # Tabellen-Header
+    pdf.set_fill_color(*COLOR_TABLE_HEADER)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Arial", 'B', 9)
+    for i, header in enumerate(["Bezeichnung", "Menge", "Satz", "Betrag (EUR)"]):
+        zelle(col_x[i], y_table, col_widths[i], 7, header, fill=True, align='C')
+    y_table += 7
+
+    def zeile(label, menge="", satz="", betrag=None):
+        # Tabellenzeile: Bezeichnung | Menge | Satz | Betrag, satz/betrag sind Schlüssel in texte
+        zelle(col_x[0], y_table, col_widths[0], 6, label)
+        zelle(col_x[1], y_table, col_widths[1], 6, menge, align='C')
+        zelle(col_x[2], y_table, col_widths[2], 6, wert=satz, align='C')
+        zelle(col_x[3], y_table, col_widths[3], 6, wert=betrag, align='R')
+
+    def summe(label, betrag, hoehe=6):
+        zelle(10, y_table, sum(col_widths[:3]), hoehe, label, fill=True, align='R')
+        zelle(col_x[3], y_table, col_widths[3], hoehe, wert=betrag, fill=True, align='R')
+
+    def abschnitt(titel):
+        pdf.set_font("Arial", 'B', 9)
+        pdf.set_fill_color(*COLOR_GRAY_LIGHT)
+        zelle(10, y_table, 190, 6, titel, fill=True)
+
+    # === BRUTTOBEZÜGE ===
+    pdf.set_text_color(*COLOR_TEXT_DARK)
+    abschnitt("BRUTTOBEZÜGE")
+    y_table += 6
+
+    pdf.set_font("Arial", '', 8)
+    zeile("  Grundgehalt / Monatslohn", menge="1,000", betrag="brutto")
+    y_table += 6
+
+    # Weitere Bezüge (falls vorhanden)
+    for key, label in EXTRA_BEZUEGE:
+        if key in extras:
+            zeile(label, betrag=key)
+            y_table += 6
+
+    # Zwischensumme Brutto
+    pdf.set_font("Arial", 'B', 9)
+    pdf.set_fill_color(*COLOR_GRAY_LIGHT)
+    summe("Zwischensumme Brutto", "brutto_gesamt")
+    y_table += 8
+
+    # === ABZÜGE ===
+    abschnitt("ABZÜGE")
+    y_table += 6
+
+    pdf.set_font("Arial", '', 8)
+    zeile("  Sozialversicherung lfd.", satz="satz_sv", betrag="sv")
+    y_table += 6
+    zeile("  Lohnsteuer", betrag="lohnsteuer")
+    y_table += 6
+    if gewerkschaft:
+        zeile("  Gewerkschaftsbeitrag", betrag="gewerkschaft")
+        y_table += 6
+
+    # Summe Abzüge
+    pdf.set_font("Arial", 'B', 9)
+    pdf.set_fill_color(*COLOR_GRAY_LIGHT)
+    summe("Summe Abzüge", "summe_abzuege")
+    y_table += 8
+
+    # === NETTO (HERVORGEHOBEN) ===
+    pdf.set_font("Arial", 'B', 12)
+    pdf.set_fill_color(*COLOR_ACCENT)
+    pdf.set_text_color(255, 255, 255)
+    summe("AUSZAHLUNGSBETRAG (NETTO)", "netto", hoehe=10)
+    y_table += 14
+
+    # === STEUERLICHE VORTEILE & KINDERBEZUG ===
+    if y_table < 230:  # Nur wenn noch Platz ist
+        pdf.set_text_color(*COLOR_TEXT_DARK)
+        abschnitt("STEUERLICHE VORTEILE & KINDERBEZUG")
+        y_table += 6
+
+        pdf.set_font("Arial", '', 8)
+        for label, wert in (
+            ("  Freibetragsbescheid:", "freibetrag"),
+            ("  Pendlerpauschale:", "pendlerpauschale"),
+            ("  Pendlereuro:", "pendlereuro"),
+            ("  Anzahl Kinder (AVAB):", "kinder"),
+            ("  Alleinverdiener/Alleinerzieher:", "fabo"),
+        ):
+            zelle(10, y_table, 95, 5, label)
+            zelle(105, y_table, 95, 5, wert=wert, align='R')
+            y_table += 5
+        y_table += 2
+
+    # === ZUSATZINFORMATIONEN ===
+    if y_table < 250 and statisch:
+        y_table += 5
+        pdf.set_text_color(*COLOR_TEXT_DARK)
+        pdf.set_font("Arial", 'B', 9)
+        zelle(10, y_table, 0, 5, "ZUSATZINFORMATIONEN", border=0)
+        y_table += 6
+
+        pdf.set_font("Arial", '', 8)
+        pdf.set_xy(10, y_table)
+        pdf.multi_cell(190, 4,
+            "Der Auszahlungsbetrag wird auf das hinterlegte Bankkonto überwiesen.\n"
+            "Bitte bewahren Sie diese Abrechnung für Ihre Unterlagen auf.\n"
+            "Bei Fragen wenden Sie sich bitte an die Personalabteilung."
+        )
+
+    # === FUßZEILE ===
+    pdf.set_font("Arial", '', 7)
+    pdf.set_text_color(120, 120, 120)
+    x_fuss = pdf.l_margin
+    zelle(x_fuss, 285, 63, 3, "Team Sigma GmbH", border=0, align='L')
+    zelle(x_fuss + 63, 285, 64, 3, "Vertraulich", border=0, align='C')
+    zelle(x_fuss + 127, 285, 63, 3, wert="seite", border=0, align='R')
+
+
+@lru_cache(maxsize=None)
+def _lohnzettel_vorlage(extras: Tuple[str, ...], gewerkschaft: bool) -> pdf_vorlage.Vorlage:
+    """Statische Ebene des Lohnzettels je Layout, einmal je Prozess gezeichnet"""
+    return pdf_vorlage.Vorlage(lambda pdf: _lohnzettel_zeichnen(pdf, extras, gewerkschaft))
+
+
+def lohnzettel_seite(pdf: FPDF, employee_obj, brutto, netto, abrechnung_data=None, abrechnungsmonat=None,
+                     seitennummer: int = 1):
+    """
+    Lohnzettel als neue Seite in pdf (Argumente wie generate_real_payroll_pdf, seitennummer für die Fußzeile).
+    Die statische Ebene kommt aus der Vorlage des Layouts, gezeichnet werden nur noch die Werte.
+    """
+    daten = abrechnung_data if isinstance(abrechnung_data, dict) else {}
+    extras = tuple(key for key, _ in EXTRA_BEZUEGE if daten.get(key, 0) > 0)
+    gewerkschaft = daten.get("Gewerkschaft", 0) > 0
+
+    monat = datetime.datetime.strptime(abrechnungsmonat, "%Y-%m") if abrechnungsmonat else datetime.date.today()
+    sv = daten.get("SV", 0)
+    tax = daten.get("Lohnsteuer", 0)
+    brutto_gesamt = brutto + sum(daten.get(key, 0) for key, _ in EXTRA_BEZUEGE)
+    texte = {
+        "monat": f"Abrechnungsmonat: {monat.strftime('%B %Y')}",
+        "name": f"{employee_obj.surname} {employee_obj.name}",
+        "pers_nr": str(getattr(employee_obj, 'obj_id', '-')),
+        "geburtsdatum": str(employee_obj.birthdate),
+        "eintritt": str(getattr(employee_obj, 'entrydate', '-')),
+        "adresse": f"{f'{employee_obj.street} {employee_obj.housenr}'.strip()}, {f'{employee_obj.zip} {employee_obj.place}'.strip()}",
+        "brutto": _betrag(brutto),
+        "brutto_gesamt": _betrag(brutto_gesamt),
+        "satz_sv": f"{(sv / brutto * 100) if brutto > 0 else 0:.2f}%",
+        "sv": f"-{_betrag(sv)}",
+        "lohnsteuer": f"-{_betrag(tax)}",
+        "gewerkschaft": f"-{_betrag(daten.get('Gewerkschaft', 0))}",
+        "summe_abzuege": f"-{_betrag(sv + tax + daten.get('Gewerkschaft', 0))}",
+        "netto": _betrag(netto),
+        "freibetrag": f"{_betrag(daten.get('freibetrag', 0))} EUR",
+        "pendlerpauschale": f"{_betrag(daten.get('pendlerpauschale', 0))} EUR",
+        "pendlereuro": f"{_betrag(daten.get('pendlereuro', 0))} EUR",
+        "kinder": f"{daten.get('anzahl_kinder_avab', 0)} Kinder",
+        "fabo": "Ja" if daten.get("anspruch_fabo", 0) else "Nein",
+        "seite": f"Seite {seitennummer} | {datetime.date.today().strftime('%d.%m.%Y')}",
+    }
+    texte.update((key, _betrag(daten[key])) for key in extras)
+
+    _lohnzettel_vorlage(extras, gewerkschaft).neue_seite(pdf)
+    _lohnzettel_zeichnen(pdf, extras, gewerkschaft, texte)
+
+
+# Professioneller BMD-Style Lohnzettel - OPTIMIERT
+def generate_real_payroll_pdf(employee_obj, brutto, netto, abrechnung_data=None, abrechnungsmonat=None):
+    """
+    Generiert einen vollständigen, professionellen Lohn- und Gehaltszettel im BMD-Stil.
+    Optimiert für maximale Raumnutzung und professionelle Optik.
+
+    Args:
+        employee_obj: Mitarbeiter-Objekt mit Attributen
+        brutto: Bruttogehalt (float)
+        netto: Nettogehalt (float)
+        abrechnung_data: Dict mit Abrechnungsdaten
+        abrechnungsmonat: Abrechnungsmonat als YYYY-MM (Standard: aktueller Monat)
+
+    Returns:
+        bytes: PDF als bytes (latin1-encoded)
+    """
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=False, margin=0)  # KRITISCH: Verhindert automatischen Seitenumbruch
+    lohnzettel_seite(pdf, employee_obj, brutto, netto, abrechnung_data, abrechnungsmonat)
+    return pdf.output(dest='S').encode('latin1')
+
+
+def mitarbeiter_objekt(row: Dict) -> SimpleNamespace:
+    """Mitarbeiter- und Personendaten (Spalten wie in load_employees_with_persons) als Objekt für die PDF-Funktionen"""
+    return SimpleNamespace(
+        surname=row['PERS_SURNAME'],
+        name=row['PERS_FIRSTNAME'],
+        birthdate=row['PERS_BIRTHDATE'] or "-",
+        entrydate=row['EMPL_ENTRYDATE'] or "-",
+        street=row['PERS_STREET'] or "",
+        housenr=row['PERS_HOUSENR'] or "",
+        zip=row['PERS_ZIP'] or "",
+        place=row['PERS_PLACE'] or "",
+        obj_id=row['PERS_ID'],
+    )
+
+
+def abrechnung_daten(payroll_data: Dict, tax_benefits: Dict, ergebnis) -> Dict:
+    """abrechnung_data für generate_real_payroll_pdf aus Abrechnung, steuerlichen Vorteilen und Abrechnungsergebnis"""
+    return {
+        "SV": ergebnis.sv,
+        "Lohnsteuer": ergebnis.lst,
+        "Gewerkschaft": ergebnis.oegb,
+        "sonderzahlungen": str_to_float(payroll_data.get('lv_dn_sonderzahlungen', 0), 0.0),
+        "mehrstunden25": str_to_float(payroll_data.get('lv_dn_mehrstunden25', 0), 0.0),
+        "überstunden50": str_to_float(payroll_data.get('lv_dn_ueberstunden50', 0), 0.0),
+        "zulagen": 0.0,
+        # Steuerliche Vorteile hinzufügen
+        "freibetrag": tax_benefits.get('freibetrag', 0),
+        "pendlerpauschale": tax_benefits.get('pendlerpauschale', 0),
+        "pendlereuro": tax_benefits.get('pendlereuro', 0),
+        "anzahl_kinder_avab": tax_benefits.get('anzahl_kinder_avab', 0),
+        "anspruch_fabo": tax_benefits.get('anspruch_fabo', 0),
+    }
+
+
+def dateiname(row: Dict, monat: str) -> str:
+    """Dateiname eines Lohnzettels im Archiv"""
+    name = f"{row['PERS_SURNAME']}_{row['PERS_FIRSTNAME']}".replace("/", "-").replace(" ", "_")
+    return f"Lohnzettel_{monat}_{name}_{row['EMPL_ID']}.pdf"
+
+
+def lade_auftraege(db_path: str, monat: str) -> List[Dict]:
+    """
+    Alle Abrechnungen des Monats (YYYY-MM) mit Personendaten als Render-Aufträge.
+    Abrechnung, steuerliche Vorteile, gespeichertes Ergebnis und Jahressummen kommen aus einer Abfrage,
+    die Kinder für den Familienbonus aus einer zweiten. Die Engine rechnet nur, wenn kein Ergebnis
+    gespeichert ist oder dessen Input-Hash nicht mehr passt; der Export schreibt nichts in die Datenbank.
+    Die Aufträge enthalten nur einfache Werte und lassen sich an Worker-Prozesse übergeben.
+    """
+    conn = dbms.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT m.EMPL_ID, m.PERS_ID, m.EMPL_ENTRYDATE, p.PERS_SURNAME, p.PERS_FIRSTNAME, p.PERS_BIRTHDATE,
+               IFNULL(p.PERS_STREET, '') AS PERS_STREET, IFNULL(p.PERS_HOUSENR, '') AS PERS_HOUSENR,
+               IFNULL(p.PERS_ZIP, '') AS PERS_ZIP, IFNULL(p.PERS_PLACE, '') AS PERS_PLACE,
+               {", ".join("l." + spalte for spalte in ABRECHNUNG_SPALTEN)},
+               {", ".join("s." + spalte for spalte in monatslauf.STV_SPALTEN)},
+               j.ljs_sonder_kumuliert, e.le_input_hash, {", ".join("e." + spalte for spalte in payroll.ERGEBNIS_SPALTEN)}
+        FROM lohnverrechnung_dn l
+        JOIN MITARBEITER m ON m.EMPL_ID = l.lv_dn_empl_id
+        JOIN PERSON p ON p.PERS_REC_ID = (
+            SELECT PERS_REC_ID FROM PERSON WHERE PERS_ID = m.PERS_ID ORDER BY PERS_VALID_TO DESC LIMIT 1
+        )
+        LEFT JOIN steuerliche_vorteile s ON s.stv_empl_id = m.EMPL_ID
+        LEFT JOIN lohnverrechnung_ergebnis e ON e.le_lv_dn_id = l.lv_dn_id
+        LEFT JOIN lohnverrechnung_jahressummen j ON j.ljs_empl_id = m.EMPL_ID AND j.ljs_monat = (
+            SELECT MAX(ljs_monat) FROM lohnverrechnung_jahressummen
+            WHERE ljs_empl_id = m.EMPL_ID AND ljs_monat >= ? AND ljs_monat < ?
+        )
+        WHERE l.lv_dn_monat = ?
+        ORDER BY p.PERS_SURNAME, p.PERS_FIRSTNAME
+    ''', (f"{monat[:4]}-01", monat, monat))
+    # Personendaten und Abrechnung bilden den Auftrag, der Rest wird nur für das Ergebnis gebraucht
+    anzahl = 10 + len(ABRECHNUNG_SPALTEN)
+    spalten = [beschreibung[0] for beschreibung in cursor.description[:anzahl]]
+    rows = cursor.fetchall()
+    cursor.execute('''
+        SELECT l.lv_dn_empl_id, k.child_birtday, k.child_valid_to
+        FROM lohnverrechnung_dn l
+        JOIN MITARBEITER m ON m.EMPL_ID = l.lv_dn_empl_id
+        JOIN Kinder k ON k.child_adult_pers_no = m.PERS_ID
+        WHERE l.lv_dn_monat = ?
+    ''', (monat,))
+    kinder = {}
+    for empl_id, geburtstag, valid_to in cursor.fetchall():
+        kinder.setdefault(empl_id, []).append((geburtstag, valid_to))
+    conn.close()
+
+    manager = payroll.PayrollManager(db_path)
+    auftraege = []
+    for werte in rows:
+        row = dict(zip(spalten, werte[:anzahl]))
+        record = {spalte: row[spalte] for spalte in ABRECHNUNG_SPALTEN}
+        stv = werte[anzahl:anzahl + len(monatslauf.STV_SPALTEN)]
+        tax_benefits = {name: wert or 0 for name, wert in zip(monatslauf.STV_SPALTEN.values(), stv)}
+        sonder_bisher, input_hash, *gespeichert = werte[anzahl + len(monatslauf.STV_SPALTEN):]
+
+        # Dieselben Argumente wie PayrollManager.build_payroll_params, damit der Hash vergleichbar ist
+        altesonder = 0.
+        if float(record.get('lv_dn_sonderzahlungen', 0) or 0) != 0.:
+            altesonder = float(sonder_bisher or 0.)
+        fabo_kinder = None
+        if tax_benefits.get('anspruch_fabo', 0):
+            fabo_kinder = manager.zaehle_fabo_kinder(kinder.get(row['EMPL_ID'], []), monat)
+        params = manager.build_calc_params(record, tax_benefits, altesonder, fabo_kinder)
+        if input_hash is not None and input_hash == manager.result_hash(params):
+            ergebnis = Abrechnung.Abrechnungsergebnis(*gespeichert)
+        else:
+            ergebnis = Abrechnung.calc_brutto2netto_cached(**params)
+        auftraege.append({
+            'dateiname': dateiname(row, monat),
+            'mitarbeiter': row,
+            'brutto': float(record.get('lv_dn_brutto', 0) or 0),
+            'netto': ergebnis.netto,
+            'abrechnung_data': abrechnung_daten(record, tax_benefits, ergebnis),
+            'monat': monat,
+        })
+    return auftraege
+
+
+def render(auftrag: Dict) -> bytes:
+    """
+    Einen Render-Auftrag (siehe lade_auftraege) als Lohnzettel-PDF, über den PDF-Cache:
+    bei unveränderten Personendaten, Abrechnung und Ergebnis wird das PDF nur von der Platte gelesen
+    """
+    eingaben = {feld: auftrag[feld] for feld in ('mitarbeiter', 'brutto', 'netto', 'abrechnung_data', 'monat')}
+    # Die Fußzeile trägt das Erstellungsdatum, der Cache-Eintrag gilt daher nur für den Tag
+    eingaben['datum'] = datetime.date.today()
+    return pdf_cache.hole('lohnzettel', LOHNZETTEL_VERSION, eingaben, lambda: generate_real_payroll_pdf(
+        mitarbeiter_objekt(auftrag['mitarbeiter']), auftrag['brutto'], auftrag['netto'],
+        auftrag['abrechnung_data'], auftrag['monat']))
+
+
+def _render_block(block: List[Dict]) -> List[Tuple[str, bytes]]:
+    """Worker: einen Block von Aufträgen rendern"""
+    return [(auftrag['dateiname'], render(auftrag)) for auftrag in block]
+
+
+def lohnzettel_zip(db_path: str, monat: str, ziel: Union[str, Path, BinaryIO], workers: Optional[int] = None,
+                   executor: str = 'process', fortschritt: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Alle Lohnzettel des Monats parallel rendern und als ZIP-Archiv nach ziel (Pfad oder Datei-Objekt) schreiben.
+    Fertige Blöcke werden sofort ins Archiv geschrieben, fortschritt(erledigt, gesamt) nach jedem Block aufgerufen.
+    Es sind höchstens zwei Blöcke je Worker gleichzeitig in Arbeit, bei einem Archiv auf der Platte bleibt der
+    Speicherbedarf damit unabhängig von der Anzahl der Mitarbeiter.
+    Returns:
+        Dict: 'anzahl' (PDFs), 'seiten', 'bytes' (PDF-Daten unkomprimiert), 'dauer' und 'seiten_pro_s'
+    """
+    start = time.perf_counter()
+    auftraege = lade_auftraege(db_path, monat)
+    gesamt = len(auftraege)
+    workers = workers or os.cpu_count() or 1
+    blockgroesse = max(1, min(BLOCKGROESSE_MAX, math.ceil(gesamt / (workers * 4))))
+    bloecke = (auftraege[i:i + blockgroesse] for i in range(0, gesamt, blockgroesse))
+
+    seiten, groesse, erledigt = 0, 0, 0
+    pool_klasse = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with zipfile.ZipFile(ziel, 'w', compression=zipfile.ZIP_DEFLATED) as archiv:
+        if gesamt:
+            with pool_klasse(max_workers=workers) as pool:
+                offen = {}
+
+                def nachlegen():
+                    for block in itertools.islice(bloecke, workers * 2 - len(offen)):
+                        offen[pool.submit(_render_block, block)] = len(block)
+
+                nachlegen()
+                while offen:
+                    fertig, _ = wait(offen, return_when=FIRST_COMPLETED)
+                    for future in fertig:
+                        for name, pdf_bytes in future.result():
+                            archiv.writestr(name, pdf_bytes)
+                            seiten += len(_SEITE.findall(pdf_bytes))
+                            groesse += len(pdf_bytes)
+                        erledigt += offen.pop(future)
+                        if fortschritt:
+                            fortschritt(erledigt, gesamt)
+                    nachlegen()
+    dauer = time.perf_counter() - start
+
+    return {
+        'monat': monat,
+        'anzahl': gesamt,
+        'seiten': seiten,
+        'bytes': groesse,
+        'dauer': dauer,
+        'seiten_pro_s': seiten / dauer if dauer > 0 else 0.,
+    }
+
+
+def lohnzettel_zip_datei(db_path: str, monat: str, workers: Optional[int] = None, executor: str = 'process',
+                         fortschritt: Optional[Callable[[int, int], None]] = None) -> Tuple[Path, Dict]:
+    """
+    Wie lohnzettel_zip, das Archiv wird aber in eine temporäre Datei in EXPORT_DIR geschrieben
+    (für Downloads, die direkt von der Platte ausgeliefert werden). Der Aufrufer löscht die Datei,
+    sonst räumt export_aufraeumen sie nach EXPORT_MAX_ALTER Sekunden weg.
+    Returns:
+        (Pfad des Archivs, Kennzahlen wie bei lohnzettel_zip)
+    """
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    export_aufraeumen()
+    datei = tempfile.NamedTemporaryFile(prefix=f"Lohnzettel_{monat}_", suffix=".zip", dir=EXPORT_DIR, delete=False)
+    try:
+        with datei:
+            lauf = lohnzettel_zip(db_path, monat, datei, workers, executor, fortschritt)
+    except BaseException:
+        Path(datei.name).unlink(missing_ok=True)
+        raise
+    return Path(datei.name), lauf
+
+
+def export_aufraeumen(max_alter: Optional[float] = None):
+    """Temporäre Archive in EXPORT_DIR löschen, die älter als max_alter Sekunden sind (Standard EXPORT_MAX_ALTER)"""
+    grenze = time.time() - (EXPORT_MAX_ALTER if max_alter is None else max_alter)
+    for datei in itertools.chain(EXPORT_DIR.glob("Lohnzettel_*.zip"), EXPORT_DIR.glob("Lohnbuch_*.pdf")):
+        try:
+            if datei.stat().st_mtime < grenze:
+                datei.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _summen(auftrag: Dict) -> Dict[str, float]:
+    """Beträge eines Lohnzettels für die Übersicht im Lohnbuch (wie auf dem Lohnzettel ausgewiesen)"""
+    daten = auftrag['abrechnung_data']
+    return {
+        'brutto': auftrag['brutto'] + sum(daten.get(key, 0) for key, _ in EXTRA_BEZUEGE),
+        'sv': daten.get('SV', 0),
+        'lohnsteuer': daten.get('Lohnsteuer', 0),
+        'gewerkschaft': daten.get('Gewerkschaft', 0),
+        'netto': auftrag['netto'],
+    }
+
+
+def _deckblatt_seiten(anzahl: int) -> int:
+    """Seiten des Deckblatts (Zusammenfassung und Übersicht über anzahl Lohnzettel)"""
+    return 1 + max(0, math.ceil((anzahl - UEBERSICHT_ZEILEN_ERSTE) / UEBERSICHT_ZEILEN_WEITERE))
+
+
+def _lohnbuch_deckblatt(pdf: FPDF, monat: str, auftraege: List[Dict], seiten: int):
+    """Deckblatt des Lohnbuchs: Zusammenfassung des Monats und Übersicht aller Lohnzettel mit Verweis auf die Seite"""
+    summen = [_summen(auftrag) for auftrag in auftraege]
+    gesamt = {feld: sum(zeile[feld] for zeile in summen) for feld in ('brutto', 'sv', 'lohnsteuer', 'gewerkschaft', 'netto')}
+    month_year = datetime.datetime.strptime(monat, "%Y-%m").strftime('%B %Y')
+    spalten = (("Mitarbeiter", 70, 'L'), ("Pers.-Nr.", 20, 'C'), ("Brutto", 25, 'R'), ("SV", 25, 'R'),
+               ("Lohnsteuer", 25, 'R'), ("Netto", 25, 'R'))
+
+    def fusszeile(seite):
+        pdf.set_font("Arial", '', 7)
+        pdf.set_text_color(120, 120, 120)
+        pdf.set_xy(pdf.l_margin, 285)
+        pdf.cell(95, 3, f"Team Sigma GmbH | Lohnbuch {month_year}", align='L')
+        pdf.cell(95, 3, f"Seite {seite} | {datetime.date.today().strftime('%d.%m.%Y')}", align='R')
+
+    def tabellenkopf(y):
+        pdf.set_fill_color(*COLOR_TABLE_HEADER)
+        pdf.set_text_color(255, 255, 255)
+        pdf.set_draw_color(*COLOR_BORDER)
+        pdf.set_font("Arial", 'B', 8)
+        pdf.set_xy(10, y)
+        for titel, breite, _ in spalten:
+            pdf.cell(breite, 6, titel, border=1, fill=True, align='C')
+        pdf.set_text_color(*COLOR_TEXT_DARK)
+        pdf.set_font("Arial", '', 8)
+        return y + 6
+
+    # === ERSTE SEITE: KOPFZEILE UND ZUSAMMENFASSUNG ===
+    pdf.add_page()
+    pdf.lesezeichen("Übersicht", y=0)
+    pdf.set_fill_color(*COLOR_HEADER_BG)
+    pdf.rect(0, 0, 210, 45, 'F')
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Arial", 'B', 18)
+    pdf.set_xy(15, 8)
+    pdf.cell(0, 8, "Lohnbuch")
+    pdf.set_font("Arial", '', 9)
+    pdf.set_xy(15, 18)
+    pdf.cell(0, 4, "Team Sigma GmbH")
+    pdf.set_xy(15, 23)
+    pdf.cell(0, 4, "Wexstraße 19-23 | 1200 Wien")
+    pdf.set_font("Arial", 'B', 10)
+    pdf.set_xy(15, 35)
+    pdf.cell(0, 5, f"Abrechnungsmonat: {month_year}")
+
+    pdf.set_fill_color(*COLOR_TABLE_HEADER)
+    pdf.set_draw_color(*COLOR_BORDER)
+    pdf.set_line_width(0.3)
+    pdf.set_xy(10, 52)
+    pdf.cell(190, 7, "ZUSAMMENFASSUNG", border=1, fill=True, align='L')
+    y = 59
+    pdf.set_text_color(*COLOR_TEXT_DARK)
+    for i, (label, wert) in enumerate((
+        ("Anzahl Lohnzettel", str(len(auftraege))),
+        ("Bruttobezüge", f"{_betrag(gesamt['brutto'])} EUR"),
+        ("Sozialversicherung lfd.", f"{_betrag(gesamt['sv'])} EUR"),
+        ("Lohnsteuer", f"{_betrag(gesamt['lohnsteuer'])} EUR"),
+        ("Gewerkschaftsbeiträge", f"{_betrag(gesamt['gewerkschaft'])} EUR"),
+        ("Auszahlungsbeträge (Netto)", f"{_betrag(gesamt['netto'])} EUR"),
+    )):
+        pdf.set_fill_color(*(COLOR_GRAY_LIGHT if i % 2 == 0 else (255, 255, 255)))
+        pdf.set_xy(10, y)
+        pdf.set_font("Arial", 'B', 9)
+        pdf.cell(95, 6, f"  {label}", border=1, fill=True)
+        pdf.set_font("Arial", '', 9)
+        pdf.cell(95, 6, wert, border=1, fill=True, align='R')
+        y += 6
+
+    # === ÜBERSICHT DER LOHNZETTEL (MIT VERWEIS AUF DIE SEITE) ===
+    y = tabellenkopf(y + 8)
+    seite, zeilen_frei = 1, UEBERSICHT_ZEILEN_ERSTE
+    for i, (auftrag, zeile) in enumerate(zip(auftraege, summen)):
+        if zeilen_frei == 0:
+            fusszeile(seite)
+            pdf.add_page()
+            seite, zeilen_frei = seite + 1, UEBERSICHT_ZEILEN_WEITERE
+            pdf.set_line_width(0.3)
+            y = tabellenkopf(15)
+        mitarbeiter = auftrag['mitarbeiter']
+        verweis = pdf.add_link()
+        pdf.set_link(verweis, page=seiten + i + 1)
+        werte = (f"{mitarbeiter['PERS_SURNAME']} {mitarbeiter['PERS_FIRSTNAME']}", str(mitarbeiter['PERS_ID']),
+                 _betrag(zeile['brutto']), _betrag(zeile['sv']), _betrag(zeile['lohnsteuer']), _betrag(zeile['netto']))
+        pdf.set_xy(10, y)
+        for (_, breite, ausrichtung), wert in zip(spalten, werte):
+            pdf.cell(breite, 5, wert, border=1, align=ausrichtung, link=verweis)
+        y += 5
+        zeilen_frei -= 1
+    fusszeile(seite)
+
+
+def lohnbuch_pdf(auftraege: List[Dict], monat: str) -> bytes:
+    """
+    Lohnbuch des Monats als ein PDF: Deckblatt mit Zusammenfassung und Übersicht, danach ein Lohnzettel je Seite.
+    Schriften und die statischen Ebenen der Lohnzettel-Layouts (pdf_vorlage.SammelPDF) sind im Dokument nur
+    einmal enthalten, je Mitarbeiter gibt es ein Lesezeichen.
+    """
+    pdf = pdf_vorlage.SammelPDF()
+    pdf.set_auto_page_break(auto=False, margin=0)
+    pdf.set_title(f"Lohnbuch {monat}")
+    pdf.set_author("Team Sigma GmbH")
+    seiten = _deckblatt_seiten(len(auftraege))
+    _lohnbuch_deckblatt(pdf, monat, auftraege, seiten)
+    for i, auftrag in enumerate(auftraege):
+        mitarbeiter = auftrag['mitarbeiter']
+        lohnzettel_seite(pdf, mitarbeiter_objekt(mitarbeiter), auftrag['brutto'], auftrag['netto'],
+                         auftrag['abrechnung_data'], auftrag['monat'], seitennummer=seiten + i + 1)
+        pdf.lesezeichen(f"{mitarbeiter['PERS_SURNAME']} {mitarbeiter['PERS_FIRSTNAME']} ({mitarbeiter['PERS_ID']})", y=0)
+    return pdf.output(dest='S').encode('latin1')
+
+
+def lohnbuch(db_path: str, monat: str, ziel: Union[str, Path, BinaryIO]) -> Dict:
+    """
+    Lohnbuch des Monats (siehe lohnbuch_pdf) nach ziel (Pfad oder Datei-Objekt) schreiben.
+    Returns:
+        Dict: 'anzahl' (Lohnzettel), 'seiten', 'bytes' (Dateigröße), 'dauer' und 'seiten_pro_s'
+    """
+    start = time.perf_counter()
+    auftraege = lade_auftraege(db_path, monat)
+    pdf_bytes = lohnbuch_pdf(auftraege, monat)
+    if isinstance(ziel, (str, Path)):
+        Path(ziel).write_bytes(pdf_bytes)
+    else:
+        ziel.write(pdf_bytes)
+    dauer = time.perf_counter() - start
+    seiten = len(_SEITE.findall(pdf_bytes))
+
+    return {
+        'monat': monat,
+        'anzahl': len(auftraege),
+        'seiten': seiten,
+        'bytes': len(pdf_bytes),
+        'dauer': dauer,
+        'seiten_pro_s': seiten / dauer if dauer > 0 else 0.,
+    }
+
+
+def lohnbuch_datei(db_path: str, monat: str) -> Tuple[Path, Dict]:
+    """Wie lohnbuch, in eine temporäre Datei in EXPORT_DIR (siehe lohnzettel_zip_datei)"""
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    export_aufraeumen()
+    datei = tempfile.NamedTemporaryFile(prefix=f"Lohnbuch_{monat}_", suffix=".pdf", dir=EXPORT_DIR, delete=False)
+    try:
+        with datei:
+            lauf = lohnbuch(db_path, monat, datei)
+    except BaseException:
+        Path(datei.name).unlink(missing_ok=True)
+        raise
+    return Path(datei.name), lauf
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Lohnzettel aller Abrechnungen eines Monats als ZIP-Archiv oder Lohnbuch")
+    parser.add_argument("monat", help="Abrechnungsmonat im Format YYYY-MM")
+    parser.add_argument("--db", default=str(DB_PATH), help="Pfad zur SQLite-Datenbank")
+    parser.add_argument("--ziel", default=None, help="ZIP-Datei (Standard: Lohnzettel_<monat>.zip)")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl paralleler Worker (Standard: CPU-Kerne)")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process", help="Prozess- oder Thread-Pool")
+    parser.add_argument("--lohnbuch", action="store_true",
+                        help="Ein PDF mit Deckblatt und allen Lohnzetteln statt ZIP (Standard-Ziel: Lohnbuch_<monat>.pdf)")
+    args = parser.parse_args(argv)
+
+    if args.lohnbuch:
+        ziel = args.ziel or f"Lohnbuch_{args.monat}.pdf"
+        lauf = lohnbuch(args.db, args.monat, ziel)
+        print(f"Lohnbuch mit {lauf['anzahl']} Lohnzetteln ({lauf['seiten']} Seiten, {lauf['bytes'] / 1024:.0f} KiB) "
+              f"nach {ziel}, {lauf['dauer']:.2f} s, {lauf['seiten_pro_s']:.0f} Seiten/s")
+        return
+
+    def fortschritt(erledigt, gesamt):
+        print(f"\r{erledigt}/{gesamt} Lohnzettel erstellt", end="", file=sys.stderr, flush=True)
+
+    ziel = args.ziel or f"Lohnzettel_{args.monat}.zip"
+    lauf = lohnzettel_zip(args.db, args.monat, ziel, args.workers, args.executor, fortschritt)
+    print(file=sys.stderr)
+    print(f"{lauf['anzahl']} Lohnzettel ({lauf['seiten']} Seiten) nach {ziel}, "
+          f"{lauf['dauer']:.2f} s, {lauf['seiten_pro_s']:.0f} Seiten/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Versionierte Schema-Migrationen der SQLite-Datenbank
+Die Version steht in PRAGMA user_version. Eine Migration wird erst angewendet, wenn alle ihre
+Tabellen existieren (eine frisch zurückgesetzte Datenbank bekommt sie beim nächsten Start).
+Jede Migration läuft in einer Transaktion; ein Statement ist SQL-Text oder eine Funktion, die die
+Verbindung bekommt (für Schritte, die vom vorhandenen Schema abhängen).
+Schlägt eine Migration fehl, wird sie zurückgerollt und MigrationError ausgelöst: die App startet dann
+nicht gegen ein halb migriertes Schema. Eindeutige Indizes prüfen vorher auf doppelte Einträge und
+nennen sie in der Fehlermeldung.
+
+Aufruf aus dem Verzeichnis streamlit-projekt:
+    python -m modules.migrations            # migrieren und Abfragepläne prüfen
+"""
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+DB_PATH = Path(__file__).parent.parent / "stammdatenverwaltung.db"
+
+# Arbeitgeberseitige Spalten der ursprünglich ungenutzten Tabelle lohnverrechnung_dg
+DG_SPALTEN = {
+    'lv_dg_lv_dn_id': 'INTEGER',
+    'lv_dg_monat': 'TEXT',
+    'lv_dg_sv_sonder': 'NUMERIC DEFAULT 0',
+    'lv_dg_db': 'NUMERIC DEFAULT 0',
+    'lv_dg_dz': 'NUMERIC DEFAULT 0',
+    'lv_dg_bv': 'NUMERIC DEFAULT 0',
+}
+
+
+class MigrationError(RuntimeError):
+    """Eine Migration konnte nicht angewendet werden (oder das Schema ist zu alt)"""
+
+
+def _eindeutiger_index(name: str, tabelle: str, spalten: Tuple[str, ...]) -> Callable[[sqlite3.Connection], None]:
+    """Statement für einen UNIQUE-Index, das doppelte Einträge vorher meldet statt an ihnen zu scheitern"""
+    def anlegen(conn: sqlite3.Connection):
+        liste = ", ".join(spalten)
+        doppelt = conn.execute(
+            f"SELECT {liste}, COUNT(*) FROM {tabelle} GROUP BY {liste} HAVING COUNT(*) > 1 LIMIT 5").fetchall()
+        if doppelt:
+            beispiele = "; ".join(f"{tuple(zeile[:-1])} × {zeile[-1]}" for zeile in doppelt)
+            raise MigrationError(f"{tabelle} enthält doppelte Einträge für ({liste}), diese zuerst bereinigen: {beispiele}")
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {tabelle} ({liste})")
+    return anlegen
+
+
+def _spalten_ergaenzen(tabelle: str, spalten: Dict[str, str]) -> Callable[[sqlite3.Connection], None]:
+    """Statement, das fehlende Spalten anhängt (ältere Datenbanken haben einen Teil davon schon)"""
+    def ergaenzen(conn: sqlite3.Connection):
+        vorhanden = {row[1] for row in conn.execute(f"PRAGMA table_info({tabelle})")}
+        for spalte, typ in spalten.items():
+            if spalte not in vorhanden:
+                conn.execute(f"ALTER TABLE {tabelle} ADD COLUMN {spalte} {typ}")
+    return ergaenzen
+
+
+def _ergebnis_tabellen(conn: sqlite3.Connection):
+    """Gespeicherte Ergebnisse und Aufrollungs-Korrekturen, eine Spalte je Feld von Abrechnungsergebnis"""
+    # payroll importiert (über dbms) dieses Modul, daher erst hier
+    from modules.payroll import ERGEBNIS_SPALTEN, KORREKTUR_SPALTEN
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS lohnverrechnung_ergebnis (
+            le_lv_dn_id      INTEGER PRIMARY KEY,
+            le_empl_id       INTEGER NOT NULL,
+            le_monat         TEXT NOT NULL,
+            le_input_hash    TEXT NOT NULL,
+            le_berechnet_am  TEXT,
+            {", ".join(f"{spalte} REAL" for spalte in ERGEBNIS_SPALTEN)},
+            FOREIGN KEY (le_lv_dn_id) REFERENCES lohnverrechnung_dn(lv_dn_id),
+            FOREIGN KEY (le_empl_id) REFERENCES mitarbeiter(empl_id)
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS lohnverrechnung_aufrollung (
+            la_id            INTEGER PRIMARY KEY,
+            la_lv_dn_id      INTEGER NOT NULL,
+            la_empl_id       INTEGER NOT NULL,
+            la_monat         TEXT NOT NULL,
+            la_aufgerollt_am TEXT NOT NULL,
+            la_anlass        TEXT,
+            {", ".join(f"{spalte} REAL NOT NULL DEFAULT 0" for spalte in KORREKTUR_SPALTEN)},
+            FOREIGN KEY (la_lv_dn_id) REFERENCES lohnverrechnung_dn(lv_dn_id),
+            FOREIGN KEY (la_empl_id) REFERENCES mitarbeiter(empl_id)
+        )
+    """)
+
+
+def _jahressummen_fuellen(conn: sqlite3.Connection):
+    """Laufende Jahressummen einmalig aus den vorhandenen Abrechnungen berechnen"""
+    from modules.payroll import PayrollManager
+    PayrollManager.fill_jahressummen(conn.cursor())
+
+
+# (Version, Beschreibung, benötigte Tabellen, Statements)
+MIGRATIONS = [
+    (1, "Indizes für die häufigsten Lookups", (
+        "lohnverrechnung_dn", "steuerliche_vorteile", "MITARBEITER", "PERSON", "Benutzer", "Kinder"
+    ), (
+        _eindeutiger_index("idx_lv_dn_empl_monat", "lohnverrechnung_dn", ("lv_dn_empl_id", "lv_dn_monat")),
+        "CREATE INDEX IF NOT EXISTS idx_lv_dn_monat ON lohnverrechnung_dn (lv_dn_monat)",
+        _eindeutiger_index("idx_stv_empl", "steuerliche_vorteile", ("stv_empl_id",)),
+        "CREATE INDEX IF NOT EXISTS idx_mitarbeiter_pers ON MITARBEITER (PERS_ID)",
+        "CREATE INDEX IF NOT EXISTS idx_mitarbeiter_valid_to ON MITARBEITER (EMPL_VALID_TO)",
+        "CREATE INDEX IF NOT EXISTS idx_person_pers ON PERSON (PERS_ID)",
+        _eindeutiger_index("idx_benutzer_username", "Benutzer", ("username",)),
+        "CREATE INDEX IF NOT EXISTS idx_kinder_pers ON Kinder (child_adult_pers_no)",
+    )),
+    (2, "Arbeitgeberkosten je Abrechnung in lohnverrechnung_dg", ("lohnverrechnung_dn",), (
+        """
+        CREATE TABLE IF NOT EXISTS lohnverrechnung_dg (
+            lv_dg_id                   INTEGER PRIMARY KEY,
+            lv_dg_empl_id              INTEGER NOT NULL,
+            lv_dg_sv_abgaben           NUMERIC DEFAULT 0, -- Dienstgeber-SV
+            lv_dg_kommunalsteuer       NUMERIC DEFAULT 0,
+            lv_dg_ubahnsteuer          NUMERIC DEFAULT 0,
+            FOREIGN KEY (lv_dg_empl_id) REFERENCES mitarbeiter(empl_id)
+        )
+        """,
+        _spalten_ergaenzen("lohnverrechnung_dg", DG_SPALTEN),
+        _eindeutiger_index("idx_lv_dg_lv_dn", "lohnverrechnung_dg", ("lv_dg_lv_dn_id",)),
+        "CREATE INDEX IF NOT EXISTS idx_lv_dg_empl_monat ON lohnverrechnung_dg (lv_dg_empl_id, lv_dg_monat)",
+        "CREATE INDEX IF NOT EXISTS idx_lv_dg_monat ON lohnverrechnung_dg (lv_dg_monat)",
+    )),
+    (3, "Gespeicherte Ergebnisse, Aufrollungen und laufende Jahressummen", ("lohnverrechnung_dn",), (
+        _ergebnis_tabellen,
+        "CREATE INDEX IF NOT EXISTS idx_le_monat ON lohnverrechnung_ergebnis (le_monat)",
+        "CREATE INDEX IF NOT EXISTS idx_la_empl_monat ON lohnverrechnung_aufrollung (la_empl_id, la_monat)",
+        """
+        CREATE TABLE IF NOT EXISTS lohnverrechnung_jahressummen (
+            ljs_empl_id           INTEGER NOT NULL,
+            ljs_monat             TEXT NOT NULL,
+            ljs_laufend_kumuliert REAL NOT NULL DEFAULT 0,
+            ljs_sonder_kumuliert  REAL NOT NULL DEFAULT 0,
+            ljs_monate            INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ljs_empl_id, ljs_monat),
+            FOREIGN KEY (ljs_empl_id) REFERENCES mitarbeiter(empl_id)
+        )
+        """,
+        _jahressummen_fuellen,
+    )),
+]
+
+# Typische Abfragen der Seiten und der Index, den sie laut EXPLAIN QUERY PLAN verwenden müssen
+HOT_QUERIES = [
+    ("Abrechnungen eines Mitarbeiters",
+     "SELECT * FROM lohnverrechnung_dn WHERE lv_dn_empl_id = ? ORDER BY lv_dn_monat DESC", (1,), "idx_lv_dn_empl_monat"),
+    ("Abrechnung Mitarbeiter/Monat",
+     "SELECT COUNT(*) FROM lohnverrechnung_dn WHERE lv_dn_empl_id = ? AND lv_dn_monat = ?", (1, "2025-01"), "idx_lv_dn_empl_monat"),
+    ("Abrechnungen eines Monats",
+     "SELECT * FROM lohnverrechnung_dn WHERE lv_dn_monat = ?", ("2025-01",), "idx_lv_dn_monat"),
+    ("Steuerliche Vorteile",
+     "SELECT * FROM steuerliche_vorteile WHERE stv_empl_id = ?", (1,), "idx_stv_empl"),
+    ("Aktive Mitarbeiter",
+     "SELECT * FROM MITARBEITER WHERE EMPL_VALID_TO > ?", ("2025-01-01",), "idx_mitarbeiter_valid_to"),
+    ("Mitarbeiter einer Person",
+     "SELECT * FROM MITARBEITER WHERE PERS_ID = ?", (1,), "idx_mitarbeiter_pers"),
+    ("Person",
+     "SELECT * FROM PERSON WHERE PERS_ID = ?", (1,), "idx_person_pers"),
+    ("Login",
+     "SELECT * FROM Benutzer WHERE username = ?", ("admin",), "idx_benutzer_username"),
+    ("Kinder einer Person",
+     "SELECT * FROM Kinder WHERE child_adult_pers_no = ?", (1,), "idx_kinder_pers"),
+    ("Lohnnebenkosten eines Monats",
+     "SELECT lv_dg_empl_id, SUM(lv_dg_kommunalsteuer) FROM lohnverrechnung_dg WHERE lv_dg_monat = ? GROUP BY lv_dg_empl_id",
+     ("2025-01",), "idx_lv_dg_monat"),
+    ("Lohnnebenkosten Mitarbeiter/Monat",
+     "SELECT * FROM lohnverrechnung_dg WHERE lv_dg_empl_id = ? AND lv_dg_monat >= ?", (1, "2025-01"), "idx_lv_dg_empl_monat"),
+]
+
+
+def _tables(conn: sqlite3.Connection) -> set:
+    return {row[0].lower() for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def migrate(db_path: str) -> int:
+    """
+    Alle ausstehenden Migrationen anwenden, gibt die erreichte Schema-Version zurück.
+    Migrationen, deren Tabellen noch fehlen, bleiben (samt allen folgenden) offen.
+    Raises:
+        MigrationError: eine Migration ist fehlgeschlagen, die Datenbank bleibt auf der Version davor
+    """
+    conn = sqlite3.connect(str(db_path))
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = _tables(conn)
+        for ziel, beschreibung, benoetigt, statements in MIGRATIONS:
+            if ziel <= version:
+                continue
+            if not all(table.lower() in tables for table in benoetigt):
+                break
+            try:
+                conn.execute("BEGIN")
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {int(ziel)}")
+                conn.commit()
+            except (sqlite3.Error, MigrationError) as e:
+                conn.rollback()
+                raise MigrationError(f"Migration {ziel} ({beschreibung}) von {db_path} fehlgeschlagen: {e}") from e
+            version = ziel
+        return version
+    finally:
+        conn.close()
+
+
+def offene_migrationen(db_path: str) -> List[Tuple[int, str, List[str]]]:
+    """Noch nicht angewendete Migrationen mit den Tabellen, die ihnen fehlen"""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = _tables(conn)
+    finally:
+        conn.close()
+    return [(ziel, beschreibung, [table for table in benoetigt if table.lower() not in tables])
+            for ziel, beschreibung, benoetigt, _ in MIGRATIONS if ziel > version]
+
+
+def explain(db_path: str, sql: str, params: tuple = ()) -> List[str]:
+    """Details von EXPLAIN QUERY PLAN für eine Abfrage"""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    finally:
+        conn.close()
+
+
+def verify_indexes(db_path: str) -> List[Tuple[str, bool, List[str]]]:
+    """Prüft für jede Abfrage in HOT_QUERIES, dass der erwartete Index verwendet wird"""
+    ergebnis = []
+    for beschreibung, sql, params, index in HOT_QUERIES:
+        try:
+            plan = explain(db_path, sql, params)
+        except sqlite3.Error as e:
+            plan = [str(e)]
+        ergebnis.append((beschreibung, any(index in zeile for zeile in plan), plan))
+    return ergebnis
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else str(DB_PATH)
+    try:
+        print(f"Schema-Version: {migrate(db_path)}")
+    except MigrationError as e:
+        print(f"🚨 {e}")
+        sys.exit(1)
+    offen = offene_migrationen(db_path)
+    for ziel, beschreibung, fehlend in offen:
+        print(f"⏳ Migration {ziel} ({beschreibung}) offen, es fehlen: {', '.join(fehlend) or 'vorherige Migrationen'}")
+    ok = True
+    for beschreibung, verwendet, plan in verify_indexes(db_path):
+        ok = ok and verwendet
+        print(f"{'✅' if verwendet else '❌'} {beschreibung}: {'; '.join(plan)}")
+    sys.exit(0 if ok and not offen else 1)
@@ -0,0 +1,221 @@
+"""
+Monatslauf (Lohnverrechnung für alle aktiven Mitarbeiter eines Monats)
+Lädt alle aktiven Mitarbeiter mit ihren Abrechnungsdaten in einer Abfrage, berechnet die
+Abrechnungen parallel auf einem Prozess- oder Thread-Pool und legt fehlende Monatsabrechnungen
+in einer einzigen Transaktion an.
+
+Aufruf aus dem Verzeichnis streamlit-projekt:
+    python -m modules.monatslauf 2025-10 --workers 4 --executor process
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from modules import Abrechnung, dbms, payroll
+
+DB_PATH = Path(__file__).parent.parent / "stammdatenverwaltung.db"
+
+LV_DN_SPALTEN = [
+    'lv_dn_id', 'lv_dn_stundensatz', 'lv_dn_wochenstunden', 'lv_dn_brutto',
+    'lv_dn_mehrstunden0', 'lv_dn_mehrstunden25', 'lv_dn_mehrstunden50', 'lv_dn_ueberstunden50', 'lv_dn_ueberstunden100',
+    'lv_dn_sonderzahlungen', 'lv_dn_sachbezug', 'lv_dn_diäten', 'lv_dn_reisekosten', 'lv_dn_jahressechstel'
+]
+
+STV_SPALTEN = {
+    'stv_freibetrag': 'freibetrag',
+    'stv_pendlerpauschale': 'pendlerpauschale',
+    'stv_pendlereuro': 'pendlereuro',
+    'stv_anzahl_kinder_avab': 'anzahl_kinder_avab',
+    'stv_anspruch_fabo': 'anspruch_fabo',
+    'stv_gewerkschaft': 'gewerkschaft',
+}
+
+
+def lade_mitarbeiter(db_path: str, monat: str) -> List[Dict]:
+    """
+    Alle aktiven Mitarbeiter mit Monatsabrechnung (falls vorhanden), steuerlichen Vorteilen
+    und den Jahressummen vor dem Monat in einer einzigen Abfrage laden.
+    """
+    conn = dbms.connect(db_path)
+    cursor = conn.cursor()
+    query = f'''
+        SELECT m.EMPL_ID, m.PERS_ID, p.PERS_FIRSTNAME, p.PERS_SURNAME, m.EMPL_BRUTTOGEHALT,
+               {", ".join("l." + spalte for spalte in LV_DN_SPALTEN)},
+               {", ".join("s." + spalte for spalte in STV_SPALTEN)},
+               j.ljs_laufend_kumuliert, j.ljs_sonder_kumuliert, j.ljs_monate
+        FROM MITARBEITER m
+        JOIN PERSON p ON m.PERS_ID = p.PERS_ID
+        LEFT JOIN lohnverrechnung_dn l ON l.lv_dn_empl_id = m.EMPL_ID AND l.lv_dn_monat = ?
+        LEFT JOIN steuerliche_vorteile s ON s.stv_empl_id = m.EMPL_ID
+        LEFT JOIN lohnverrechnung_jahressummen j ON j.ljs_empl_id = m.EMPL_ID AND j.ljs_monat = (
+            SELECT MAX(ljs_monat) FROM lohnverrechnung_jahressummen
+            WHERE ljs_empl_id = m.EMPL_ID AND ljs_monat >= ? AND ljs_monat < ?
+        )
+        WHERE m.EMPL_VALID_TO > datetime('now')
+        ORDER BY p.PERS_SURNAME, p.PERS_FIRSTNAME
+    '''
+    cursor.execute(query, (monat, f"{monat[:4]}-01", monat))
+    rows = cursor.fetchall()
+    conn.close()
+
+    mitarbeiter = []
+    for row in rows:
+        empl_id, pers_id, vorname, nachname, gehalt = row[:5]
+        record = dict(zip(LV_DN_SPALTEN, row[5:5 + len(LV_DN_SPALTEN)]))
+        stv = row[5 + len(LV_DN_SPALTEN):5 + len(LV_DN_SPALTEN) + len(STV_SPALTEN)]
+        laufend, sonder, monate = row[-3:]
+        mitarbeiter.append({
+            'EMPL_ID': empl_id,
+            'PERS_ID': pers_id,
+            'FULL_NAME': f"{vorname} {nachname}",
+            'SALARY': gehalt,
+            'record': record if record['lv_dn_id'] is not None else None,
+            'tax_benefits': {name: wert or 0 for name, wert in zip(STV_SPALTEN.values(), stv)},
+            'jahressummen': {'laufend': laufend or 0., 'sonderzahlungen': sonder or 0., 'monate': monate or 0},
+        })
+    return mitarbeiter
+
+
+def lade_kinder(db_path: str) -> Dict[int, List[tuple]]:
+    """Kinder aller aktiven Mitarbeiter (child_birtday, child_valid_to) je EMPL_ID"""
+    conn = dbms.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT m.EMPL_ID, k.child_birtday, k.child_valid_to
+        FROM Kinder k
+        JOIN MITARBEITER m ON k.child_adult_pers_no = m.PERS_ID
+        WHERE m.EMPL_VALID_TO > datetime('now')
+    ''')
+    kinder = {}
+    for empl_id, geburtstag, valid_to in cursor.fetchall():
+        kinder.setdefault(empl_id, []).append((geburtstag, valid_to))
+    conn.close()
+    return kinder
+
+
+def _berechne_block(block: List[Tuple[Dict, Optional[Dict], Dict]]) -> List[Tuple[Dict, Abrechnung.Abrechnungsergebnis]]:
+    """
+    Worker: einen Block von (calc_brutto2netto-Argumente, Argumente für den Jahressechstel, Jahressummen) berechnen.
+    Fehlt der Jahressechstel in der Abrechnung, kommt er aus den laufenden Bezügen dieses Monats
+    (SV-Bemessungsgrundlage einer eigenen Berechnung) und den Jahressummen davor.
+    Returns: je Eintrag die tatsächlich verwendeten Argumente und das Ergebnis
+    """
+    berechnet = []
+    for params, sechstel_params, summen in block:
+        if sechstel_params is not None:
+            laufend = Abrechnung.calc_brutto2netto_cached(**sechstel_params).sv_bmg
+            params = dict(params, jahressechstel=payroll.PayrollManager._jahressechstel(summen, laufend))
+        berechnet.append((params, Abrechnung.calc_brutto2netto_cached(**params)))
+    return berechnet
+
+
+def monatslauf(db_path: str, monat: str, workers: Optional[int] = None, executor: str = 'process',
+               fortschritt: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Abrechnungen aller aktiven Mitarbeiter für den Monat (YYYY-MM) berechnen.
+    Mitarbeiter ohne Abrechnung für den Monat bekommen eine aus dem Grundgehalt, diese werden
+    zusammen mit allen Ergebnissen (lohnverrechnung_ergebnis) in einer Transaktion gespeichert.
+    fortschritt(erledigt, gesamt) wird nach jedem Block aufgerufen.
+    """
+    start = time.perf_counter()
+    manager = payroll.PayrollManager(db_path)
+    mitarbeiter = lade_mitarbeiter(db_path, monat)
+    kinder = lade_kinder(db_path)
+
+    neu = []  # Indizes der Mitarbeiter, deren Abrechnung neu angelegt wird
+    auftraege = []
+    for i, ma in enumerate(mitarbeiter):
+        record = ma['record']
+        if record is None:
+            record = {
+                'lv_dn_stundensatz': 38.5,
+                'lv_dn_wochenstunden': 38.5,
+                'lv_dn_brutto': manager._convert_salary(ma['SALARY']),
+            }
+            neu.append(i)
+        record.update({'lv_dn_empl_id': ma['EMPL_ID'], 'lv_dn_monat': monat})
+        summen = ma['jahressummen']
+        # Jahressechstel fehlt: die Worker berechnen ihn (wie PayrollManager._jahressummen_anteil)
+        sechstel_params = None if record.get('lv_dn_jahressechstel') else manager.build_calc_params(record, {})
+
+        altesonder = summen['sonderzahlungen'] if record.get('lv_dn_sonderzahlungen') else 0.
+        fabo_kinder = None
+        if ma['tax_benefits']['anspruch_fabo']:
+            fabo_kinder = manager.zaehle_fabo_kinder(kinder.get(ma['EMPL_ID'], []), monat)
+        auftraege.append((manager.build_calc_params(record, ma['tax_benefits'], altesonder, fabo_kinder),
+                          sechstel_params, summen))
+        ma['record'] = record
+
+    gesamt = len(auftraege)
+    workers = workers or os.cpu_count() or 1
+    blockgroesse = max(1, math.ceil(gesamt / (workers * 4)))
+    bloecke = [auftraege[i:i + blockgroesse] for i in range(0, gesamt, blockgroesse)]
+    ergebnisse = [None] * len(bloecke)
+
+    pool_klasse = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    erledigt = 0
+    if bloecke:
+        with pool_klasse(max_workers=workers) as pool:
+            futures = {pool.submit(_berechne_block, block): i for i, block in enumerate(bloecke)}
+            for future in as_completed(futures):
+                i = futures[future]
+                ergebnisse[i] = future.result()
+                erledigt += len(bloecke[i])
+                if fortschritt:
+                    fortschritt(erledigt, gesamt)
+    params = [p for block in ergebnisse for p, _ in block]
+    berechnet = [ergebnis for block in ergebnisse for _, ergebnis in block]
+    for ma, p in zip(mitarbeiter, params):
+        ma['record']['lv_dn_jahressechstel'] = p['jahressechstel']
+    rechenzeit = time.perf_counter() - start
+
+    # Neue Abrechnungen und ihre Ergebnisse gemeinsam speichern (alles oder nichts), damit Seiten
+    # und PDFs die Ergebnisse nicht erneut berechnen
+    with manager.transaction():
+        neu_angelegt = 0
+        if neu:
+            neu_angelegt = manager.create_payroll_records([mitarbeiter[i]['record'] for i in neu],
+                                                          [berechnet[i].sv_bmg for i in neu])
+        manager.store_payroll_results([(ma['record'], p, e) for ma, p, e in zip(mitarbeiter, params, berechnet)])
+    dauer = time.perf_counter() - start
+
+    return {
+        'monat': monat,
+        'anzahl': gesamt,
+        'neu_angelegt': neu_angelegt,
+        'dauer': dauer,
+        'durchsatz': gesamt / rechenzeit if rechenzeit > 0 else 0.,
+        'ergebnisse': [
+            {'EMPL_ID': ma['EMPL_ID'], 'FULL_NAME': ma['FULL_NAME'], 'record': ma['record'], 'ergebnis': ergebnis}
+            for ma, ergebnis in zip(mitarbeiter, berechnet)
+        ],
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Monatslauf der Lohnverrechnung für alle aktiven Mitarbeiter")
+    parser.add_argument("monat", help="Abrechnungsmonat im Format YYYY-MM")
+    parser.add_argument("--db", default=str(DB_PATH), help="Pfad zur SQLite-Datenbank")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl paralleler Worker (Standard: CPU-Kerne)")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process", help="Prozess- oder Thread-Pool")
+    args = parser.parse_args(argv)
+
+    def fortschritt(erledigt, gesamt):
+        print(f"\r{erledigt}/{gesamt} Mitarbeiter berechnet", end="", file=sys.stderr, flush=True)
+
+    lauf = monatslauf(args.db, args.monat, args.workers, args.executor, fortschritt)
+    print(file=sys.stderr)
+    for zeile in lauf['ergebnisse']:
+        ergebnis = zeile['ergebnis']
+        print(f"{zeile['EMPL_ID']:>6}  {zeile['FULL_NAME']:<30} Brutto {ergebnis.brlohn:>10.2f}  Netto {ergebnis.netto:>10.2f}")
+    print(f"{lauf['anzahl']} Mitarbeiter, {lauf['neu_angelegt']} Abrechnungen neu angelegt, "
+          f"{lauf['dauer']:.2f} s, {lauf['durchsatz']:.0f} Mitarbeiter/s")
+
+
+if __name__ == "__main__":
+    main()
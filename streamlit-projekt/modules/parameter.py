@@ -0,0 +1,162 @@
+"""
+Gültigkeitsbezogene Rechengrößen (SV, Lohnsteuer, Lohnnebenkosten) für Abrechnung.calc_brutto2netto
+Jeder Eintrag in PARAMETERSAETZE gilt ab dem angegebenen Monat und übernimmt alle nicht genannten Werte
+vom vorherigen Eintrag, ein neues Jahr oder eine Änderung unter dem Jahr ist damit nur ein neuer Eintrag.
+Die Sätze werden beim ersten Zugriff einmal aufbereitet (sortierte Grenzen und Sätze je Tarifstufe), die
+Stufensuche ist dann ein bisect bzw. np.searchsorted.
+"""
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# (gültig ab YYYY-MM, Werte)
+PARAMETERSAETZE: List[Tuple[str, Dict[str, float]]] = [
+    ("2025-01", {
+        'SV_DG_PROZENT': 0.2038,
+        'SV_DG_IE_PROZENT': 0.001,
+        'SV_DG_WB_PROZENT': 0.005,
+        'SV_DG_HBGL_PROZENT': 0.2123,
+        'SV_DN_GRENZE_0': 2074.0,
+        'SV_DN_GRENZE_1': 2262.0,
+        'SV_DN_GRENZE_2': 2451.0,
+        'SV_DN_PROZENT_0': 0.1412,
+        'SV_DN_PROZENT_1': 0.1512,
+        'SV_DN_PROZENT_2': 0.1612,
+        'SV_DN_PROZENT_3': 0.1707,
+        'SV_DN_AK_PROZENT': 0.005,
+        'SV_DN_WB_PROZENT': 0.005,
+        'SV_DN_MBV_PROZENT': 0.0153,
+        'SV_HBGL': 6450.0,
+
+        'LST_68_1': 400.,
+        'LST_68_2_STUNDEN': 18.,
+        'LST_68_2_WERT': 200.,
+
+        'DGA_WIEN': 2.,
+
+        'KOMM_ST_PROZENT': 0.03,
+        'DB_PROZENT': 0.037,
+        'DBZ_PROZENT': 0.0036,
+
+        'LST_SZ_FREI': 620.,
+        'LST_SZ_1': 24380.,
+        'LST_SZ_2': 49380.,
+        'LST_SZ_3': 83333.,
+        'LST_SZ_1_PROZENT': 0.06,
+        'LST_SZ_2_PROZENT': 0.27,
+        'LST_SZ_3_PROZENT': 0.3575,
+
+        'LST_AVAB_1K': 50.08,
+        'LST_AVAB_2K': 67.75,
+        'LST_AVAB_3KUND': 22.33,
+
+        'FABO_U18G': 166.68,
+        'FABO_U18H': 83.34,
+        'FABO_UE18G': 58.34,
+        'FABO_UE18H': 29.17,
+        'LST_VAB': 40.58,
+
+        'LST_ST1': 1120.,
+        'LST_ST2': 1812.45,
+        'LST_ST3': 2997.33,
+        'LST_ST4': 5774.83,
+        'LST_ST5': 8600.33,
+        'LST_ST6': 83344.33,
+
+        'LST_ST1_PROZENT': 0.,
+        'LST_ST2_PROZENT': 0.20,
+        'LST_ST3_PROZENT': 0.3,
+        'LST_ST4_PROZENT': 0.4,
+        'LST_ST5_PROZENT': 0.48,
+        'LST_ST6_PROZENT': 0.5,
+        'LST_ST7_PROZENT': 0.55,
+
+        'LST_ST2_ABZUG': 224.,
+        'LST_ST3_ABZUG': 405.24,
+        'LST_ST4_ABZUG': 704.94,
+        'LST_ST5_ABZUG': 1166.96,
+        'LST_ST6_ABZUG': 1338.97,
+        'LST_ST7_ABZUG': 5506.19,
+
+        'OEGB_PROZENT': 0.01,
+        'OEGB_GRENZWERT': 40.8,
+    }),
+]
+
+
+class Parametersatz:
+    """
+    Rechengrößen eines Gültigkeitszeitraums. Die Einzelwerte sind als Attribute unter ihren bisherigen
+    Namen erreichbar (z.B. SV_HBGL), dazu kommen die aufbereiteten Tariftabellen.
+    """
+
+    def __init__(self, gueltig_ab: str, werte: Dict[str, float]):
+        self.gueltig_ab = gueltig_ab
+        self.werte = dict(werte)
+        for name, wert in werte.items():
+            setattr(self, name, wert)
+
+        # SV-Dienstnehmersatz: Stufe = Anzahl der Grenzen <= Bemessungsgrundlage
+        self.sv_grenzen = (self.SV_DN_GRENZE_0, self.SV_DN_GRENZE_1, self.SV_DN_GRENZE_2)
+        self.sv_dn_saetze = (self.SV_DN_PROZENT_0, self.SV_DN_PROZENT_1, self.SV_DN_PROZENT_2, self.SV_DN_PROZENT_3)
+
+        # Lohnsteuertarif laufend: Stufe 0 ist steuerfrei und ohne Verkehrsabsetzbetrag
+        self.lst_grenzen = (self.LST_ST1, self.LST_ST2, self.LST_ST3, self.LST_ST4, self.LST_ST5, self.LST_ST6)
+        self.lst_saetze = (self.LST_ST1_PROZENT, self.LST_ST2_PROZENT, self.LST_ST3_PROZENT, self.LST_ST4_PROZENT,
+                           self.LST_ST5_PROZENT, self.LST_ST6_PROZENT, self.LST_ST7_PROZENT)
+        self.lst_abzuege = (0., self.LST_ST2_ABZUG, self.LST_ST3_ABZUG, self.LST_ST4_ABZUG, self.LST_ST5_ABZUG,
+                            self.LST_ST6_ABZUG, self.LST_ST7_ABZUG)
+        self.lst_vab = (0.,) + (self.LST_VAB,) * 6
+
+        # Sonstige Bezüge: Stufen 1..3 mit Sätzen, Stufe 0 = Tarif ausgeschöpft
+        self.lst_sz_grenzen = (self.LST_SZ_1, self.LST_SZ_2, self.LST_SZ_3)
+        self.lst_sz_rest_grenzen = (self.LST_SZ_1, self.LST_SZ_2, self.LST_SZ_3 - self.LST_SZ_FREI)
+        self.lst_sz_saetze = (self.LST_SZ_1_PROZENT, self.LST_SZ_2_PROZENT, self.LST_SZ_3_PROZENT)
+
+    def sv_dn_satz(self, bmg: float) -> float:
+        """SV-Dienstnehmersatz (ohne AK/WB) für eine Bemessungsgrundlage"""
+        return self.sv_dn_saetze[bisect_right(self.sv_grenzen, bmg)]
+
+    def lst_stufe(self, lst_bmg: float) -> int:
+        """Stufe des laufenden Lohnsteuertarifs (0 = steuerfrei)"""
+        return bisect_right(self.lst_grenzen, lst_bmg)
+
+    def __repr__(self) -> str:
+        return f"Parametersatz(gültig ab {self.gueltig_ab})"
+
+
+def _schluessel(jahr: int, monat: int) -> int:
+    return int(jahr) * 12 + int(monat) - 1
+
+
+@lru_cache(maxsize=None)
+def _saetze() -> Tuple[Tuple[int, ...], Tuple[Parametersatz, ...]]:
+    """Alle Parametersätze, nach Beginn sortiert und mit den geerbten Werten aufgefüllt"""
+    eintraege = sorted(PARAMETERSAETZE, key=lambda e: e[0])
+    schluessel, saetze, werte = [], [], {}
+    for gueltig_ab, aenderungen in eintraege:
+        werte = {**werte, **aenderungen}
+        schluessel.append(_schluessel(int(gueltig_ab[:4]), int(gueltig_ab[5:7])))
+        saetze.append(Parametersatz(gueltig_ab, werte))
+    return tuple(schluessel), tuple(saetze)
+
+
+def index_fuer(jahr: int, monat: int) -> int:
+    """Position des gültigen Parametersatzes; Monate vor dem ersten Satz verwenden den ersten"""
+    schluessel, _ = _saetze()
+    return max(bisect_right(schluessel, _schluessel(jahr, monat)) - 1, 0)
+
+
+def fuer_monat(jahr: int, monat: int) -> Parametersatz:
+    """Der für den Abrechnungsmonat gültige Parametersatz"""
+    return _saetze()[1][index_fuer(jahr, monat)]
+
+
+def alle() -> Tuple[Parametersatz, ...]:
+    """Alle Parametersätze in zeitlicher Reihenfolge (Index passend zu index_fuer)"""
+    return _saetze()[1]
+
+
+def schluessel() -> Tuple[int, ...]:
+    """Beginn jedes Parametersatzes als jahr * 12 + monat - 1, für np.searchsorted im Batch-Rechner"""
+    return _saetze()[0]
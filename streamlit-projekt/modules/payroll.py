@@ -2,19 +2,45 @@
 Payroll module for managing salary calculations and payroll records
 Works with the new database schema (lohnverrechnung_dn table)
 """
-import sqlite3
+import hashlib
+import json
 from datetime import datetime
-from typing import List, Dict, Optional
-from modules import dbms
+from typing import List, Dict, Optional, Tuple
+from modules import dbms, Abrechnung, parameter
+
+# Schema version (modules.migrations) that provides lohnverrechnung_ergebnis, _aufrollung and _jahressummen
+SCHEMA_VERSION = 3
+
+# Result columns of lohnverrechnung_ergebnis, in the field order of Abrechnung.Abrechnungsergebnis
+ERGEBNIS_SPALTEN = [f"le_{feld.lower()}" for feld in Abrechnung.Abrechnungsergebnis._fields]
+
+# Correction columns of lohnverrechnung_aufrollung (new minus previously stored result, see modules.aufrollung)
+KORREKTUR_SPALTEN = [f"la_{feld.lower()}" for feld in Abrechnung.Abrechnungsergebnis._fields]
+
+# Cost columns of the Lohnnebenkosten report: name → expression over lohnverrechnung_dg
+LNK_SPALTEN = {
+    'sv_dg': 'd.lv_dg_sv_abgaben + COALESCE(d.lv_dg_sv_sonder, 0)',
+    'kommunalsteuer': 'd.lv_dg_kommunalsteuer',
+    'ubahnsteuer': 'd.lv_dg_ubahnsteuer',
+    'db': 'd.lv_dg_db',
+    'dz': 'd.lv_dg_dz',
+    'bv': 'd.lv_dg_bv',
+}
 
 class PayrollManager:
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.db = dbms.dbms(db_path)
+        # Fail here with a clear message instead of "no such table" in the middle of a run
+        self.db.manager.require_schema(SCHEMA_VERSION)
+
+    def transaction(self):
+        """Unit of work: all PayrollManager calls inside the with-block are committed together"""
+        return dbms.transaction(self.db_path)
     
     def get_employee_payroll_history(self, empl_id: int) -> List[Dict]:
         """Get payroll history for an employee using EMPL_ID"""
-        conn = sqlite3.connect(self.db_path)
+        conn = dbms.connect(self.db_path)
         cursor = conn.cursor()
         
         query = '''
@@ -40,7 +66,7 @@ class PayrollManager:
     
     def get_tax_benefits(self, empl_id: int) -> Dict:
         """Get tax benefits for an employee"""
-        conn = sqlite3.connect(self.db_path)
+        conn = dbms.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('''
             SELECT stv_freibetrag, stv_pendlerpauschale, stv_pendlereuro, 
@@ -69,10 +95,256 @@ class PayrollManager:
             'gewerkschaft': 0
         }
     
+    def get_sonderzahlungen_bisher(self, empl_id: int, monat: str) -> float:
+        """Sum of Sonderzahlungen paid in the same year before the given month (YYYY-MM)"""
+        return float(self.get_jahressummen(empl_id, monat)['sonderzahlungen'])
+
+    def get_fabo_kinder(self, empl_id: int, monat: str) -> Dict:
+        """
+        Count the children of an employee for the Familienbonus Plus from the Kinder table.
+        Children under 18 at the start of the month count as 'unter 18', children from 18 until
+        their 24th birthday (Familienbeihilfe) as 'über 18'. The table has no split of the claim
+        between parents, so every child counts with the full amount.
+        """
+        conn = dbms.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT k.child_birtday, k.child_valid_to
+            FROM Kinder k
+            JOIN MITARBEITER m ON k.child_adult_pers_no = m.PERS_ID
+            WHERE m.EMPL_ID = ?
+        ''', (empl_id,))
+        results = cursor.fetchall()
+        conn.close()
+        return self.zaehle_fabo_kinder(results, monat)
+
+    def zaehle_fabo_kinder(self, kinder_rows: List[tuple], monat: str) -> Dict:
+        """Count (child_birtday, child_valid_to) rows into the Familienbonus arguments for the given month"""
+        stichtag = datetime.strptime(f"{monat[:7]}-01", "%Y-%m-%d")
+        kinder = {'fabo_u18g': 0, 'fabo_u18h': 0, 'fabo_ue18g': 0, 'fabo_ue18h': 0}
+        for geburtstag, valid_to in kinder_rows:
+            geburtstag = self._parse_date(geburtstag)
+            if geburtstag is None or geburtstag > stichtag:
+                continue
+            ende = self._parse_date(valid_to)
+            if ende is not None and ende < stichtag:
+                continue
+            alter = stichtag.year - geburtstag.year - ((stichtag.month, stichtag.day) < (geburtstag.month, geburtstag.day))
+            if alter < 18:
+                kinder['fabo_u18g'] += 1
+            elif alter < 24:
+                kinder['fabo_ue18g'] += 1
+        return kinder
+
+    def _parse_date(self, value) -> Optional[datetime]:
+        """Parse a date stored as DD.MM.YYYY or YYYY-MM-DD"""
+        if not value:
+            return None
+        for fmt in ("%d.%m.%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S"):
+            try:
+                return datetime.strptime(str(value), fmt)
+            except ValueError:
+                continue
+        return None
+
+    @staticmethod
+    def build_calc_params(payroll_record: Dict, tax_benefits: Dict, altesonder: float = 0.,
+                          fabo_kinder: Optional[Dict] = None) -> Dict:
+        """
+        Map a lohnverrechnung_dn record and its tax benefits to the arguments of Abrechnung.calc_brutto2netto.
+        A missing Stundensatz defaults to 38.5 like in abrechnung_batch; 0 or less raises a ValueError.
+        """
+        monat_str = payroll_record['lv_dn_monat']
+        stundensatz = payroll_record.get('lv_dn_stundensatz')
+        stundensatz = 38.5 if stundensatz is None else float(stundensatz)
+        if stundensatz <= 0:
+            raise ValueError(f"Stundensatz muss größer als 0 sein (Abrechnung {payroll_record.get('lv_dn_id')})")
+        params = {
+            'monat': int(monat_str.split('-')[1]),
+            'jahr': int(monat_str.split('-')[0]),
+            'stundensatz': stundensatz,
+            'brutto': float(payroll_record.get('lv_dn_brutto', 0) or 0),
+            'mehrstunden0': float(payroll_record.get('lv_dn_mehrstunden0', 0) or 0),
+            'mehrstunden25': float(payroll_record.get('lv_dn_mehrstunden25', 0) or 0),
+            'mehrstunden50': float(payroll_record.get('lv_dn_mehrstunden50', 0) or 0),
+            'überstunden50': float(payroll_record.get('lv_dn_ueberstunden50', 0) or 0),
+            'überstunden100': float(payroll_record.get('lv_dn_ueberstunden100', 0) or 0),
+            'sonderzahlungen': float(payroll_record.get('lv_dn_sonderzahlungen', 0) or 0),
+            'sachbezug': float(payroll_record.get('lv_dn_sachbezug', 0) or 0),
+            'diäten': float(payroll_record.get('lv_dn_diäten', 0) or 0),
+            'reisekosten': float(payroll_record.get('lv_dn_reisekosten', 0) or 0),
+            'freibetragsbescheid': float(tax_benefits.get('freibetrag', 0)),
+            'pendlerpauschale': float(tax_benefits.get('pendlerpauschale', 0)),
+            'pendlereuro': float(tax_benefits.get('pendlereuro', 0)),
+            'anzahl_Kinder_AVAB': int(tax_benefits.get('anzahl_kinder_avab', 0)),
+            'anspruch_fabo': bool(tax_benefits.get('anspruch_fabo', 0)),
+            'gewerkschaftmitglied': bool(tax_benefits.get('gewerkschaft', 0)),
+            'jahressechstel': float(payroll_record.get('lv_dn_jahressechstel', 0) or 0),
+            'altesonder': float(altesonder),
+        }
+        params.update(fabo_kinder or {})
+        return params
+
+    def build_payroll_params(self, payroll_record: Dict, tax_benefits: Optional[Dict] = None) -> Dict:
+        """
+        Arguments of Abrechnung.calc_brutto2netto for a stored payroll record.
+        Year-to-date Sonderzahlungen and the children for the Familienbonus are read from the database.
+        """
+        empl_id = payroll_record['lv_dn_empl_id']
+        monat = payroll_record['lv_dn_monat']
+        if tax_benefits is None:
+            tax_benefits = self.get_tax_benefits(empl_id)
+
+        altesonder = 0.
+        if float(payroll_record.get('lv_dn_sonderzahlungen', 0) or 0) != 0.:
+            altesonder = self.get_sonderzahlungen_bisher(empl_id, monat)
+        fabo_kinder = None
+        if tax_benefits.get('anspruch_fabo', 0):
+            fabo_kinder = self.get_fabo_kinder(empl_id, monat)
+
+        return self.build_calc_params(payroll_record, tax_benefits, altesonder, fabo_kinder)
+
+    def calculate_payroll(self, payroll_record: Dict, tax_benefits: Optional[Dict] = None) -> Abrechnung.Abrechnungsergebnis:
+        """Calculate a stored payroll record without any user interaction (memoized, see Abrechnung.calc_brutto2netto_cached)"""
+        return Abrechnung.calc_brutto2netto_cached(**self.build_payroll_params(payroll_record, tax_benefits))
+
+    def get_payroll_result(self, payroll_record: Dict, tax_benefits: Optional[Dict] = None) -> Abrechnung.Abrechnungsergebnis:
+        """
+        Result of a stored payroll record, read from lohnverrechnung_ergebnis.
+        The engine only runs if there is no stored result yet or its input hash no longer matches
+        (record, tax benefits, year-to-date Sonderzahlungen, children or parameter set changed);
+        the new result is stored for the next call.
+        """
+        params = self.build_payroll_params(payroll_record, tax_benefits)
+        lv_dn_id = payroll_record.get('lv_dn_id')
+        if lv_dn_id is None:
+            return Abrechnung.calc_brutto2netto_cached(**params)
+
+        input_hash = self.result_hash(params)
+        conn = dbms.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT le_input_hash, {", ".join(ERGEBNIS_SPALTEN)}
+                FROM lohnverrechnung_ergebnis WHERE le_lv_dn_id = ?
+            ''', (lv_dn_id,))
+            row = cursor.fetchone()
+            if row is not None and row[0] == input_hash:
+                return Abrechnung.Abrechnungsergebnis(*row[1:])
+
+            ergebnis = Abrechnung.calc_brutto2netto_cached(**params)
+            self._store_payroll_result(cursor, payroll_record, input_hash, ergebnis)
+            conn.commit()
+            return ergebnis
+        finally:
+            conn.close()
+
+    def store_payroll_results(self, results: List[Tuple[Dict, Dict, Abrechnung.Abrechnungsergebnis]]) -> int:
+        """
+        Store already calculated results (payroll record, calc_brutto2netto arguments, result) in one transaction,
+        e.g. after a month-end run. Records without lv_dn_id are skipped; returns the number stored.
+        """
+        rows = [(payroll_record, self.result_hash(params), ergebnis)
+                for payroll_record, params, ergebnis in results if payroll_record.get('lv_dn_id') is not None]
+        conn = dbms.connect(self.db_path)
+        try:
+            self._store_payroll_results(conn.cursor(), rows)
+            conn.commit()
+            return len(rows)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def result_hash(params: Dict) -> str:
+        """Hash over all engine inputs of a payroll record and the parameter set valid for its month"""
+        satz = parameter.fuer_monat(params['jahr'], params['monat'])
+        inhalt = json.dumps({'params': params, 'parameter': satz.werte}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(inhalt.encode('utf-8')).hexdigest()
+
+    def _store_payroll_result(self, cursor, payroll_record: Dict, input_hash: str, ergebnis: Abrechnung.Abrechnungsergebnis):
+        """Write one result to lohnverrechnung_ergebnis and its employer costs to lohnverrechnung_dg without committing"""
+        self._store_payroll_results(cursor, [(payroll_record, input_hash, ergebnis)])
+
+    def _store_payroll_results(self, cursor, rows: List[Tuple[Dict, str, Abrechnung.Abrechnungsergebnis]]):
+        """
+        Bulk variant of _store_payroll_result for (payroll record, input hash, result) rows: one executemany
+        into lohnverrechnung_ergebnis and one upsert of the employer costs into lohnverrechnung_dg, without committing.
+        """
+        berechnet_am = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.executemany(f'''
+            INSERT OR REPLACE INTO lohnverrechnung_ergebnis (
+                le_lv_dn_id, le_empl_id, le_monat, le_input_hash, le_berechnet_am, {", ".join(ERGEBNIS_SPALTEN)}
+            ) VALUES (?, ?, ?, ?, ?, {", ".join("?" * len(ERGEBNIS_SPALTEN))})
+        ''', [
+            (record['lv_dn_id'], record['lv_dn_empl_id'], record['lv_dn_monat'], input_hash, berechnet_am, *ergebnis)
+            for record, input_hash, ergebnis in rows
+        ])
+        cursor.executemany('''
+            INSERT INTO lohnverrechnung_dg (
+                lv_dg_lv_dn_id, lv_dg_empl_id, lv_dg_monat, lv_dg_sv_abgaben, lv_dg_sv_sonder,
+                lv_dg_kommunalsteuer, lv_dg_ubahnsteuer, lv_dg_db, lv_dg_dz, lv_dg_bv
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (lv_dg_lv_dn_id) DO UPDATE SET
+                lv_dg_empl_id = excluded.lv_dg_empl_id, lv_dg_monat = excluded.lv_dg_monat,
+                lv_dg_sv_abgaben = excluded.lv_dg_sv_abgaben, lv_dg_sv_sonder = excluded.lv_dg_sv_sonder,
+                lv_dg_kommunalsteuer = excluded.lv_dg_kommunalsteuer, lv_dg_ubahnsteuer = excluded.lv_dg_ubahnsteuer,
+                lv_dg_db = excluded.lv_dg_db, lv_dg_dz = excluded.lv_dg_dz, lv_dg_bv = excluded.lv_dg_bv
+        ''', [
+            (record['lv_dn_id'], record['lv_dn_empl_id'], record['lv_dn_monat'], ergebnis.dienstg_sv,
+             ergebnis.dienstg_svsonder, ergebnis.kommst, ergebnis.dga, ergebnis.db, ergebnis.dz, ergebnis.BV)
+            for record, _, ergebnis in rows
+        ])
+
+    def get_lohnnebenkosten(self, zeitraum: str) -> List[Dict]:
+        """
+        Employer costs (Lohnnebenkosten) from lohnverrechnung_dg, aggregated in SQL.
+        For a month (YYYY-MM) one row per employee, for a year (YYYY) one row per month; every row has
+        'anzahl', the cost columns of LNK_SPALTEN and 'summe'.
+        """
+        summen = ", ".join(f"SUM({ausdruck}) AS {name}" for name, ausdruck in LNK_SPALTEN.items())
+        gesamt = " + ".join(f"COALESCE({ausdruck}, 0)" for ausdruck in LNK_SPALTEN.values())
+        if len(zeitraum) == 4:
+            query = f'''
+                SELECT d.lv_dg_monat AS monat, COUNT(*) AS anzahl, {summen}, SUM({gesamt}) AS summe
+                FROM lohnverrechnung_dg d
+                WHERE d.lv_dg_monat >= ? AND d.lv_dg_monat <= ?
+                GROUP BY d.lv_dg_monat
+                ORDER BY d.lv_dg_monat
+            '''
+            werte = (f"{zeitraum}-01", f"{zeitraum}-12")
+        else:
+            # Names are looked up after aggregating, PERSON keeps several (historised) rows per PERS_ID
+            query = f'''
+                SELECT (
+                    SELECT p.PERS_FIRSTNAME || ' ' || p.PERS_SURNAME
+                    FROM MITARBEITER m JOIN PERSON p ON p.PERS_ID = m.PERS_ID
+                    WHERE m.EMPL_ID = a.empl_id
+                    ORDER BY p.PERS_VALID_TO DESC LIMIT 1
+                ) AS name, a.*
+                FROM (
+                    SELECT d.lv_dg_empl_id AS empl_id, COUNT(*) AS anzahl, {summen}, SUM({gesamt}) AS summe
+                    FROM lohnverrechnung_dg d
+                    WHERE d.lv_dg_monat = ?
+                    GROUP BY d.lv_dg_empl_id
+                ) a
+                ORDER BY name
+            '''
+            werte = (zeitraum,)
+        conn = dbms.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(query, werte)
+        spalten = [beschreibung[0] for beschreibung in cursor.description]
+        rows = [dict(zip(spalten, row)) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
     def save_tax_benefits(self, empl_id: int, benefits: Dict) -> bool:
         """Save or update tax benefits for an employee"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = dbms.connect(self.db_path)
             cursor = conn.cursor()
             
             # Check if record exists
@@ -121,12 +393,107 @@ class PayrollManager:
             return True
         except Exception as e:
             print(f"Error saving tax benefits: {e}")
+            if dbms.get_manager(self.db_path).in_unit_of_work:
+                raise
             return False
     
+    def rebuild_jahressummen(self):
+        """Recompute all running totals from lohnverrechnung_dn (repair)"""
+        conn = dbms.connect(self.db_path)
+        self.fill_jahressummen(conn.cursor())
+        conn.commit()
+        conn.close()
+
+    @classmethod
+    def fill_jahressummen(cls, cursor):
+        """
+        Rewrite lohnverrechnung_jahressummen from lohnverrechnung_dn on the given cursor without committing.
+        One row per employee and month holds the totals of the year up to and including that month,
+        so year-to-date lookups are a single index seek instead of summing all prior months.
+        Also used by the migration that creates the table.
+        """
+        cursor.execute('''
+            SELECT lv_dn_empl_id, lv_dn_monat, lv_dn_stundensatz, lv_dn_brutto,
+                   lv_dn_mehrstunden0, lv_dn_mehrstunden25, lv_dn_mehrstunden50,
+                   lv_dn_ueberstunden50, lv_dn_ueberstunden100, lv_dn_sonderzahlungen, lv_dn_sachbezug
+            FROM lohnverrechnung_dn
+            ORDER BY lv_dn_empl_id, lv_dn_monat
+        ''')
+        columns = [
+            'lv_dn_empl_id', 'lv_dn_monat', 'lv_dn_stundensatz', 'lv_dn_brutto',
+            'lv_dn_mehrstunden0', 'lv_dn_mehrstunden25', 'lv_dn_mehrstunden50',
+            'lv_dn_ueberstunden50', 'lv_dn_ueberstunden100', 'lv_dn_sonderzahlungen', 'lv_dn_sachbezug'
+        ]
+        rows = []
+        key = None
+        for row in cursor.fetchall():
+            record = dict(zip(columns, row))
+            if key != (record['lv_dn_empl_id'], record['lv_dn_monat'][:4]):
+                key = (record['lv_dn_empl_id'], record['lv_dn_monat'][:4])
+                laufend_kum, sonder_kum, monate = 0., 0., 0
+            laufend, sonder = cls._jahressummen_anteil(record)
+            laufend_kum += laufend
+            sonder_kum += sonder
+            monate += 1
+            rows.append((record['lv_dn_empl_id'], record['lv_dn_monat'], laufend_kum, sonder_kum, monate))
+
+        cursor.execute('DELETE FROM lohnverrechnung_jahressummen')
+        cursor.executemany('''
+            INSERT INTO lohnverrechnung_jahressummen (
+                ljs_empl_id, ljs_monat, ljs_laufend_kumuliert, ljs_sonder_kumuliert, ljs_monate
+            ) VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+
+    @staticmethod
+    def _jahressummen_anteil(payroll_record: Dict) -> tuple:
+        """Laufende Bezüge (SV-Bemessungsgrundlage) and Sonderzahlungen a single month contributes to the year"""
+        ergebnis = Abrechnung.calc_brutto2netto_cached(**PayrollManager.build_calc_params(payroll_record, {}))
+        return ergebnis.sv_bmg, float(payroll_record.get('lv_dn_sonderzahlungen', 0) or 0)
+
+    def _get_jahressummen(self, cursor, empl_id: int, monat: str) -> Dict:
+        """Running totals of the year before the given month, read from the row of the previous payroll month"""
+        cursor.execute('''
+            SELECT ljs_laufend_kumuliert, ljs_sonder_kumuliert, ljs_monate
+            FROM lohnverrechnung_jahressummen
+            WHERE ljs_empl_id = ? AND ljs_monat >= ? AND ljs_monat < ?
+            ORDER BY ljs_monat DESC
+            LIMIT 1
+        ''', (empl_id, f"{monat[:4]}-01", monat))
+        result = cursor.fetchone()
+        if result:
+            return {'laufend': result[0], 'sonderzahlungen': result[1], 'monate': result[2]}
+        return {'laufend': 0., 'sonderzahlungen': 0., 'monate': 0}
+
+    def get_jahressummen(self, empl_id: int, monat: str) -> Dict:
+        """Year-to-date laufende Bezüge, Sonderzahlungen and number of paid months before the given month (YYYY-MM)"""
+        conn = dbms.connect(self.db_path)
+        cursor = conn.cursor()
+        summen = self._get_jahressummen(cursor, empl_id, monat)
+        conn.close()
+        return summen
+
+    def _apply_jahressummen(self, cursor, empl_id: int, monat: str, laufend: float, sonder: float, monate: int):
+        """Add the contribution of one month to its own running-totals row and to all later months of the year"""
+        cursor.execute('''
+            UPDATE lohnverrechnung_jahressummen SET
+                ljs_laufend_kumuliert = ljs_laufend_kumuliert + ?,
+                ljs_sonder_kumuliert = ljs_sonder_kumuliert + ?,
+                ljs_monate = ljs_monate + ?
+            WHERE ljs_empl_id = ? AND ljs_monat >= ? AND ljs_monat <= ?
+        ''', (laufend, sonder, monate, empl_id, monat, f"{monat[:4]}-12"))
+
+    @staticmethod
+    def _jahressechstel(summen: Dict, laufend: float) -> float:
+        """Jahressechstel: laufende Bezüge of the year including this month, averaged per month, times two"""
+        return (summen['laufend'] + laufend) / (summen['monate'] + 1) * 2.
+
     def create_payroll_record(self, payroll_data: Dict) -> bool:
-        """Create a new payroll record"""
+        """
+        Create a new payroll record and add it to the running totals of the year.
+        If no Jahressechstel is given it is derived from the running totals.
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = dbms.connect(self.db_path)
             cursor = conn.cursor()
             
             # Check if record already exists for this employee and month
@@ -138,49 +505,131 @@ class PayrollManager:
             if cursor.fetchone()[0] > 0:
                 conn.close()
                 return False  # Record already exists
-            
-            query = '''
-                INSERT INTO lohnverrechnung_dn (
-                    lv_dn_empl_id, lv_dn_monat, lv_dn_stundensatz, lv_dn_wochenstunden, lv_dn_brutto,
-                    lv_dn_mehrstunden0, lv_dn_mehrstunden25, lv_dn_mehrstunden50, 
-                    lv_dn_ueberstunden50, lv_dn_ueberstunden100,
-                    lv_dn_sonderzahlungen, lv_dn_sachbezug, lv_dn_diäten, 
-                    lv_dn_reisekosten, lv_dn_jahressechstel
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-            
-            values = (
-                payroll_data['lv_dn_empl_id'], 
-                payroll_data['lv_dn_monat'], 
-                payroll_data.get('lv_dn_stundensatz', 38.5),
-                payroll_data.get('lv_dn_wochenstunden', 38.5), 
-                payroll_data['lv_dn_brutto'],
-                payroll_data.get('lv_dn_mehrstunden0', 0), 
-                payroll_data.get('lv_dn_mehrstunden25', 0),
-                payroll_data.get('lv_dn_mehrstunden50', 0), 
-                payroll_data.get('lv_dn_ueberstunden50', 0),
-                payroll_data.get('lv_dn_ueberstunden100', 0), 
-                payroll_data.get('lv_dn_sonderzahlungen', 0),
-                payroll_data.get('lv_dn_sachbezug', 0), 
-                payroll_data.get('lv_dn_diäten', 0),
-                payroll_data.get('lv_dn_reisekosten', 0), 
-                payroll_data.get('lv_dn_jahressechstel', 0)
-            )
-            
-            cursor.execute(query, values)
+
+            self._insert_payroll_record(cursor, payroll_data)
             conn.commit()
             conn.close()
             return True
             
         except Exception as e:
             print(f"Error creating payroll record: {e}")
+            if dbms.get_manager(self.db_path).in_unit_of_work:
+                raise
             return False
+
+    def create_payroll_records(self, records: List[Dict], sv_bmg: Optional[List[float]] = None) -> int:
+        """
+        Create many payroll records in a single transaction (month-end run).
+        Records for an employee and month that already exist are skipped; returns the number inserted.
+        The new lv_dn_id is written back into each inserted record.
+        sv_bmg holds the already calculated SV-Bemessungsgrundlage per record, so the running totals
+        do not need another engine run.
+        """
+        conn = dbms.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            inserted = 0
+            for i, payroll_data in enumerate(records):
+                cursor.execute('''
+                    SELECT COUNT(*) FROM lohnverrechnung_dn
+                    WHERE lv_dn_empl_id = ? AND lv_dn_monat = ?
+                ''', (payroll_data['lv_dn_empl_id'], payroll_data['lv_dn_monat']))
+                if cursor.fetchone()[0] > 0:
+                    continue
+                laufend = sv_bmg[i] if sv_bmg is not None else None
+                payroll_data['lv_dn_id'] = self._insert_payroll_record(cursor, payroll_data, laufend)
+                inserted += 1
+            conn.commit()
+            return inserted
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _insert_payroll_record(self, cursor, payroll_data: Dict, laufend: Optional[float] = None) -> int:
+        """
+        Insert one lohnverrechnung_dn row and its running-totals row without committing, returns the new lv_dn_id.
+        laufend is the SV-Bemessungsgrundlage of the month if it is already known, otherwise the engine calculates it.
+        """
+        empl_id = payroll_data['lv_dn_empl_id']
+        monat = payroll_data['lv_dn_monat']
+        if laufend is None:
+            laufend, sonder = self._jahressummen_anteil(payroll_data)
+        else:
+            sonder = float(payroll_data.get('lv_dn_sonderzahlungen', 0) or 0)
+        summen = self._get_jahressummen(cursor, empl_id, monat)
+        jahressechstel = payroll_data.get('lv_dn_jahressechstel', 0) or self._jahressechstel(summen, laufend)
+
+        query = '''
+            INSERT INTO lohnverrechnung_dn (
+                lv_dn_empl_id, lv_dn_monat, lv_dn_stundensatz, lv_dn_wochenstunden, lv_dn_brutto,
+                lv_dn_mehrstunden0, lv_dn_mehrstunden25, lv_dn_mehrstunden50, 
+                lv_dn_ueberstunden50, lv_dn_ueberstunden100,
+                lv_dn_sonderzahlungen, lv_dn_sachbezug, lv_dn_diäten, 
+                lv_dn_reisekosten, lv_dn_jahressechstel
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        
+        values = (
+            payroll_data['lv_dn_empl_id'], 
+            payroll_data['lv_dn_monat'], 
+            payroll_data.get('lv_dn_stundensatz', 38.5),
+            payroll_data.get('lv_dn_wochenstunden', 38.5), 
+            payroll_data['lv_dn_brutto'],
+            payroll_data.get('lv_dn_mehrstunden0', 0), 
+            payroll_data.get('lv_dn_mehrstunden25', 0),
+            payroll_data.get('lv_dn_mehrstunden50', 0), 
+            payroll_data.get('lv_dn_ueberstunden50', 0),
+            payroll_data.get('lv_dn_ueberstunden100', 0), 
+            payroll_data.get('lv_dn_sonderzahlungen', 0),
+            payroll_data.get('lv_dn_sachbezug', 0), 
+            payroll_data.get('lv_dn_diäten', 0),
+            payroll_data.get('lv_dn_reisekosten', 0), 
+            jahressechstel
+        )
+        
+        cursor.execute(query, values)
+        lv_dn_id = cursor.lastrowid
+
+        # Running totals: own row starts from the previous month, later months of the year shift by this month
+        cursor.execute('''
+            INSERT INTO lohnverrechnung_jahressummen (
+                ljs_empl_id, ljs_monat, ljs_laufend_kumuliert, ljs_sonder_kumuliert, ljs_monate
+            ) VALUES (?, ?, ?, ?, ?)
+        ''', (empl_id, monat, summen['laufend'], summen['sonderzahlungen'], summen['monate']))
+        self._apply_jahressummen(cursor, empl_id, monat, laufend, sonder, 1)
+        return lv_dn_id
     
     def update_payroll_record(self, lv_dn_id: int, payroll_data: Dict) -> bool:
-        """Update an existing payroll record"""
+        """Update an existing payroll record and shift the running totals of the year by the difference"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = dbms.connect(self.db_path)
             cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT lv_dn_empl_id, lv_dn_monat, lv_dn_stundensatz, lv_dn_brutto,
+                       lv_dn_mehrstunden0, lv_dn_mehrstunden25, lv_dn_mehrstunden50,
+                       lv_dn_ueberstunden50, lv_dn_ueberstunden100, lv_dn_sonderzahlungen, lv_dn_sachbezug
+                FROM lohnverrechnung_dn WHERE lv_dn_id = ?
+            ''', (lv_dn_id,))
+            old = cursor.fetchone()
+            if old is None:
+                conn.close()
+                return False
+            old_record = dict(zip([
+                'lv_dn_empl_id', 'lv_dn_monat', 'lv_dn_stundensatz', 'lv_dn_brutto',
+                'lv_dn_mehrstunden0', 'lv_dn_mehrstunden25', 'lv_dn_mehrstunden50',
+                'lv_dn_ueberstunden50', 'lv_dn_ueberstunden100', 'lv_dn_sonderzahlungen', 'lv_dn_sachbezug'
+            ], old))
+            empl_id = old_record['lv_dn_empl_id']
+            monat = old_record['lv_dn_monat']
+            new_record = {'lv_dn_stundensatz': 38.5, **payroll_data, 'lv_dn_empl_id': empl_id, 'lv_dn_monat': monat}
+
+            old_laufend, old_sonder = self._jahressummen_anteil(old_record)
+            laufend, sonder = self._jahressummen_anteil(new_record)
+            summen = self._get_jahressummen(cursor, empl_id, monat)
+            jahressechstel = payroll_data.get('lv_dn_jahressechstel', 0) or self._jahressechstel(summen, laufend)
             
             query = '''
                 UPDATE lohnverrechnung_dn SET
@@ -205,22 +654,25 @@ class PayrollManager:
                 payroll_data.get('lv_dn_sachbezug', 0),
                 payroll_data.get('lv_dn_diäten', 0), 
                 payroll_data.get('lv_dn_reisekosten', 0),
-                payroll_data.get('lv_dn_jahressechstel', 0), 
+                jahressechstel, 
                 lv_dn_id
             )
             
             cursor.execute(query, values)
+            self._apply_jahressummen(cursor, empl_id, monat, laufend - old_laufend, sonder - old_sonder, 0)
             conn.commit()
             conn.close()
             return True
             
         except Exception as e:
             print(f"Error updating payroll record: {e}")
+            if dbms.get_manager(self.db_path).in_unit_of_work:
+                raise
             return False
     
     def get_all_employees_for_payroll(self) -> List[Dict]:
         """Get all employees with their current salary information"""
-        conn = sqlite3.connect(self.db_path)
+        conn = dbms.connect(self.db_path)
         cursor = conn.cursor()
         
         query = '''
@@ -262,7 +714,7 @@ class PayrollManager:
     
     def get_monthly_payroll_summary(self, month: str) -> List[Dict]:
         """Get payroll summary for a specific month"""
-        conn = sqlite3.connect(self.db_path)
+        conn = dbms.connect(self.db_path)
         cursor = conn.cursor()
         
         query = '''
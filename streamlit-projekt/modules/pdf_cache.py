@@ -0,0 +1,134 @@
+"""
+Festplatten-Cache für erzeugte PDFs (Stammdatenblatt, Lohnzettel)
+Der Schlüssel ist ein SHA-256 über Dokumentart, Vorlagenversion und alle Eingaben des Dokuments
+(Personen-/Mitarbeiterzeile, Abrechnung, steuerliche Vorteile, Ergebnis). Ändert sich eine dieser Zeilen,
+ändert sich der Schlüssel: der alte Eintrag wird nicht mehr gefunden und später verdrängt.
+Die Größe ist durch MAX_BYTES begrenzt, verdrängt wird nach letztem Zugriff (mtime, LRU).
+Mehrere Prozesse dürfen gleichzeitig lesen und schreiben (Einträge werden atomar ersetzt).
+"""
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+CACHE_DIR = Path(tempfile.gettempdir()) / "pdf_cache"
+MAX_BYTES = 256 * 1024 * 1024
+# Nach dem Überschreiten von MAX_BYTES wird bis auf diesen Anteil verdrängt
+ZIEL_ANTEIL = 0.9
+
+# Geschätzte Cache-Größe dieses Prozesses (None = noch nicht ermittelt)
+_groesse: Optional[int] = None
+
+
+def _json_wert(wert: Any):
+    if isinstance(wert, (datetime.date, datetime.datetime)):
+        return wert.isoformat()
+    if hasattr(wert, 'item'):  # numpy-Skalare
+        return wert.item()
+    return str(wert)
+
+
+def schluessel(art: str, version: int, eingaben: Dict) -> str:
+    """Cache-Schlüssel für ein Dokument der Art art in der Vorlagenversion version"""
+    inhalt = json.dumps({'art': art, 'version': version, 'eingaben': eingaben},
+                        sort_keys=True, ensure_ascii=False, default=_json_wert)
+    return hashlib.sha256(inhalt.encode('utf-8')).hexdigest()
+
+
+def _pfad(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.pdf"
+
+
+def _eintraege():
+    if not CACHE_DIR.exists():
+        return
+    for unterordner in os.scandir(CACHE_DIR):
+        if unterordner.is_dir():
+            for eintrag in os.scandir(unterordner.path):
+                if eintrag.name.endswith('.pdf'):
+                    yield eintrag
+
+
+def hole(art: str, version: int, eingaben: Dict, erzeuge: Callable[[], bytes]) -> bytes:
+    """
+    PDF aus dem Cache lesen oder mit erzeuge() erstellen und ablegen.
+    Ein Treffer setzt die Zugriffszeit des Eintrags (LRU).
+    """
+    pfad = _pfad(schluessel(art, version, eingaben))
+    try:
+        daten = pfad.read_bytes()
+        os.utime(pfad)
+        return daten
+    except FileNotFoundError:
+        pass
+
+    daten = erzeuge()
+    _schreibe(pfad, daten)
+    return daten
+
+
+def _schreibe(pfad: Path, daten: bytes):
+    global _groesse
+    pfad.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(suffix='.tmp', dir=pfad.parent)
+    try:
+        with os.fdopen(fd, 'wb') as datei:
+            datei.write(daten)
+        os.replace(temp, pfad)
+    except BaseException:
+        Path(temp).unlink(missing_ok=True)
+        raise
+
+    if _groesse is None:
+        _groesse = statistik()['bytes']
+    else:
+        _groesse += len(daten)
+    if _groesse > MAX_BYTES:
+        verdraengen()
+
+
+def verdraengen(max_bytes: Optional[int] = None) -> int:
+    """
+    Am längsten nicht benutzte Einträge löschen, bis der Cache unter ZIEL_ANTEIL * max_bytes liegt
+    (Standard MAX_BYTES). Returns: Anzahl gelöschter Einträge
+    """
+    global _groesse
+    grenze = (MAX_BYTES if max_bytes is None else max_bytes) * ZIEL_ANTEIL
+    eintraege = []
+    for eintrag in _eintraege():
+        try:
+            stat = eintrag.stat()
+        except FileNotFoundError:
+            continue
+        eintraege.append((stat.st_mtime, stat.st_size, eintrag.path))
+    groesse = sum(e[1] for e in eintraege)
+
+    geloescht = 0
+    for _, size, pfad in sorted(eintraege):
+        if groesse <= grenze:
+            break
+        Path(pfad).unlink(missing_ok=True)
+        groesse -= size
+        geloescht += 1
+    _groesse = groesse
+    return geloescht
+
+
+def leeren() -> int:
+    """Alle Einträge löschen. Returns: Anzahl gelöschter Einträge"""
+    return verdraengen(0)
+
+
+def statistik() -> Dict:
+    """Anzahl Einträge und Größe des Caches in Bytes"""
+    anzahl, groesse = 0, 0
+    for eintrag in _eintraege():
+        try:
+            groesse += eintrag.stat().st_size
+            anzahl += 1
+        except FileNotFoundError:
+            continue
+    return {'eintraege': anzahl, 'bytes': groesse}
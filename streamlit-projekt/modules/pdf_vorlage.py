@@ -0,0 +1,224 @@
+"""
+Vorlagen für PDF-Seiten mit wiederverwendbarer statischer Ebene
+Eine Vorlage zeichnet die festen Teile eines Layouts (Kopfband, Firmenblock, Beschriftungen, Rahmen) einmal je
+Prozess mit fpdf und merkt sich den fertigen Content-Stream, die benutzten Schriften und den Zeichenzustand
+danach. Jedes Dokument beginnt mit einer Seite, auf die dieser Stream nur noch kopiert wird; gezeichnet werden
+danach nur die variablen Werte.
+In einem Sammeldokument (SammelPDF) wird die statische Ebene jeder Vorlage nur einmal als Form-XObject
+eingebettet und auf jeder Seite referenziert; SammelPDF kann außerdem Lesezeichen (PDF-Outlines) setzen.
+"""
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from fpdf import FPDF
+
+# Zeichenzustand von FPDF, der nach der statischen Ebene übernommen wird (muss zum Content-Stream passen)
+_ZUSTAND = (
+    'font_family', 'font_style', 'font_size_pt', 'font_size', 'underline', 'unifontsubset',
+    'draw_color', 'fill_color', 'text_color', 'color_flag', 'line_width', 'x', 'y', 'lasth',
+)
+_SCHRIFTWAHL = re.compile(r"BT /F(\d+) ([\d.]+) Tf ET")
+
+
+@lru_cache(maxsize=1)
+def _startzustand() -> Dict:
+    """Zeichenzustand eines neuen FPDF-Dokuments"""
+    pdf = FPDF()
+    return {name: getattr(pdf, name, None) for name in _ZUSTAND}
+
+
+class Vorlage:
+    """
+    Statische Ebene einer Seite
+    zeichne(pdf) bekommt ein FPDF mit einer leeren Seite (ohne automatischen Seitenumbruch) und darf nur
+    Inhalte zeichnen, die für jedes Dokument gleich sind. Variable Werte zeichnet der Aufrufer auf der Seite,
+    die seite() bzw. neue_seite() liefert; Schrift und Farben setzt er dabei wie gewohnt selbst.
+    """
+
+    def __init__(self, zeichne: Callable[[FPDF], None]):
+        self._zeichne = zeichne
+        self._ebene: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def _statische_ebene(self) -> Dict:
+        with self._lock:
+            if self._ebene is None:
+                pdf = FPDF()
+                pdf.set_auto_page_break(auto=False, margin=0)
+                pdf.add_page()
+                anfang = len(pdf.pages[pdf.page])
+                self._zeichne(pdf)
+                self._ebene = {
+                    'inhalt': pdf.pages[pdf.page][anfang:],
+                    'schriften': sorted(pdf.fonts.items(), key=lambda eintrag: eintrag[1]['i']),
+                    'schrift': pdf.font_family + pdf.font_style if pdf.font_family else None,
+                    'zustand': {name: getattr(pdf, name) for name in _ZUSTAND},
+                }
+            return self._ebene
+
+    def neue_seite(self, pdf: FPDF):
+        """Neue Seite in pdf mit der statischen Ebene (auch als weitere Seite eines größeren Dokuments)"""
+        ebene = self._statische_ebene()
+        # Schriften der Vorlage im Dokument anmelden, die Nummern (/F1, /F2, ...) können abweichen
+        nummern = {}
+        for schluessel, schrift in ebene['schriften']:
+            if schluessel not in pdf.fonts:
+                pdf.fonts[schluessel] = dict(schrift, i=len(pdf.fonts) + 1)
+            nummern[schrift['i']] = pdf.fonts[schluessel]['i']
+        inhalt = ebene['inhalt']
+        if any(alt != neu for alt, neu in nummern.items()):
+            inhalt = _SCHRIFTWAHL.sub(lambda m: f"BT /F{nummern[int(m.group(1))]} {m.group(2)} Tf ET", inhalt)
+
+        # Die Seite muss im selben Zustand beginnen wie die Seite, auf der die Ebene gezeichnet wurde
+        for name, wert in _startzustand().items():
+            setattr(pdf, name, wert)
+        pdf.add_page()
+        zustand = ebene['zustand']
+        if isinstance(pdf, SammelPDF):
+            # Ebene nur referenzieren; Do stellt den Grafikzustand danach wieder her, also den Zustand
+            # am Ende der Ebene (Linienbreite, Farben, Schrift) wie im Content-Stream nachziehen
+            pdf.pages[pdf.page] += f"/TPL{pdf.form(self, inhalt)} Do\n"
+            pdf.pages[pdf.page] += '%.2f w\n%s\n%s\n' % (zustand['line_width'] * pdf.k, zustand['draw_color'], zustand['fill_color'])
+            if ebene['schrift']:
+                pdf.pages[pdf.page] += 'BT /F%d %.2f Tf ET\n' % (pdf.fonts[ebene['schrift']]['i'], zustand['font_size_pt'])
+        else:
+            pdf.pages[pdf.page] += inhalt
+        for name, wert in zustand.items():
+            setattr(pdf, name, wert)
+        pdf.current_font = pdf.fonts[ebene['schrift']] if ebene['schrift'] else {}
+
+    def seite(self) -> FPDF:
+        """Neues Dokument (ohne automatischen Seitenumbruch) mit einer Seite, auf der die statische Ebene steht"""
+        pdf = FPDF()
+        pdf.set_auto_page_break(auto=False, margin=0)
+        self.neue_seite(pdf)
+        return pdf
+
+
+class _Puffer:
+    """
+    Ausgabepuffer für SammelPDF: fpdf hängt jede Zeile mit buffer += ... an einen str an, was bei Dokumenten
+    mit tausenden Objekten quadratisch wächst. Die Teile werden gesammelt und erst beim Ausgeben verbunden.
+    """
+
+    def __init__(self):
+        self._teile: List[str] = []
+        self._laenge = 0
+
+    def __iadd__(self, text: str):
+        self._teile.append(text)
+        self._laenge += len(text)
+        return self
+
+    def __len__(self) -> int:
+        return self._laenge
+
+    def __str__(self) -> str:
+        if len(self._teile) > 1:
+            self._teile = [''.join(self._teile)]
+        return self._teile[0] if self._teile else ''
+
+    def encode(self, *args, **kwargs) -> bytes:
+        return str(self).encode(*args, **kwargs)
+
+
+class SammelPDF(FPDF):
+    """
+    FPDF für Sammeldokumente mit vielen gleichartigen Seiten: die statischen Ebenen der Vorlagen liegen je einmal
+    als Form-XObject im Dokument (siehe Vorlage.neue_seite), dazu Lesezeichen (Outlines), die der PDF-Betrachter
+    als Navigationsleiste anzeigt
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffer = _Puffer()
+        self.lesezeichen_liste: List[Dict] = []
+        self._outlines_objekt = None
+        self._formen: Dict[int, Dict] = {}
+
+    def form(self, vorlage: Vorlage, inhalt: str) -> int:
+        """Nummer des Form-XObjects für die statische Ebene der Vorlage (beim ersten Aufruf angelegt)"""
+        if id(vorlage) not in self._formen:
+            self._formen[id(vorlage)] = {'i': len(self._formen) + 1, 'inhalt': inhalt}
+        return self._formen[id(vorlage)]['i']
+
+    def _putimages(self):
+        super()._putimages()
+        for form in self._formen.values():
+            daten = form['inhalt'].encode('latin1')
+            filter = ''
+            if self.compress:
+                daten = zlib.compress(daten)
+                filter = '/Filter /FlateDecode '
+            self._newobj()
+            form['n'] = self.n
+            self._out('<</Type /XObject /Subtype /Form /BBox [0 0 %.2f %.2f] /Resources 2 0 R %s/Length %d>>'
+                      % (self.w_pt, self.h_pt, filter, len(daten)))
+            self._putstream(daten)
+            self._out('endobj')
+
+    def _putxobjectdict(self):
+        super()._putxobjectdict()
+        for form in self._formen.values():
+            self._out('/TPL%d %d 0 R' % (form['i'], form['n']))
+
+    def lesezeichen(self, titel: str, ebene: int = 0, y: Optional[float] = None):
+        """Lesezeichen auf die aktuelle Seite (Position y, Standard: aktuelle Position), ebene 0 = oberste Ebene"""
+        if y is None:
+            y = self.get_y()
+        self.lesezeichen_liste.append({'titel': titel, 'ebene': ebene, 'y': (self.h - y) * self.k, 'seite': self.page})
+
+    def _putlesezeichen(self):
+        eintraege = self.lesezeichen_liste
+        anzahl = len(eintraege)
+        # Baum aufbauen: Eltern, Geschwister (prev/next) und erstes/letztes Kind je Eintrag
+        letzter = {}
+        ebene = 0
+        for i, eintrag in enumerate(eintraege):
+            if eintrag['ebene'] > 0:
+                eltern = letzter[eintrag['ebene'] - 1]
+                eintrag['parent'] = eltern
+                eintraege[eltern]['last'] = i
+                if eintrag['ebene'] > ebene:
+                    eintraege[eltern]['first'] = i
+            else:
+                eintrag['parent'] = anzahl
+            if eintrag['ebene'] <= ebene and i > 0:
+                vorher = letzter[eintrag['ebene']]
+                eintraege[vorher]['next'] = i
+                eintrag['prev'] = vorher
+            letzter[eintrag['ebene']] = i
+            ebene = eintrag['ebene']
+
+        # Objektnummer des ersten Eintrags, die Wurzel folgt auf den letzten
+        erstes = self.n + 1
+        for eintrag in eintraege:
+            self._newobj()
+            self._out('<</Title ' + self._textstring(eintrag['titel']))
+            self._out('/Parent %d 0 R' % (erstes + eintrag['parent']))
+            for verweis in ('prev', 'next', 'first', 'last'):
+                if verweis in eintrag:
+                    self._out('/%s %d 0 R' % (verweis.capitalize(), erstes + eintrag[verweis]))
+            # Seitenobjekte liegen bei fpdf auf 3, 5, 7, ...
+            self._out('/Dest [%d 0 R /XYZ 0 %.2f null]' % (1 + 2 * eintrag['seite'], eintrag['y']))
+            self._out('/Count 0>>')
+            self._out('endobj')
+        self._newobj()
+        self._outlines_objekt = self.n
+        self._out('<</Type /Outlines /First %d 0 R' % erstes)
+        self._out('/Last %d 0 R>>' % (erstes + letzter[0]))
+        self._out('endobj')
+
+    def _putresources(self):
+        super()._putresources()
+        if self.lesezeichen_liste:
+            self._putlesezeichen()
+
+    def _putcatalog(self):
+        super()._putcatalog()
+        if self._outlines_objekt:
+            self._out('/Outlines %d 0 R' % self._outlines_objekt)
+            self._out('/PageMode /UseOutlines')
@@ -88,7 +88,7 @@ class person:
             List["person"]: Gibt eine Liste aller Personen zurück
         """
         obj_list = []
-        list_from_db, description = db_ms.select_specific(table_name=cls.table_name, limitations=f"{cls.table_row_names[0][0]} = {id}")
+        list_from_db, description = db_ms.select_specific(table_name=cls.table_name, limitations={cls.table_row_names[0][0]: id})
 
         if list_from_db is None:
             return obj_list
@@ -206,6 +206,20 @@ class person:
         """
         db_ms.insert(table_name=self.table_name, table_row_name=self.table_row_names, values=(self.obj_id, self.surname, self.name, self.birthdate, self.street, self.housenr, self.floor, self.zip, self.place, self.rec_id, self.sex, self.children))
 
+    @classmethod
+    def insert_many(cls, db_ms: dbms.dbms, personen: List["person"], batch_size: int = 500) -> dict:
+        """
+        Fügt viele Personen in einer Transaktion ein (z.B. Import aus CSV/XLSX)
+        Args:
+            db_ms (dbms.dbms): Aktives DBMS
+            personen (List[person]): Die einzufügenden Personen
+            batch_size (int, optional): Zeilen je executemany-Aufruf. Defaults to 500.
+
+        Returns:
+            dict: Anzahl eingefügter Zeilen und Dauer, siehe dbms.insert_many
+        """
+        return db_ms.insert_many(table_name=cls.table_name, table_row_name=cls.table_row_names, rows=(p.value() for p in personen), batch_size=batch_size)
+
     def update(self, db_ms: dbms.dbms, values: tuple):
         """
         Aktualisiert ein Objekt in der Datenbank
@@ -0,0 +1,256 @@
+"""
+Was-wäre-wenn-Simulation für die ganze Belegschaft (Gehaltsrunden, KV-Erhöhungen, Stundenumstellungen)
+Alle Szenarien × alle aktiven Mitarbeiter × 12 Monate werden als eine Tabelle aufgebaut und in einem
+einzigen Durchlauf von abrechnung_batch.calc_brutto2netto_batch gerechnet, die Summen je Szenario
+entstehen in ganzen Cent (int64, np.add.at) und sind damit exakt und von der Reihenfolge unabhängig.
+
+Aufruf aus dem Verzeichnis streamlit-projekt:
+    python -m modules.simulation 2025 --erhoehung 0.032 --ab-monat 4
+"""
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from modules import abrechnung_batch, dbms, monatslauf, payroll
+
+DB_PATH = Path(__file__).parent.parent / "stammdatenverwaltung.db"
+
+# Sonderzahlungen (Urlaubsbeihilfe, Weihnachtsremuneration) je ein Monatsbezug in diesen Monaten
+SONDERZAHLUNG_MONATE = (6, 11)
+
+# Dienstgeberkosten im Ergebnis: Spalte von calc_brutto2netto_batch → Bezeichnung
+DG_KOSTEN = {
+    'sv_dg': 'SV-DG',
+    'kommst': 'Kommunalsteuer',
+    'db': 'DB',
+    'dz': 'DZ',
+    'BV': 'BV',
+    'dga': 'U-Bahn-Steuer',
+}
+
+
+class Szenario(NamedTuple):
+    """
+    Eine Annahme für das Simulationsjahr, alle Änderungen gelten ab ab_monat.
+    erhoehung hebt die Ist-Gehälter an, kv_erhoehung die KV-Mindestgehälter (kollektivvertragsdaten),
+    jedes Gehalt wird mindestens auf das erhöhte Mindestgehalt seiner Stufe angehoben. Mit wochenstunden
+    werden die Mitarbeiter aus empl_ids bzw. die ersten anzahl Mitarbeiter mit mehr Stunden auf diese
+    Wochenstunden umgestellt, das Gehalt wird anteilig angepasst.
+    """
+    name: str
+    erhoehung: float = 0.
+    kv_erhoehung: float = 0.
+    ab_monat: int = 1
+    wochenstunden: Optional[float] = None
+    anzahl: int = 0
+    empl_ids: tuple = ()
+
+
+def lade_belegschaft(db_path: str, jahr: int) -> Dict[str, np.ndarray]:
+    """
+    Alle aktiven Mitarbeiter mit Gehalt, Wochenstunden, KV-Mindestgehalt und steuerlichen Vorteilen
+    als Spalten (je ein Eintrag pro Mitarbeiter); 'beschaeftigt' und die Kinder für den Familienbonus
+    ('fabo_u18g', ...) liegen als Mitarbeiter × 12 Monate vor.
+    """
+    conn = dbms.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT m.EMPL_ID, m.EMPL_BRUTTOGEHALT, m.EMPL_ENTRYDATE, m.EMPL_EXITDATE,
+               dv.dv_wochenarbeitszeit,
+               (SELECT kv.kv_mindestgehalt FROM kollektivvertragsdaten kv
+                WHERE kv.kv_stufe = dv.dv_kollektivvertrag_stufe AND kv.kv_jahr <= ?
+                ORDER BY kv.kv_jahr DESC LIMIT 1),
+               {", ".join("s." + spalte for spalte in monatslauf.STV_SPALTEN)}
+        FROM MITARBEITER m
+        LEFT JOIN dienstvertragsdaten dv ON dv.dv_id = (
+            SELECT MAX(dv_id) FROM dienstvertragsdaten WHERE dv_empl_id = m.EMPL_ID
+        )
+        LEFT JOIN steuerliche_vorteile s ON s.stv_empl_id = m.EMPL_ID
+        WHERE m.EMPL_VALID_TO > datetime('now')
+        ORDER BY m.EMPL_ID
+    ''', (jahr,))
+    rows = cursor.fetchall()
+    conn.close()
+
+    manager = payroll.PayrollManager(db_path)
+    n = len(rows)
+    spalten = {
+        'empl_id': np.array([row[0] for row in rows], dtype=np.int64),
+        'gehalt': np.array([manager._convert_salary(row[1]) for row in rows], dtype=np.float64),
+        'wochenstunden': np.array([float(row[4] or 38.5) for row in rows], dtype=np.float64),
+        'kv_mindestgehalt': np.array([np.nan if row[5] is None else float(row[5]) for row in rows], dtype=np.float64),
+    }
+    for i, name in enumerate(monatslauf.STV_SPALTEN):
+        spalten[name] = np.array([float(row[6 + i] or 0) for row in rows], dtype=np.float64)
+
+    # Beschäftigt je Monat (Eintritt/Austritt innerhalb des Jahres)
+    beschaeftigt = np.ones((n, 12), dtype=bool)
+    for i, row in enumerate(rows):
+        eintritt, austritt = manager._parse_date(row[2]), manager._parse_date(row[3])
+        for m in range(12):
+            beginn = datetime(jahr, m + 1, 1)
+            ende = datetime(jahr + (m == 11), (m + 1) % 12 + 1, 1)
+            if (eintritt is not None and eintritt >= ende) or (austritt is not None and austritt < beginn):
+                beschaeftigt[i, m] = False
+    spalten['beschaeftigt'] = beschaeftigt
+
+    # Kinder für den Familienbonus je Monat, nur für Mitarbeiter mit Anspruch
+    kinder = monatslauf.lade_kinder(db_path)
+    fabo = {name: np.zeros((n, 12)) for name in ('fabo_u18g', 'fabo_u18h', 'fabo_ue18g', 'fabo_ue18h')}
+    for i in np.flatnonzero(spalten['stv_anspruch_fabo'] != 0):
+        zeilen = kinder.get(int(spalten['empl_id'][i]), [])
+        if not zeilen:
+            continue
+        for m in range(12):
+            for name, anzahl in manager.zaehle_fabo_kinder(zeilen, f"{jahr}-{m + 1:02d}").items():
+                fabo[name][i, m] = anzahl
+    spalten.update(fabo)
+    return spalten
+
+
+def _szenario_tabelle(belegschaft: Dict[str, np.ndarray], szenario: Szenario, jahr: int,
+                      sonderzahlungen: bool) -> Dict[str, np.ndarray]:
+    """Eingabetabelle (Mitarbeiter × Monate, nur beschäftigte Monate) für calc_brutto2netto_batch"""
+    n = len(belegschaft['empl_id'])
+    monate = np.arange(1, 13)
+    ab = monate >= szenario.ab_monat
+
+    gehalt = np.repeat(belegschaft['gehalt'][:, None], 12, axis=1)
+    stunden = np.repeat(belegschaft['wochenstunden'][:, None], 12, axis=1)
+
+    if szenario.erhoehung or szenario.kv_erhoehung:
+        erhoeht = belegschaft['gehalt'] * (1. + szenario.erhoehung)
+        minimum = belegschaft['kv_mindestgehalt'] * (1. + szenario.kv_erhoehung)
+        erhoeht = np.where(np.isnan(minimum), erhoeht, np.maximum(erhoeht, minimum))
+        gehalt[:, ab] = erhoeht[:, None]
+
+    if szenario.wochenstunden is not None:
+        if szenario.empl_ids:
+            auswahl = np.isin(belegschaft['empl_id'], szenario.empl_ids)
+        else:
+            kandidaten = np.flatnonzero(belegschaft['wochenstunden'] > szenario.wochenstunden)[:szenario.anzahl]
+            auswahl = np.zeros(n, dtype=bool)
+            auswahl[kandidaten] = True
+        faktor = np.where(auswahl, szenario.wochenstunden / belegschaft['wochenstunden'], 1.)
+        gehalt[:, ab] *= faktor[:, None]
+        stunden[:, ab] = np.where(auswahl, szenario.wochenstunden, belegschaft['wochenstunden'])[:, None]
+
+    beschaeftigt = belegschaft['beschaeftigt']
+    gehalt = np.where(beschaeftigt, gehalt, 0.)
+
+    # Sonderzahlungen mit Jahressechstel und bisherigen Sonderzahlungen wie in der Monatsabrechnung
+    sonder = np.zeros((n, 12))
+    if sonderzahlungen:
+        for monat in SONDERZAHLUNG_MONATE:
+            sonder[:, monat - 1] = gehalt[:, monat - 1]
+    altesonder = np.cumsum(sonder, axis=1) - sonder
+    bezahlte_monate = np.maximum(np.cumsum(beschaeftigt, axis=1), 1)
+    jahressechstel = np.cumsum(gehalt, axis=1) / bezahlte_monate * 2.
+
+    tabelle = {
+        'monat': np.broadcast_to(monate, (n, 12)),
+        'jahr': np.full((n, 12), jahr),
+        'lv_dn_stundensatz': stunden,
+        'lv_dn_brutto': gehalt,
+        'lv_dn_sonderzahlungen': sonder,
+        'lv_dn_jahressechstel': jahressechstel,
+        'altesonder': altesonder,
+    }
+    for name in monatslauf.STV_SPALTEN:
+        tabelle[name] = np.repeat(belegschaft[name][:, None], 12, axis=1)
+    for name in ('fabo_u18g', 'fabo_u18h', 'fabo_ue18g', 'fabo_ue18h'):
+        tabelle[name] = belegschaft[name]
+    return {name: np.asarray(werte)[beschaeftigt] for name, werte in tabelle.items()}
+
+
+def simuliere(db_path: str, szenarien: Sequence[Szenario], jahr: int, sonderzahlungen: bool = True,
+              belegschaft: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+    """
+    Rechnet alle Szenarien für das Jahr in einem vektorisierten Durchlauf.
+    Returns:
+        Dict: 'szenarien' (je Szenario Jahressummen von Brutto, Netto und Dienstgeberkosten sowie
+        'monatlich' mit den Dienstgeberkosten je Monat), 'mitarbeiter', 'zeilen' und 'dauer'
+    """
+    start = time.perf_counter()
+    if belegschaft is None:
+        belegschaft = lade_belegschaft(db_path, jahr)
+
+    tabellen = [_szenario_tabelle(belegschaft, szenario, jahr, sonderzahlungen) for szenario in szenarien]
+    zeilen = [len(tabelle['monat']) for tabelle in tabellen]
+    gesamt = {name: np.concatenate([tabelle[name] for tabelle in tabellen]) for name in tabellen[0]} if tabellen else {}
+    index = np.repeat(np.arange(len(szenarien)), zeilen)
+
+    s = len(szenarien)
+    ergebnis = abrechnung_batch.calc_brutto2netto_batch(gesamt, cent=True) if len(index) else None
+
+    def summe(werte: np.ndarray, gruppen: np.ndarray = index, anzahl: int = s) -> np.ndarray:
+        cent = np.zeros(anzahl, dtype=np.int64)
+        np.add.at(cent, gruppen, werte)
+        return cent
+
+    if ergebnis is not None:
+        ergebnis['sv_dg'] = ergebnis['dienstg_sv'] + ergebnis['dienstg_svsonder']
+        monats_index = index * 12 + (gesamt['monat'] - 1)
+        summen = {
+            'brutto': summe(ergebnis['brlohn'] + abrechnung_batch.in_cent(gesamt['lv_dn_sonderzahlungen'])),
+            'netto': summe(ergebnis['netto'] + ergebnis['sobz']),
+            **{name: summe(ergebnis[name]) for name in DG_KOSTEN},
+        }
+        monatlich = sum(summe(ergebnis[name], monats_index, s * 12) for name in DG_KOSTEN)
+    else:
+        summen = {name: np.zeros(s, dtype=np.int64) for name in ('brutto', 'netto', *DG_KOSTEN)}
+        monatlich = np.zeros(s * 12, dtype=np.int64)
+
+    ergebnisse = []
+    for i, szenario in enumerate(szenarien):
+        dienstgeber = sum(int(summen[name][i]) for name in DG_KOSTEN)
+        ergebnisse.append({
+            'szenario': szenario.name,
+            'brutto': int(summen['brutto'][i]) / 100,
+            'netto': int(summen['netto'][i]) / 100,
+            **{name: int(summen[name][i]) / 100 for name in DG_KOSTEN},
+            'dienstgeberkosten': dienstgeber / 100,
+            'gesamtkosten': (int(summen['brutto'][i]) + dienstgeber) / 100,
+            'monatlich': monatlich[i * 12:(i + 1) * 12] / 100,
+        })
+
+    return {
+        'szenarien': ergebnisse,
+        'mitarbeiter': len(belegschaft['empl_id']),
+        'zeilen': int(len(index)),
+        'dauer': time.perf_counter() - start,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Was-wäre-wenn-Simulation der Personalkosten eines Jahres")
+    parser.add_argument("jahr", type=int, help="Simulationsjahr")
+    parser.add_argument("--db", default=str(DB_PATH), help="Pfad zur SQLite-Datenbank")
+    parser.add_argument("--erhoehung", type=float, default=0., help="Ist-Erhöhung als Anteil, z.B. 0.032")
+    parser.add_argument("--kv-erhoehung", type=float, default=None, help="Erhöhung der KV-Mindestgehälter (Standard: wie --erhoehung)")
+    parser.add_argument("--ab-monat", type=int, default=1, help="Erster Monat mit der Änderung")
+    parser.add_argument("--wochenstunden", type=float, default=None, help="Neue Wochenstunden für --anzahl Mitarbeiter")
+    parser.add_argument("--anzahl", type=int, default=0, help="Anzahl umzustellender Mitarbeiter")
+    args = parser.parse_args(argv)
+
+    kv_erhoehung = args.erhoehung if args.kv_erhoehung is None else args.kv_erhoehung
+    szenarien = [
+        Szenario("Basis"),
+        Szenario("Szenario", erhoehung=args.erhoehung, kv_erhoehung=kv_erhoehung, ab_monat=args.ab_monat,
+                 wochenstunden=args.wochenstunden, anzahl=args.anzahl),
+    ]
+    lauf = simuliere(args.db, szenarien, args.jahr)
+    basis = lauf['szenarien'][0]
+    for zeile in lauf['szenarien']:
+        print(f"{zeile['szenario']:<12} Brutto {zeile['brutto']:>14,.2f}  Netto {zeile['netto']:>14,.2f}  "
+              f"DG-Kosten {zeile['dienstgeberkosten']:>13,.2f}  Gesamt {zeile['gesamtkosten']:>14,.2f}  "
+              f"Δ {zeile['gesamtkosten'] - basis['gesamtkosten']:>+12,.2f}")
+    print(f"{lauf['mitarbeiter']} Mitarbeiter, {lauf['zeilen']} Abrechnungszeilen, {lauf['dauer']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Stammdatenblatt (PDF) eines Mitarbeiters
+Das Layout ist fest: Kopfband, Abschnittstitel, Beschriftungen, Rahmen und Füllungen kommen als statische Ebene
+aus einer Vorlage (siehe pdf_vorlage), je Dokument werden nur die Personen- und Mitarbeiterdaten gezeichnet.
+"""
+import datetime
+from typing import Dict, NamedTuple, Optional
+
+from fpdf import FPDF
+
+from modules import pdf_vorlage
+
+# Version des Stammdatenblatt-Layouts, bei jeder Änderung erhöhen (Teil des Cache-Schlüssels)
+STAMMDATENBLATT_VERSION = 2
+
+# === FARBEN (BMD-STIL) ===
+COLOR_HEADER = (41, 128, 185)     # Blau wie Lohnzettel
+COLOR_SECTION = (52, 152, 219)    # Hellblau für Sektionen
+COLOR_LIGHT_BG = (236, 240, 241)  # Hellgrau
+COLOR_TEXT = (44, 62, 80)         # Dunkelgrau
+COLOR_BORDER = (189, 195, 199)    # Hellgrau für Rahmen
+
+
+class Wert(NamedTuple):
+    """Variabler Eintrag einer Tabellenzeile (Schlüssel in den Texten des Dokuments)"""
+    name: str
+
+
+# Abschnitte mit Zeilen (Bezeichnung links, Wert links, Bezeichnung rechts, Wert rechts)
+ABSCHNITTE = (
+    ("PERSONENDATEN", (
+        ("Personen-ID:", Wert("pers_id"), "Geschlecht:", "-"),
+        ("Geburtsdatum:", Wert("geburtsdatum"), "Staatsangehörigkeit:", "Österreich"),
+        ("Geburtsort:", "-", "Familienstand:", "-"),
+        ("SV-Nummer:", "-", "Telefon:", "-"),
+    )),
+    ("ADRESSDATEN", (
+        ("Straße / Hausnr.:", Wert("strasse"), "E-Mail:", "-"),
+        ("PLZ / Ort:", Wert("ort"), "Mobil:", "-"),
+        ("Land:", "Österreich", "Fax:", "-"),
+    )),
+    ("BESCHÄFTIGUNGSDATEN", (
+        ("Eintrittsdatum:", Wert("eintritt"), "Personalnummer:", Wert("pers_id")),
+        ("Position:", "-", "Abteilung:", "-"),
+        ("Beschäftigungsart:", "Vollzeit", "Wochenarbeitszeit:", "40,0 Std."),
+        ("Lohnart:", "Monatslohn", "Kollektivvertrag:", "-"),
+    )),
+    ("BANKDATEN", (
+        ("Bankname:", "-", "Kontoinhaber:", Wert("name")),
+        ("IBAN:", "AT__ ____ ____ ____ ____", "BIC:", "-"),
+    )),
+    ("STEUERDATEN", (
+        ("Steuernummer:", "-", "Freibetrag:", "0,00 EUR"),
+        ("Pendlerpauschale:", "Nein", "Alleinverdiener:", "Nein"),
+        ("Kinderfreibetrag:", "0", "Kirchenbeitrag:", "Nein"),
+    )),
+)
+
+
+def _zeichnen(pdf: FPDF, texte: Optional[Dict] = None):
+    """
+    Zeichnet das Stammdatenblatt. Ohne texte nur die statische Ebene, mit texte nur die variablen Werte darüber.
+    """
+    statisch = texte is None
+
+    def zelle(x, y, breite, hoehe, text, border=1, fill=False, align=''):
+        # Wert-Einträge zeichnet nur der variable Durchlauf, alles andere (samt Rahmen/Füllung) nur der statische
+        pdf.set_xy(x, y)
+        if statisch:
+            pdf.cell(breite, hoehe, "" if isinstance(text, Wert) else text, border=border, fill=fill, align=align)
+        elif isinstance(text, Wert):
+            pdf.cell(breite, hoehe, texte[text.name], align=align)
+
+    # === KOPFZEILE MIT FIRMENINFO ===
+    if statisch:
+        pdf.set_fill_color(*COLOR_HEADER)
+        pdf.rect(0, 0, 210, 40, 'F')
+
+    # Firmenname und Titel - ZENTRIERT
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Arial", 'B', 20)
+    zelle(10, 10, 190, 10, "STAMMDATENBLATT", border=0, align='C')
+
+    pdf.set_font("Arial", '', 9)
+    zelle(10, 22, 190, 5, "Team Sigma GmbH | Wexstraße 19-23 | 1200 Wien", border=0, align='C')
+    zelle(10, 28, 190, 5, Wert("erstellt_am"), border=0, align='C')
+
+    # === MITARBEITER-ÜBERSCHRIFT ===
+    y_pos = 50
+    pdf.set_fill_color(*COLOR_SECTION)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Arial", 'B', 14)
+    zelle(10, y_pos, 190, 10, Wert("name"), fill=True, align='C')
+    y_pos += 12
+
+    for nummer, (titel, zeilen) in enumerate(ABSCHNITTE):
+        if nummer:
+            y_pos += 3
+        pdf.set_fill_color(*COLOR_SECTION)
+        # Der erste Abschnittstitel steht in dunkler Schrift, die weiteren in weißer
+        pdf.set_text_color(*(COLOR_TEXT if nummer == 0 else (255, 255, 255)))
+        pdf.set_font("Arial", 'B', 11)
+        zelle(10, y_pos, 190, 8, titel, fill=True, align='L')
+        y_pos += 8
+
+        pdf.set_text_color(*COLOR_TEXT)
+        if nummer == 0:
+            pdf.set_draw_color(*COLOR_BORDER)
+
+        # Tabelle mit 2 Spalten, jede zweite Zeile hinterlegt
+        for i, (label1, value1, label2, value2) in enumerate(zeilen):
+            fill = (i % 2 == 0)
+            if fill:
+                pdf.set_fill_color(*COLOR_LIGHT_BG)
+            else:
+                pdf.set_fill_color(255, 255, 255)
+
+            pdf.set_font("Arial", 'B', 9)
+            zelle(10, y_pos, 45, 7, label1, fill=fill)
+            zelle(105, y_pos, 45, 7, label2, fill=fill)
+            pdf.set_font("Arial", '', 9)
+            zelle(55, y_pos, 50, 7, value1, fill=fill)
+            zelle(150, y_pos, 50, 7, value2, fill=fill)
+            y_pos += 7
+
+    # === SIGNATURFELD ===
+    # KRITISCH: Maximal bis Y=240 um sicher auf einer Seite zu bleiben
+    y_pos = min(max(y_pos + 3, 238), 242)  # Zwischen Y=238 und Y=242
+
+    pdf.set_draw_color(*COLOR_BORDER)
+    if statisch:
+        pdf.rect(10, y_pos, 90, 15)
+        pdf.rect(110, y_pos, 90, 15)
+
+    pdf.set_font("Arial", 'I', 7)
+    pdf.set_text_color(150, 150, 150)
+    zelle(10, y_pos + 11, 90, 4, "Unterschrift Mitarbeiter", border=0, align='C')
+    zelle(110, y_pos + 11, 90, 4, "Unterschrift Geschäftsführung", border=0, align='C')
+
+    # === FUßZEILE ===
+    pdf.set_font("Arial", '', 7)
+    pdf.set_text_color(120, 120, 120)
+    zelle(pdf.l_margin, 275, 95, 3, "Team Sigma GmbH | UID: ATU12345678", border=0, align='L')
+    zelle(pdf.l_margin + 95, 275, 95, 3, Wert("seite"), border=0, align='R')
+
+
+_VORLAGE = pdf_vorlage.Vorlage(_zeichnen)
+
+
+# Professionelles Stammdatenblatt - VOLLSTÄNDIGE A4-NUTZUNG
+def generate_stammdatenblatt_pdf(person_obj):
+    """
+    Generiert ein vollständiges, professionelles Stammdatenblatt im BMD-Stil.
+    Nutzt die gesamte A4-Seite mit allen relevanten Mitarbeiterinformationen.
+
+    Args:
+        person_obj: Person-Objekt mit Attributen: surname, name, birthdate, street, housenr, zip, place, obj_id
+
+    Returns:
+        bytes: PDF als bytes (latin1-encoded)
+    """
+    heute = datetime.date.today().strftime('%d.%m.%Y')
+    texte = {
+        "erstellt_am": f"Erstellt am: {heute}",
+        "name": f"{person_obj.surname} {person_obj.name}",
+        "pers_id": str(person_obj.obj_id),
+        "geburtsdatum": str(person_obj.birthdate),
+        "strasse": f"{person_obj.street} {person_obj.housenr}",
+        "ort": f"{person_obj.zip} {person_obj.place}",
+        "eintritt": getattr(person_obj, 'entrydate', '-'),
+        "seite": f"Seite 1 | {heute}",
+    }
+    pdf = _VORLAGE.seite()
+    _zeichnen(pdf, texte)
+    return pdf.output(dest='S').encode('latin1')
@@ -54,8 +54,7 @@ with tab1:
         st.metric("👥 Gesamt Personen", len(personen))
     with col2:
         # Count employed persons (those who are also employees)
-        import sqlite3
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = dbms.connect(str(DB_PATH))
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(DISTINCT PERS_ID) FROM MITARBEITER")
         employed_count = cursor.fetchone()[0]
@@ -209,8 +208,7 @@ with tab3:
             
             if selected_person:
                 # Check if person is an employee
-                import sqlite3
-                conn = sqlite3.connect(str(DB_PATH))
+                conn = dbms.connect(str(DB_PATH))
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM MITARBEITER WHERE PERS_ID = ?", (selected_id,))
                 is_employee = cursor.fetchone()[0] > 0
@@ -264,8 +264,7 @@ with tab3:
                     st.subheader("🗑️ Gefährliche Aktionen")
                     
                     # Check for payroll records
-                    import sqlite3
-                    conn = sqlite3.connect(str(DB_PATH))
+                    conn = dbms.connect(str(DB_PATH))
                     cursor = conn.cursor()
                     cursor.execute("SELECT COUNT(*) FROM lohnverrechnung_dn WHERE lv_dn_empl_id = ?", (selected_employee.empolyee_ID,))
                     has_payroll = cursor.fetchone()[0] > 0
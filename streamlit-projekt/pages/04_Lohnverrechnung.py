@@ -7,8 +7,8 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 import datetime as dt
-import sqlite3
-from modules import dbms, employee, Abrechnung, payroll, auth
+import os
+from modules import dbms, employee, Abrechnung, payroll, auth, monatslauf, aufrollung, migrations
 
 # Authentication check
 auth.init_session_state()
@@ -18,7 +18,11 @@ if not st.session_state.get('authenticated', False):
 
 DB_PATH = Path(__file__).parent.parent / "stammdatenverwaltung.db"
 db = dbms.dbms(str(DB_PATH))
-payroll_manager = payroll.PayrollManager(str(DB_PATH))
+try:
+    payroll_manager = payroll.PayrollManager(str(DB_PATH))
+except migrations.MigrationError as e:
+    st.error(f"🚨 Die Datenbank ist nicht auf dem nötigen Stand: {e}")
+    st.stop()
 
 st.set_page_config(page_title="Lohnverrechnung", page_icon="💰", layout="wide")
 st.title("💰 Lohnverrechnung & Gehaltsabrechnung")
@@ -67,6 +71,93 @@ with tab1:
     else:
         st.info(f"Noch keine Abrechnungen für {current_month} vorhanden.")
 
+    # Month-end run over all active employees
+    st.subheader("🗓️ Monatslauf")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        lauf_monat = st.date_input("Abrechnungsmonat", dt.datetime.now(), key="monatslauf_monat").strftime("%Y-%m")
+    with col2:
+        lauf_workers = st.number_input("Parallele Worker", value=os.cpu_count() or 1, min_value=1, max_value=64, step=1)
+    with col3:
+        lauf_executor = st.selectbox("Ausführung", ["process", "thread"], format_func=lambda x: "Prozesse" if x == "process" else "Threads")
+
+    if st.button("▶️ Monat abrechnen", type="primary"):
+        fortschritt_balken = st.progress(0.0, text="Monatslauf wird gestartet...")
+
+        def fortschritt(erledigt, gesamt):
+            fortschritt_balken.progress(erledigt / gesamt, text=f"{erledigt}/{gesamt} Mitarbeiter berechnet")
+
+        lauf = monatslauf.monatslauf(str(DB_PATH), lauf_monat, int(lauf_workers), lauf_executor, fortschritt)
+        st.success(
+            f"{lauf['anzahl']} Mitarbeiter abgerechnet, {lauf['neu_angelegt']} Abrechnungen neu angelegt "
+            f"({lauf['dauer']:.2f} s, {lauf['durchsatz']:.0f} Mitarbeiter/s)"
+        )
+        st.dataframe(pd.DataFrame([{
+            'Mitarbeiter': z['FULL_NAME'],
+            'Brutto': z['ergebnis'].brlohn,
+            'SV': z['ergebnis'].sv + z['ergebnis'].svsonder,
+            'Lohnsteuer': z['ergebnis'].lst + z['ergebnis'].lst_sb,
+            'Netto': z['ergebnis'].netto,
+        } for z in lauf['ergebnisse']]), use_container_width=True)
+
+    # Retroactive recalculation after corrections of past months, tax benefits or parameter sets
+    st.subheader("🔄 Aufrollung")
+    alle_mitarbeiter = payroll_manager.get_all_employees_for_payroll()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        aufroll_monat = st.date_input("Ab Monat", dt.date(dt.datetime.now().year, 1, 1), key="aufrollung_monat").strftime("%Y-%m")
+    with col2:
+        aufroll_auswahl = st.multiselect(
+            "Mitarbeiter (leer = alle)", [emp['EMPL_ID'] for emp in alle_mitarbeiter],
+            format_func=lambda empl_id: next(emp['FULL_NAME'] for emp in alle_mitarbeiter if emp['EMPL_ID'] == empl_id),
+        )
+    with col3:
+        aufroll_anlass = st.text_input("Anlass", key="aufrollung_anlass")
+
+    if st.button("🔄 Aufrollen"):
+        lauf = aufrollung.aufrollen(str(DB_PATH), aufroll_monat, aufroll_auswahl or None, aufroll_anlass)
+        st.success(
+            f"{lauf['monate']} Monate von {lauf['mitarbeiter']} Mitarbeitern geprüft, {lauf['neu_berechnet']} neu berechnet, "
+            f"{len(lauf['korrekturen'])} Korrekturen ({lauf['dauer']:.2f} s)"
+        )
+
+    korrekturen = aufrollung.get_korrekturen(str(DB_PATH))
+    if korrekturen:
+        namen = {emp['EMPL_ID']: emp['FULL_NAME'] for emp in alle_mitarbeiter}
+        st.dataframe(pd.DataFrame([{
+            'Aufgerollt am': k['aufgerollt_am'],
+            'Mitarbeiter': namen.get(k['EMPL_ID'], k['EMPL_ID']),
+            'Monat': k['monat'],
+            'Anlass': k['anlass'],
+            'Δ Brutto': k['differenz'].brlohn,
+            'Δ SV': k['differenz'].sv + k['differenz'].svsonder,
+            'Δ Lohnsteuer': k['differenz'].lst + k['differenz'].lst_sb,
+            'Δ Netto': k['differenz'].netto + k['differenz'].sobz,
+        } for k in korrekturen]), use_container_width=True)
+
+    # Company-wide employer costs from the stored ledger (lohnverrechnung_dg), aggregated in SQL
+    st.subheader("🏢 Lohnnebenkosten")
+    col1, col2 = st.columns(2)
+    with col1:
+        lnk_art = st.radio("Zeitraum", ["Monat", "Jahr"], horizontal=True, key="lnk_art")
+    with col2:
+        lnk_datum = st.date_input("Monat / Jahr", dt.datetime.now(), key="lnk_datum")
+    lnk_zeitraum = lnk_datum.strftime("%Y-%m") if lnk_art == "Monat" else lnk_datum.strftime("%Y")
+    lnk_zeilen = payroll_manager.get_lohnnebenkosten(lnk_zeitraum)
+    if lnk_zeilen:
+        lnk_df = pd.DataFrame(lnk_zeilen).rename(columns={
+            'name': 'Mitarbeiter', 'monat': 'Monat', 'anzahl': 'Abrechnungen', 'sv_dg': 'SV-DG',
+            'kommunalsteuer': 'Kommunalsteuer', 'ubahnsteuer': 'U-Bahn-Steuer', 'db': 'DB', 'dz': 'DZ',
+            'bv': 'BV', 'summe': 'Summe',
+        }).drop(columns=['empl_id'], errors='ignore')
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Lohnnebenkosten gesamt", f"{lnk_df['Summe'].sum():,.2f} €")
+        col2.metric("davon SV-DG", f"{lnk_df['SV-DG'].sum():,.2f} €")
+        col3.metric("Abrechnungen", int(lnk_df['Abrechnungen'].sum()))
+        st.dataframe(lnk_df.round(2), use_container_width=True)
+    else:
+        st.info(f"Keine gespeicherten Lohnnebenkosten für {lnk_zeitraum}, zuerst den Monatslauf ausführen.")
+
 with tab2:
     st.header("💸 Neue Gehaltsabrechnung erstellen")
     
@@ -102,7 +193,7 @@ with tab2:
             with col1:
                 brutto = st.number_input("Grundgehalt (Brutto)", value=selected_emp['SALARY'] if 'selected_emp' in locals() else 2500.0, min_value=0.0, step=50.0)
                 wochenstunden = st.number_input("Wochenstunden", value=38.5, min_value=0.0, step=0.5)
-                stundensatz = st.number_input("Stundensatz", value=20.0, min_value=0.0, step=0.5)
+                stundensatz = st.number_input("Stundensatz", value=38.5, min_value=0.5, step=0.5)
             
             with col2:
                 mehrstunden0 = st.number_input("Mehrstunden (0%)", value=0.0, min_value=0.0, step=0.5)
@@ -125,7 +216,7 @@ with tab2:
                 reisekosten = st.number_input("Reisekosten", value=0.0, min_value=0.0, step=10.0)
             
             with col3:
-                jahressechstel = st.number_input("Jahressechstel", value=0.0, min_value=0.0, step=100.0)
+                jahressechstel = st.number_input("Jahressechstel", value=0.0, min_value=0.0, step=100.0, help="0 = automatisch aus den bisherigen Abrechnungen des Jahres")
 
             st.subheader("📋 Steuerliche Vorteile")
             st.info("💡 Diese Daten werden separat in der Tabelle 'steuerliche_vorteile' gespeichert")
@@ -147,7 +238,7 @@ with tab2:
             submitted = st.form_submit_button("📝 Abrechnung erstellen", type="primary")
 
             if submitted and selected_employee:
-                # Save tax benefits first
+                # Tax benefits
                 tax_benefits_data = {
                     'freibetrag': freibetrag,
                     'pendlerpauschale': pendlerpauschale,
@@ -156,9 +247,8 @@ with tab2:
                     'anspruch_fabo': anspruch_fabo,
                     'gewerkschaft': 1 if gewerkschaftsmitglied else 0
                 }
-                payroll_manager.save_tax_benefits(empl_id, tax_benefits_data)
 
-                # Create payroll record
+                # Payroll record
                 payroll_data = {
                     'lv_dn_empl_id': empl_id,
                     'lv_dn_monat': monat_str,
@@ -177,12 +267,39 @@ with tab2:
                     'lv_dn_jahressechstel': jahressechstel
                 }
 
-                if payroll_manager.create_payroll_record(payroll_data):
+                # Tax benefits and payroll record are written in a single commit
+                with payroll_manager.transaction():
+                    payroll_manager.save_tax_benefits(empl_id, tax_benefits_data)
+                    created = payroll_manager.create_payroll_record(payroll_data)
+
+                if created:
+                    # Later months of the year depend on this one (Jahressechstel, Sonderzahlungen bisher)
+                    lauf = aufrollung.aufrollen(str(DB_PATH), monat_str, [empl_id], f"Abrechnung {monat_str} erfasst")
+                    if lauf['korrekturen']:
+                        st.info(f"🔄 {len(lauf['korrekturen'])} spätere Monate wurden aufgerollt.")
                     st.success(f"✅ Abrechnung für {selected_emp['FULL_NAME']} wurde erfolgreich erstellt!")
                     st.rerun()
                 else:
                     st.error("❌ Fehler beim Erstellen der Abrechnung. Möglicherweise existiert bereits eine Abrechnung für diesen Monat.")
 
+    # Nettolohnvereinbarung: Brutto zu einem vereinbarten Netto suchen
+    with st.expander("🔁 Netto → Brutto (Nettolohnvereinbarung)"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            ziel_netto = st.number_input("Vereinbartes Netto", value=2000.0, min_value=0.0, step=50.0, key="n2b_netto")
+        with col2:
+            n2b_monat = st.date_input("Abrechnungsmonat", dt.datetime.now(), key="n2b_monat")
+        with col3:
+            n2b_kinder = st.number_input("Kinder (AVAB/AEAB)", value=0, min_value=0, step=1, key="n2b_kinder")
+
+        suche = Abrechnung.calc_netto2brutto(ziel_netto, n2b_monat.month, n2b_monat.year, anzahl_Kinder_AVAB=int(n2b_kinder))
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Brutto", f"{suche.brutto:,.2f} €")
+        col2.metric("SV", f"{suche.ergebnis.sv:,.2f} €")
+        col3.metric("Lohnsteuer", f"{suche.ergebnis.lst:,.2f} €")
+        col4.metric("Netto", f"{suche.ergebnis.netto:,.2f} €")
+        st.caption(f"{suche.iterationen} Rechenläufe")
+
 with tab3:
     st.header("📈 Gehaltsabrechnung berechnen & anzeigen")
     
@@ -215,35 +332,11 @@ with tab3:
                         tax_benefits = payroll_manager.get_tax_benefits(empl_id)
 
                         try:
-                            # Use the Abrechnung module to calculate
-                            jahr = int(selected_month.split('-')[0])
-                            monat = int(selected_month.split('-')[1])
-
-                            result = Abrechnung.calc_brutto2netto(
-                                monat=monat,
-                                jahr=jahr,
-                                stundensatz=float(selected_record.get('lv_dn_stundensatz', 20.0) or 20.0),
-                                brutto=float(selected_record.get('lv_dn_brutto', 0) or 0),
-                                mehrstunden0=float(selected_record.get('lv_dn_mehrstunden0', 0) or 0),
-                                mehrstunden25=float(selected_record.get('lv_dn_mehrstunden25', 0) or 0),
-                                mehrstunden50=float(selected_record.get('lv_dn_mehrstunden50', 0) or 0),
-                                überstunden50=float(selected_record.get('lv_dn_ueberstunden50', 0) or 0),
-                                überstunden100=float(selected_record.get('lv_dn_ueberstunden100', 0) or 0),
-                                sonderzahlungen=float(selected_record.get('lv_dn_sonderzahlungen', 0) or 0),
-                                sachbezug=float(selected_record.get('lv_dn_sachbezug', 0) or 0),
-                                diäten=float(selected_record.get('lv_dn_diäten', 0) or 0),
-                                reisekosten=float(selected_record.get('lv_dn_reisekosten', 0) or 0),
-                                freibetragsbescheid=float(tax_benefits.get('freibetrag', 0)),
-                                pendlerpauschale=float(tax_benefits.get('pendlerpauschale', 0)),
-                                pendlereuro=float(tax_benefits.get('pendlereuro', 0)),
-                                anzahl_Kinder_AVAB=int(tax_benefits.get('anzahl_kinder_avab', 0)),
-                                anspruch_fabo=bool(tax_benefits.get('anspruch_fabo', 0)),
-                                gewerkschaftmitglied=bool(tax_benefits.get('gewerkschaft', 0)),
-                                jahressechstel=float(selected_record.get('lv_dn_jahressechstel', 0) or 0)
-                            )
+                            # Gespeichertes Ergebnis, neu berechnet nur wenn sich die Eingaben geändert haben
+                            result = payroll_manager.get_payroll_result(selected_record, tax_benefits)
 
                             # Display result in a nice format
-                            st.code(result, language="text")
+                            st.code(result.in_cent().in_euro().text(), language="text")
 
                             # Additional info
                             with st.expander("📊 Eingabedaten anzeigen"):
@@ -294,7 +387,7 @@ with tab4:
 
         if selected_filter == "Alle Mitarbeiter":
             # Show all payroll records using correct schema
-            conn = sqlite3.connect(str(DB_PATH))
+            conn = dbms.connect(str(DB_PATH))
             query = '''
                 SELECT l.*, p.PERS_FIRSTNAME, p.PERS_SURNAME
                 FROM lohnverrechnung_dn l
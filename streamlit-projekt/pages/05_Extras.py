@@ -1,7 +1,6 @@
 import streamlit as st
-import shutil
 from pathlib import Path
-import sqlite3
+from modules import dbms, Abrechnung
 
 st.title("Extras & Werkzeuge")
 
@@ -28,8 +27,12 @@ db_backup = db_path.with_suffix(".bak")
 
 if db_path.exists():
     if st.button("Backup erstellen & Datenbank zurücksetzen"):
-        shutil.copy(db_path, db_backup)
-        db_path.unlink()
+        # Die Sicherung über die Backup-API enthält auch Seiten, die noch im WAL stehen (offene Verbindungen
+        # anderer Sitzungen); danach Pool und Migrationsstand vergessen und WAL/SHM mit löschen
+        dbms.backup(str(db_path), str(db_backup))
+        dbms.discard_manager(str(db_path))
+        for pfad in (db_path, db_path.with_name(db_path.name + "-wal"), db_path.with_name(db_path.name + "-shm")):
+            pfad.unlink(missing_ok=True)
         st.success(
             "✅ Backup erstellt und Datenbank gelöscht.\n"
             "Starte die App neu, um eine frische Datenbank zu erhalten."
@@ -45,10 +48,22 @@ st.code(
     f"Größe: {db_path.stat().st_size if db_path.exists() else 0} Bytes"
 )
 
+# --- Rechen-Cache der Lohnverrechnung (gilt für alle Sitzungen dieses Prozesses) ---
+st.subheader("Rechen-Cache Lohnverrechnung")
+cache = Abrechnung.calc_cache_info()
+col1, col2, col3 = st.columns(3)
+col1.metric("Treffer", cache['treffer'])
+col2.metric("Neu berechnet", cache['fehlzugriffe'])
+col3.metric("Trefferquote", f"{cache['trefferquote']:.0%}")
+st.caption(f"{cache['eintraege']} von {cache['maximal']} Einträgen belegt")
+if st.button("Cache leeren"):
+    Abrechnung.calc_cache_clear()
+    st.rerun()
+
 # --- Tabellenübersicht (optional zum Prüfen) ---
 if db_path.exists() and st.checkbox("Tabellen anzeigen"):
     try:
-        con = sqlite3.connect(str(db_path))
+        con = dbms.connect(str(db_path))
         cur = con.cursor()
         cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;")
         tables = [r[0] for r in cur.fetchall()]
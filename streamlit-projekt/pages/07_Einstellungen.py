@@ -7,7 +7,7 @@ from dotenv import load_dotenv
 import yaml
 import pandas as pd
 
-from modules import auth
+from modules import auth, dbms
 
 # Authentication check
 auth.init_session_state()
@@ -208,9 +208,8 @@ with info_tab:
     # Database statistics
     st.subheader("🗄️ Datenbankstatistiken")
     
-    import sqlite3
     try:
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = dbms.connect(str(DB_PATH))
         cursor = conn.cursor()
         
         # Get table sizes
@@ -0,0 +1,96 @@
+"""
+Simulation – Was-wäre-wenn-Rechnung der Personalkosten (Gehaltsrunden, KV-Erhöhungen, Stundenumstellungen)
+"""
+import datetime as dt
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from modules import auth, simulation
+
+# Authentication check
+auth.init_session_state()
+if not st.session_state.get('authenticated', False):
+    st.error("Sie müssen sich anmelden, um diese Seite zu sehen.")
+    st.stop()
+
+DB_PATH = Path(__file__).parent.parent / "stammdatenverwaltung.db"
+
+st.set_page_config(page_title="Simulation", page_icon="🧮", layout="wide")
+st.title("🧮 Personalkosten-Simulation")
+
+# Sidebar for user info
+with st.sidebar:
+    user_data = st.session_state.get('user_data', {})
+    st.success(f"Angemeldet: **{user_data.get('username', '')}**")
+    if st.button("Abmelden", type="secondary"):
+        auth.logout()
+
+st.write(
+    "Jedes Szenario wird für alle aktiven Mitarbeiter und alle 12 Monate des Jahres gerechnet. "
+    "Erhöhungen in Prozent, Wochenstunden leer lassen wenn keine Umstellung."
+)
+
+col1, col2 = st.columns(2)
+with col1:
+    jahr = st.number_input("Simulationsjahr", value=dt.datetime.now().year, min_value=2000, max_value=2100, step=1)
+with col2:
+    mit_sonderzahlungen = st.checkbox("Sonderzahlungen (Juni, November) einrechnen", value=True)
+
+vorlage = pd.DataFrame([
+    {'Szenario': "Basis", 'Ist-Erhöhung %': 0.0, 'KV-Erhöhung %': 0.0, 'Ab Monat': 1, 'Wochenstunden': None, 'Anzahl MA': 0},
+    {'Szenario': "KV +3,2% ab April", 'Ist-Erhöhung %': 3.2, 'KV-Erhöhung %': 3.2, 'Ab Monat': 4, 'Wochenstunden': None, 'Anzahl MA': 0},
+    {'Szenario': "20 MA auf 30h", 'Ist-Erhöhung %': 0.0, 'KV-Erhöhung %': 0.0, 'Ab Monat': 1, 'Wochenstunden': 30.0, 'Anzahl MA': 20},
+])
+eingabe = st.data_editor(
+    vorlage,
+    num_rows="dynamic",
+    use_container_width=True,
+    column_config={
+        'Ab Monat': st.column_config.NumberColumn(min_value=1, max_value=12, step=1),
+        'Wochenstunden': st.column_config.NumberColumn(min_value=0.5, max_value=60.0, step=0.5),
+        'Anzahl MA': st.column_config.NumberColumn(min_value=0, step=1),
+    },
+    key="simulation_szenarien",
+)
+
+if st.button("▶️ Szenarien rechnen", type="primary"):
+    szenarien = [
+        simulation.Szenario(
+            name=str(zeile['Szenario'] or f"Szenario {i + 1}"),
+            erhoehung=float(zeile['Ist-Erhöhung %'] or 0) / 100.,
+            kv_erhoehung=float(zeile['KV-Erhöhung %'] or 0) / 100.,
+            ab_monat=int(zeile['Ab Monat'] or 1),
+            wochenstunden=None if pd.isna(zeile['Wochenstunden']) else float(zeile['Wochenstunden']),
+            anzahl=int(zeile['Anzahl MA'] or 0),
+        )
+        for i, zeile in eingabe.iterrows()
+    ]
+    if not szenarien:
+        st.warning("Bitte mindestens ein Szenario anlegen.")
+    else:
+        lauf = simulation.simuliere(str(DB_PATH), szenarien, int(jahr), mit_sonderzahlungen)
+        basis = lauf['szenarien'][0]
+        st.success(
+            f"{len(szenarien)} Szenarien × {lauf['mitarbeiter']} Mitarbeiter × 12 Monate "
+            f"({lauf['zeilen']} Abrechnungen) in {lauf['dauer']:.2f} s gerechnet"
+        )
+
+        tabelle = pd.DataFrame([{
+            'Szenario': z['szenario'],
+            'Brutto': z['brutto'],
+            'Netto': z['netto'],
+            **{bezeichnung: z[name] for name, bezeichnung in simulation.DG_KOSTEN.items()},
+            'DG-Kosten gesamt': z['dienstgeberkosten'],
+            'Gesamtkosten': z['gesamtkosten'],
+            'Δ Gesamtkosten': z['gesamtkosten'] - basis['gesamtkosten'],
+            'Δ Netto': z['netto'] - basis['netto'],
+        } for z in lauf['szenarien']]).set_index('Szenario')
+        st.dataframe(tabelle.style.format("{:,.2f} €"), use_container_width=True)
+
+        st.subheader("Dienstgeberkosten je Monat")
+        st.line_chart(pd.DataFrame(
+            {z['szenario']: z['monatlich'] for z in lauf['szenarien']},
+            index=[f"{int(jahr)}-{m:02d}" for m in range(1, 13)],
+        ))
@@ -0,0 +1,26 @@
+"""
+Gemeinsame Fixtures der Tests
+Aufruf aus dem Verzeichnis streamlit-projekt:
+    python -m pytest
+"""
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJEKT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJEKT))
+
+from modules import dbms  # noqa: E402
+
+DB_PATH = PROJEKT / "stammdatenverwaltung.db"
+
+
+@pytest.fixture
+def db_kopie(tmp_path):
+    """Kopie der ausgelieferten Datenbank (noch nicht migriert), die mitgelieferte Datei bleibt unverändert"""
+    ziel = tmp_path / "stammdatenverwaltung.db"
+    shutil.copyfile(DB_PATH, ziel)
+    yield str(ziel)
+    dbms.discard_manager(str(ziel))
@@ -0,0 +1,104 @@
+"""
+Regressionstests der Lohnverrechnung: Grenzfälle und Prüfsummen gegen benchmark_baseline.json,
+Einzel- gegen Batch-Rechner, Aufrollung und die Schema-Migrationen auf einer Kopie der Datenbank
+"""
+import json
+import sqlite3
+
+import pytest
+
+from modules import Abrechnung, abrechnung_batch, aufrollung, benchmark, migrations, monatslauf, payroll
+
+BASELINE = json.loads(benchmark.BASELINE_PATH.read_text(encoding='utf-8'))
+
+
+def _abrechnung(db_path: str, empl_id: int, monat: str) -> dict:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute('SELECT * FROM lohnverrechnung_dn WHERE lv_dn_empl_id = ? AND lv_dn_monat = ?',
+                       (empl_id, monat)).fetchone()
+    conn.close()
+    return dict(row)
+
+
+def test_grenzfaelle_wie_baseline():
+    # pruefe_grenzfaelle vergleicht dabei auch Einzel- und Batch-Rechner auf den Cent
+    aktuell = benchmark.pruefe_grenzfaelle()
+    assert set(aktuell) == set(BASELINE['grenzfaelle'])
+    assert benchmark.vergleiche({'grenzfaelle': aktuell, 'pruefsummen': {}}, BASELINE) == []
+
+
+def test_einzel_und_batch_rechner_gleich():
+    tabelle = benchmark.belegschaft(1_000)
+    cent = abrechnung_batch.calc_brutto2netto_batch(tabelle, cent=True)
+    for i in range(1_000):
+        einzeln = Abrechnung.calc_brutto2netto(**benchmark._eingaben(tabelle, i)).in_cent()
+        abweichend = [feld for feld in einzeln._fields if int(cent[feld][i]) != getattr(einzeln, feld)]
+        assert not abweichend, f"Zeile {i}: Einzel- und Batch-Rechner weichen ab in {abweichend}"
+    assert benchmark._pruefsumme(cent) == BASELINE['pruefsummen']['1000']
+
+
+def test_aufrollung_bucht_differenz_einer_vergangenen_korrektur(db_kopie):
+    for monat in ('2025-09', '2025-10', '2025-11'):
+        monatslauf.monatslauf(db_kopie, monat, workers=1, executor='thread')
+    manager = payroll.PayrollManager(db_kopie)
+    alt = manager.get_payroll_result(_abrechnung(db_kopie, 26, '2025-10'))
+
+    conn = sqlite3.connect(db_kopie)
+    conn.execute("UPDATE lohnverrechnung_dn SET lv_dn_brutto = lv_dn_brutto + 200 WHERE lv_dn_empl_id = 26 AND lv_dn_monat = '2025-10'")
+    conn.commit()
+    conn.close()
+    lauf = aufrollung.aufrollen(db_kopie, '2025-10', [26], anlass='Gehaltserhöhung rückwirkend')
+
+    # Oktober wird korrigiert; der November wird wegen des neuen Jahressechstels neu berechnet,
+    # ändert sich ohne Sonderzahlung aber um keinen Cent
+    assert lauf['monate'] == 2 and lauf['neu_berechnet'] == 2
+    korrekturen = aufrollung.get_korrekturen(db_kopie, 26)
+    assert [(k['monat'], k['anlass']) for k in korrekturen] == [('2025-10', 'Gehaltserhöhung rückwirkend')]
+
+    neu = manager.get_payroll_result(_abrechnung(db_kopie, 26, '2025-10'))
+    differenz = korrekturen[0]['differenz']
+    assert differenz.brlohn == pytest.approx(200.)
+    assert list(differenz.in_cent()) == [n - a for n, a in zip(neu.in_cent(), alt.in_cent())]
+    assert differenz.netto > 0 and differenz.lst > 0 and differenz.sv > 0
+
+    # Eine zweite Aufrollung ohne neue Korrektur bucht nichts mehr
+    lauf = aufrollung.aufrollen(db_kopie, '2025-10', [26])
+    assert lauf['neu_berechnet'] == 0 and lauf['korrekturen'] == []
+    assert len(aufrollung.get_korrekturen(db_kopie, 26)) == 1
+
+
+def test_migrationen_auf_kopie_der_datenbank(db_kopie):
+    assert migrations.migrate(db_kopie) == len(migrations.MIGRATIONS)
+    assert migrations.migrate(db_kopie) == len(migrations.MIGRATIONS)
+    assert migrations.offene_migrationen(db_kopie) == []
+    nicht_verwendet = [beschreibung for beschreibung, verwendet, _ in migrations.verify_indexes(db_kopie) if not verwendet]
+    assert nicht_verwendet == []
+
+
+def test_doppelte_eintraege_stoppen_migration(db_kopie):
+    conn = sqlite3.connect(db_kopie)
+    spalten = [row[1] for row in conn.execute('PRAGMA table_info(lohnverrechnung_dn)') if not row[5]]
+    conn.execute(f"INSERT INTO lohnverrechnung_dn ({', '.join(spalten)}) "
+                 f"SELECT {', '.join(spalten)} FROM lohnverrechnung_dn WHERE lv_dn_id = 1")
+    conn.commit()
+
+    with pytest.raises(migrations.MigrationError, match=r"doppelte Einträge.*\(26, '2025-10'\)"):
+        migrations.migrate(db_kopie)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name LIKE 'idx_%'").fetchone()[0] == 0
+    conn.close()
+
+
+def test_payroll_braucht_ergebnis_tabellen(db_kopie):
+    conn = sqlite3.connect(db_kopie)
+    conn.execute('ALTER TABLE Kinder RENAME TO Kinder_alt')
+    conn.commit()
+    with pytest.raises(migrations.MigrationError, match="Kinder"):
+        payroll.PayrollManager(db_kopie)
+
+    # Sobald die Tabelle da ist, holt der nächste Aufruf die offenen Migrationen nach
+    conn.execute('ALTER TABLE Kinder_alt RENAME TO Kinder')
+    conn.commit()
+    conn.close()
+    assert payroll.PayrollManager(db_kopie).db.manager.schema_version == payroll.SCHEMA_VERSION